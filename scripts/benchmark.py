@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Benchmark the bulk scripts end to end against a local Supabase stand-in.
+
+Every scenario gets a fresh SQLite database served by ``LocalSupabase``
+(see naebak_import/standin.py) with the configured latency and 429 rates,
+is prepared without faults (reference data, a first import, injected
+duplicates) and then runs the real script as a subprocess pointed at the
+stand-in. Reported per scenario: wall time, rows processed, rows/sec and
+the requests the server received per endpoint, 429s included.
+
+    python3 benchmark.py import dedupe --rows 1000 --auth-429 0.02
+    python3 benchmark.py import --json before.json
+    python3 benchmark.py import --compare before.json -- --chunk-size 1000
+    python3 benchmark.py import --synthetic 50000
+
+Arguments after -- go to the measured script.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from naebak_import import SCRIPTS_DIR, DATA_DIR, INDIVIDUAL, CandidateGenerator, format_duration, write_workbook
+from naebak_import.standin import Faults, LocalSupabase
+
+INDIVIDUAL_SHEET = 'جميعالمرشحين.xlsx'
+
+# Used by the preparation imports: no faults, so nothing needs throttling
+PREPARE_ARGS = ['--auth-rate', '1000', '--workers', '16']
+
+
+@dataclass
+class Scenario:
+    """A script to measure and how its database is prepared"""
+    script: str
+    description: str
+    # Scripts run (unmeasured, without faults) before the measured one
+    prepare: list = field(default_factory=list)
+    duplicates: bool = False
+
+
+SCENARIOS = {
+    'import': Scenario('import_all_candidates.py', 'first import into an empty database'),
+    'reimport': Scenario('import_all_candidates.py', 'import again: every row already exists',
+                         prepare=['import_all_candidates.py']),
+    'dedupe': Scenario('remove_duplicates.py', 'remove injected duplicate candidates',
+                       prepare=['import_all_candidates.py'], duplicates=True),
+    'delete': Scenario('delete_all_individuals.py', 'delete every individual candidate',
+                       prepare=['import_all_candidates.py']),
+}
+
+
+@dataclass
+class Result:
+    scenario: str
+    script: str
+    exit_code: int
+    seconds: float
+    rows: int = 0
+    ok: int = 0
+    errors: int = 0
+    rows_per_sec: float = 0.0
+    requests: dict = field(default_factory=dict)
+    throttled: dict = field(default_factory=dict)
+    retries: dict = field(default_factory=dict)
+    log: str = None
+
+    @property
+    def total_requests(self):
+        return sum(self.requests.values())
+
+
+def write_source(data_dir, rows, synthetic=None, seed=1):
+    """The individual candidates sheet (its first rows with --rows, or a generated
+    one with --synthetic) in a scratch data directory"""
+    os.makedirs(data_dir, exist_ok=True)
+    source = os.path.join(DATA_DIR, INDIVIDUAL_SHEET)
+    target = os.path.join(data_dir, INDIVIDUAL_SHEET)
+    if synthetic:
+        write_workbook(target, INDIVIDUAL, CandidateGenerator(seed=seed).rows(INDIVIDUAL, synthetic))
+    elif rows is None:
+        shutil.copyfile(source, target)
+    else:
+        pd.read_excel(source).head(rows).to_excel(target, index=False)
+
+
+def inject_duplicates(server, fraction, seed):
+    """Copy a fraction of the individual candidates under new auth users; returns the copies made"""
+    deputies = server.query(
+        "SELECT dp.*, up.full_name, up.governorate_id, up.avatar_url, up.role "
+        "FROM deputy_profiles dp JOIN user_profiles up ON up.id = dp.user_id "
+        "WHERE dp.candidate_type = 'individual' ORDER BY dp.id")
+    copies = deputies[::max(1, round(1 / fraction))] if fraction > 0 else []
+    for number, deputy in enumerate(copies):
+        user = server.create_user(f"duplicate-{seed}-{number}-{uuid.uuid4().hex[:8]}@benchmark.local",
+                                  {'full_name': deputy['full_name']})
+        server.query("UPDATE user_profiles SET full_name = ?, governorate_id = ?, party_id = ?, "
+                     "avatar_url = ?, role = ? WHERE id = ?",
+                     (deputy['full_name'], deputy['governorate_id'], deputy['party_id'],
+                      deputy['avatar_url'], deputy['role'], user['id']))
+        server.query("INSERT INTO deputy_profiles (id, user_id, slug, candidate_type, electoral_district_id, "
+                     "council_id, party_id, deputy_status) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                     (str(uuid.uuid4()), user['id'], f"{deputy['slug']}-copy-{number}",
+                      deputy['candidate_type'], deputy['electoral_district_id'], deputy['council_id'],
+                      deputy['party_id'], deputy['deputy_status']))
+    return len(copies)
+
+
+def run_script(server, workdir, script, args, log_name):
+    """Run a script against the server; returns (exit code, seconds, log path)"""
+    env = dict(os.environ, **server.env(),
+               NAEBAK_DATA_DIR=os.path.join(workdir, 'data'),
+               NAEBAK_STATE_DIR=os.path.join(workdir, 'state'),
+               PYTHONUNBUFFERED='1')
+    log = os.path.join(workdir, log_name)
+    start = time.perf_counter()
+    with open(log, 'w', encoding='utf-8') as output:
+        process = subprocess.run([sys.executable, os.path.join(SCRIPTS_DIR, script), *args],
+                                 cwd=SCRIPTS_DIR, env=env, stdout=output, stderr=subprocess.STDOUT)
+    return process.returncode, time.perf_counter() - start, log
+
+
+def final_metrics(path):
+    """The last record of a metrics file, or {} when the script wrote none"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            lines = [line for line in f if line.strip()]
+    except OSError:
+        return {}
+    return json.loads(lines[-1]) if lines else {}
+
+
+def run_scenario(name, args, faults, script_args, workdir):
+    scenario = SCENARIOS[name]
+    workdir = os.path.join(workdir, name)
+    os.makedirs(workdir)
+    write_source(os.path.join(workdir, 'data'), args.rows, args.synthetic, args.seed)
+
+    with LocalSupabase(os.path.join(workdir, 'supabase.sqlite'), seed=args.seed) as server:
+        server.seed_reference()
+        for number, script in enumerate(scenario.prepare, 1):
+            code, seconds, log = run_script(server, workdir, script, PREPARE_ARGS, f'prepare-{number}.log')
+            if code:
+                raise RuntimeError(f"preparing {name}: {script} exited with {code}, see {log}")
+            print(f"   🧰 {script}: {format_duration(seconds)}")
+        if scenario.duplicates:
+            print(f"   🧬 {inject_duplicates(server, args.duplicates, args.seed)} نسخة مكررة")
+
+        server.faults = faults
+        server.reset_counters()
+        metrics = os.path.join(workdir, 'metrics.jsonl')
+        code, seconds, log = run_script(server, workdir, scenario.script,
+                                        [*script_args, '--metrics', metrics], 'run.log')
+        record = final_metrics(metrics)
+        result = Result(name, scenario.script, code, seconds,
+                        rows=record.get('done', 0),
+                        ok=record.get('ok', record.get('deleted', 0)),
+                        errors=record.get('errors', 0),
+                        requests=dict(server.requests), throttled=dict(server.throttled),
+                        retries=record.get('retries', {}), log=log)
+        result.rows_per_sec = result.rows / seconds if seconds else 0.0
+        counts = server.table_counts()
+    print(f"   📦 بعد التشغيل: {counts['deputy_profiles']} deputy_profiles، {counts['auth.users']} Auth users")
+    return result
+
+
+def print_results(results, baseline=None):
+    baseline = {result['scenario']: result for result in baseline or []}
+    print(f"\n   {'السيناريو':<10}{'المدة':>9}{'صفوف':>8}{'نجح':>8}{'فشل':>6}{'صف/ث':>9}{'طلبات':>8}{'429':>6}")
+    for result in results:
+        line = (f"   {result.scenario:<10}{format_duration(result.seconds):>9}{result.rows:>8}{result.ok:>8}"
+                f"{result.errors:>6}{result.rows_per_sec:>9.1f}{result.total_requests:>8}"
+                f"{sum(result.throttled.values()):>6}")
+        before = baseline.get(result.scenario)
+        if before and before['rows_per_sec']:
+            change = 100 * (result.rows_per_sec / before['rows_per_sec'] - 1)
+            line += f"   ({change:+.0f}% صف/ث، {result.total_requests - sum(before['requests'].values()):+d} طلب)"
+        print(line)
+        if result.exit_code:
+            print(f"      ❌ {result.script} انتهى بالرمز {result.exit_code}: {result.log}")
+
+    for result in results:
+        print(f"\n   {result.scenario} ({result.script}):")
+        for endpoint, count in sorted(result.requests.items(), key=lambda item: -item[1]):
+            throttled = result.throttled.get(endpoint)
+            print(f"      {endpoint:<34}{count:>7}" + (f"  (429×{throttled})" if throttled else ''))
+        if result.retries:
+            print("      🔁 " + ", ".join(f"{reason}×{count}" for reason, count in result.retries.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='قياس أداء السكريبتات محلياً على بديل Supabase',
+        epilog='scenarios: ' + '; '.join(f'{name}: {s.description}' for name, s in SCENARIOS.items()))
+    parser.add_argument('scenarios', nargs='*', metavar='SCENARIO',
+                        help=f"scenarios to run (default: import dedupe; choices: {', '.join(SCENARIOS)})")
+    parser.add_argument('--rows', type=int, help=f'use only the first ROWS rows of {INDIVIDUAL_SHEET}')
+    parser.add_argument('--synthetic', type=int, metavar='ROWS',
+                        help='use a generated individual sheet of ROWS rows (see generate_candidates.py)')
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds added to every REST request (default: 0.05)')
+    parser.add_argument('--auth-latency', type=float, default=0.1,
+                        help='seconds added to every auth request (default: 0.1)')
+    parser.add_argument('--row-latency', type=float, default=0.0005,
+                        help='seconds added per row a REST request writes or returns (default: 0.0005)')
+    parser.add_argument('--jitter', type=float, default=0.25, help='latency jitter fraction (default: 0.25)')
+    parser.add_argument('--rest-429', type=float, default=0.0, help='probability of a 429 per REST request')
+    parser.add_argument('--auth-429', type=float, default=0.0, help='probability of a 429 per auth request')
+    parser.add_argument('--auth-rate-limit', type=float,
+                        help='auth requests per second above which the server answers 429')
+    parser.add_argument('--duplicates', type=float, default=0.1,
+                        help='fraction of candidates copied for the dedupe scenario (default: 0.1)')
+    parser.add_argument('--seed', type=int, default=1, help='random seed for jitter, 429s and duplicates')
+    parser.add_argument('--json', metavar='FILE', help='save the results as JSON')
+    parser.add_argument('--compare', metavar='FILE', help='show the change against results saved with --json')
+    parser.add_argument('--keep', action='store_true', help='keep the databases, logs and metrics')
+    argv = sys.argv[1:]
+    split = argv.index('--') if '--' in argv else len(argv)
+    args, script_args = parser.parse_args(argv[:split]), argv[split + 1:]
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario: {', '.join(unknown)}")
+
+    faults = Faults(latency=args.latency, auth_latency=args.auth_latency, row_latency=args.row_latency,
+                    jitter=args.jitter, rest_429=args.rest_429, auth_429=args.auth_429,
+                    auth_rate_limit=args.auth_rate_limit)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+
+    print("=" * 80)
+    print("⏱️  قياس الأداء على بديل Supabase المحلي")
+    print("=" * 80)
+    print(f"   {faults}")
+
+    workdir = tempfile.mkdtemp(prefix='naebak-benchmark-')
+    results = []
+    try:
+        for name in args.scenarios or ['import', 'dedupe']:
+            print(f"\n▶️  {name}: {SCENARIOS[name].description}")
+            results.append(run_scenario(name, args, faults, script_args, workdir))
+    finally:
+        if args.keep:
+            print(f"\n📁 الملفات: {workdir}")
+        elif not any(result.exit_code for result in results):
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print_results(results, baseline)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'faults': vars(faults), 'rows': args.rows, 'synthetic': args.synthetic, 'script_args': script_args,
+                       'results': [{**vars(result), 'total_requests': result.total_requests}
+                                   for result in results]}, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 {args.json}")
+    print("\n" + "=" * 80)
+    sys.exit(1 if any(result.exit_code for result in results) else 0)
+
+
+if __name__ == '__main__':
+    main()
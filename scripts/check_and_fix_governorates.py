@@ -3,27 +3,29 @@
 Check governorate names in Excel and create a mapping/fix script
 """
 
-import pandas as pd
 import os
 
+from naebak_import import data_path, read_sheet
+
 # Read the Excel file
-excel_file = '/home/ubuntu/naebak-xx/data/جميعالمرشحين.xlsx'
+excel_file = data_path('جميعالمرشحين.xlsx')
 
 print("\n" + "="*80)
 print("🔍 فحص أسماء المحافظات في ملف Excel")
 print("="*80 + "\n")
 
 # Read Excel
-df = pd.read_excel(excel_file)
+df = read_sheet(excel_file)
 
-# Get unique governorate names
-unique_governorates = df['المحافظة'].unique()
+# Count every governorate name in one pass
+governorate_counts = df['المحافظة'].value_counts()
+unique_governorates = governorate_counts.index
 
 print(f"📊 عدد المحافظات الفريدة في الملف: {len(unique_governorates)}\n")
 print("📋 قائمة المحافظات:")
 print("-" * 80)
 for i, gov in enumerate(sorted(unique_governorates), 1):
-    count = len(df[df['المحافظة'] == gov])
+    count = governorate_counts[gov]
     print(f"{i:2}. {gov:30} ({count:4} مرشح)")
 print("-" * 80)
 
@@ -75,11 +77,11 @@ needs_fix = []
 for gov in unique_governorates:
     if gov in GOVERNORATE_MAPPING:
         correct_name = GOVERNORATE_MAPPING[gov]
-        count = len(df[df['المحافظة'] == gov])
+        count = governorate_counts[gov]
         print(f"  ❌ '{gov}' → ✅ '{correct_name}' ({count} مرشح)")
         needs_fix.append((gov, correct_name, count))
     elif gov not in CORRECT_GOVERNORATES:
-        count = len(df[df['المحافظة'] == gov])
+        count = governorate_counts[gov]
         print(f"  ⚠️  '{gov}' - اسم غير معروف ({count} مرشح)")
         needs_fix.append((gov, None, count))
 
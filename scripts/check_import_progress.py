@@ -3,37 +3,31 @@
 Check import progress in database
 """
 
-import os
-from supabase import create_client, Client
+from naebak_import import INDIVIDUAL, get_client, data_path, reconcile
 
-# Supabase configuration
-SUPABASE_URL = os.getenv('SUPABASE_URL')
-SUPABASE_SERVICE_KEY = os.getenv('SUPABASE_SERVICE_KEY')
-
-if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
-    print("❌ Error: SUPABASE_URL and SUPABASE_SERVICE_KEY must be set")
-    exit(1)
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+supabase = get_client()
 
 # Count deputy profiles
 result = supabase.table('deputy_profiles').select('id', count='exact').execute()
 total_deputies = result.count
 
-# Count by candidate_type
-individual_result = supabase.table('deputy_profiles')\
-    .select('id', count='exact')\
-    .eq('candidate_type', 'individual')\
-    .execute()
-individual_count = individual_result.count
+# The spreadsheet is the target: diff it against the database once
+plan = reconcile(data_path('جميعالمرشحين.xlsx'), INDIVIDUAL)
+target = plan.source_rows - len(plan.conflicts)
 
 print("\n" + "="*60)
 print("📊 حالة الاستيراد الحالية")
 print("="*60)
 print(f"\n✅ إجمالي المرشحين في قاعدة البيانات: {total_deputies}")
-print(f"   • مرشحين أفراد: {individual_count}")
-print(f"   • الهدف: 2,620 مرشح فردي")
-print(f"   • المتبقي: {2620 - individual_count}")
-print(f"   • نسبة الإنجاز: {(individual_count / 2620 * 100):.1f}%")
+print(f"   • مرشحين أفراد: {plan.db_rows}")
+print(f"   • الهدف: {target:,} مرشح فردي")
+print(f"   • تم استيراده: {plan.matched}")
+print(f"   • المتبقي: {len(plan.inserts)}")
+print(f"   • نسبة الإنجاز: {(plan.matched / max(target, 1) * 100):.1f}%")
+if plan.updates:
+    print(f"   • يحتاج تحديث: {len(plan.updates)}")
+if plan.deletes:
+    print(f"   • زائد (مكرر أو غير موجود في الملف): {len(plan.deletes)}")
+if plan.conflicts:
+    print(f"   • يحتاج مراجعة: {len(plan.conflicts)} (شغّل reconcile_candidates.py)")
 print("\n" + "="*60 + "\n")
-
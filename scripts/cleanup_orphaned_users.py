@@ -1,71 +1,96 @@
 #!/usr/bin/env python3
-import os
-from supabase import create_client
+from naebak_import import (
+    AUTH_USERS,
+    ORPHAN_CLASSES,
+    build_delete_parser,
+    delete_options,
+    add_plan_options,
+    scan_integrity,
+    repair,
+    CostEstimate,
+    load_snapshot,
+    offline,
+    estimate_deletion,
+)
 
-SUPABASE_URL = os.getenv('SUPABASE_URL')
-SUPABASE_SERVICE_KEY = os.getenv('SUPABASE_SERVICE_KEY')
-
-supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+parser = build_delete_parser('حذف Auth users بلا ملف شخصي')
+parser.add_argument('--profiles', action='store_true',
+                    help='also delete user_profiles / deputy_profiles rows whose user no longer exists')
+add_plan_options(parser)
+args = parser.parse_args()
 
 print("\n" + "="*80)
 print("🧹 تنظيف Auth users اليتامى")
 print("="*80 + "\n")
 
-# Get all auth users
-print("📖 جلب جميع Auth users...")
-auth_users = supabase.auth.admin.list_users()
-print(f"   • إجمالي Auth users: {len(auth_users)}\n")
+# Auth users, user_profiles and deputy_profiles are streamed in parallel and
+# compared as sorted id arrays: every page of every table, one pass
+print("📖 فحص Auth users و user_profiles و deputy_profiles...")
+if args.plan:
+    snapshot = load_snapshot(refresh=args.refresh_snapshot)
+    with offline(snapshot):
+        report = scan_integrity(prefetch=False)
+else:
+    report = scan_integrity()
+report.print_summary()
+print()
 
-# Get all user_profiles
-print("📖 جلب جميع user_profiles...")
-profiles_result = supabase.table('user_profiles').select('id').execute()
-profile_ids = set([p['id'] for p in profiles_result.data])
-print(f"   • إجمالي user_profiles: {len(profile_ids)}\n")
+orphaned = report.orphans['auth_without_profile']
+print(f"🔍 وجدت {len(orphaned)} Auth user يتيم\n")
 
-# Find orphaned users
-orphaned = []
-for user in auth_users:
-    if user.id not in profile_ids:
-        orphaned.append(user)
+# Show sample of every class that has orphans
+for orphan_class, label in ORPHAN_CLASSES.items():
+    ids = report.orphans[orphan_class]
+    if not ids:
+        continue
+    print(f"📋 {label} (أول 10):")
+    print("-" * 80)
+    for i, orphan_id in enumerate(ids[:10], 1):
+        print(f"{i:2}. {orphan_id[:8]}...")
+    if len(ids) > 10:
+        print(f"... و {len(ids) - 10} آخرين")
+    print()
 
-print(f"🔍 وجدت {len(orphaned)} Auth user يتيم\n")
+if report.orphans['deputy_user_without_deputy_profile']:
+    print("ℹ️  المستخدمون بدور deputy بلا deputy_profiles يُصلحون بـ fix_missing_deputy_profiles.py\n")
 
-if not orphaned:
-    print("✅ لا توجد Auth users يتامى!")
+dangling = report.count('profile_without_auth') + report.count('deputy_without_profile')
+if not orphaned and not (args.profiles and dangling) and not args.resume:
+    print("✅ لا يوجد شيء للحذف!")
     print("\n" + "="*80 + "\n")
     exit(0)
 
-# Show sample
-print("📋 عينة من Auth users اليتامى (أول 10):")
-print("-" * 80)
-for i, user in enumerate(orphaned[:10], 1):
-    email = user.email if hasattr(user, 'email') else 'N/A'
-    print(f"{i:2}. {user.id[:8]}... | {email}")
-
-if len(orphaned) > 10:
-    print(f"... و {len(orphaned) - 10} user آخر")
+print(f"🗑️  سيتم حذف {len(orphaned)} Auth user يتيم")
+if args.profiles:
+    print(f"🗑️  سيتم حذف {dangling} ملف شخصي بلا مستخدم")
+elif dangling:
+    print(f"ℹ️  {dangling} ملف شخصي بلا مستخدم (استخدم --profiles لحذفها)")
+print()
 
-print("-" * 80)
-print(f"\n🗑️  سيتم حذف {len(orphaned)} Auth user يتيم\n")
-
-# Delete orphaned users
-deleted_count = 0
-error_count = 0
+if args.plan:
+    cost = CostEstimate()
+    cost.read(snapshot, AUTH_USERS)
+    cost.read(snapshot, 'user_profiles')
+    cost.read(snapshot, 'deputy_profiles')
+    estimate_deletion(len(orphaned), profiles=False, cost=cost, **delete_options(args))
+    if args.profiles:
+        estimate_deletion(dangling, auth=False, cost=cost, **delete_options(args))
+    cost.print_summary()
+    print("\n" + "="*80 + "\n")
+    exit(0)
 
+# Orphans go in chunks: auth users on the bounded pool, profile rows with in_()
 print("🔄 بدء الحذف...\n")
-
-for i, user in enumerate(orphaned, 1):
-    try:
-        supabase.auth.admin.delete_user(user.id)
-        deleted_count += 1
-        
-        if i % 50 == 0:
-            print(f"   ✅ تم حذف {deleted_count}/{len(orphaned)} user...")
-    except Exception as e:
-        error_count += 1
+results = repair(report, profiles=args.profiles, **delete_options(args))
 
 print(f"\n✅ اكتمل الحذف!")
 print("-" * 80)
-print(f"   • تم الحذف بنجاح: {deleted_count}")
-print(f"   • فشل الحذف: {error_count}")
+if 'auth_without_profile' in results:
+    stats = results['auth_without_profile']
+    print(f"   • Auth users تم حذفها: {stats.auth}")
+    print(f"   • فشل الحذف: {stats.errors}")
+if 'dangling_profiles' in results:
+    stats = results['dangling_profiles']
+    print(f"   • ملفات شخصية تم حذفها: {stats.profiles}")
+    print(f"   • فشل الحذف: {stats.errors}")
 print("\n" + "="*80 + "\n")
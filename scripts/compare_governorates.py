@@ -3,14 +3,17 @@
 Compare governorate names between database and Excel file
 """
 
-import pandas as pd
+import os
+
+from naebak_import import SCRIPTS_DIR, data_path, read_sheet, normalize_arabic, normalize_series
 
 # Read the Excel file
-excel_file = '/home/ubuntu/naebak-xx/data/جميعالمرشحين.xlsx'
-df = pd.read_excel(excel_file)
+excel_file = data_path('جميعالمرشحين.xlsx')
+df = read_sheet(excel_file)
 
-# Get unique governorate names from Excel
-excel_governorates = sorted(df['المحافظة'].unique())
+# Count every governorate name in one pass
+excel_counts = df['المحافظة'].value_counts()
+excel_governorates = sorted(excel_counts.index)
 
 # الأسماء الصحيحة للمحافظات (27 محافظة مصرية)
 # يجب أن تكون هذه متطابقة تماماً مع قاعدة البيانات
@@ -51,44 +54,32 @@ print("="*100 + "\n")
 print(f"{'#':<4} {'Excel':^35} | {'قاعدة البيانات':^35} | {'الحالة':^15}")
 print("-"*100)
 
+# Normalized spelling -> correct name, built once
+correct_by_normalized = {normalize_arabic(name): name for name in CORRECT_GOVERNORATES}
+excel_normalized = normalize_series(excel_counts.index.to_series())
+
 # Create mapping
 mapping = {}
 for i, excel_name in enumerate(excel_governorates, 1):
-    count = len(df[df['المحافظة'] == excel_name])
-    
-    # Try to find matching name
-    matched = False
-    correct_name = None
+    count = excel_counts[excel_name]
     
     # Exact match
     if excel_name in CORRECT_GOVERNORATES:
         status = "✅ متطابق"
         correct_name = excel_name
-        matched = True
     else:
-        # Try to find similar name
-        excel_normalized = excel_name.replace('ه', 'ة').replace('ى', 'ي').replace('أ', 'ا')
-        
-        for correct in CORRECT_GOVERNORATES:
-            correct_normalized = correct.replace('ه', 'ة').replace('ى', 'ي').replace('أ', 'ا')
-            if excel_normalized == correct_normalized:
-                status = f"⚠️  يحتاج تصحيح"
-                correct_name = correct
-                matched = True
-                mapping[excel_name] = correct_name
-                break
+        # Same name once hamza / taa marbuta / alef maqsura are normalized
+        correct_name = correct_by_normalized.get(excel_normalized[excel_name])
         
-        if not matched:
+        if not correct_name:
             # Check if it's a partial match
-            for correct in CORRECT_GOVERNORATES:
-                if excel_name in correct or correct in excel_name:
-                    status = f"⚠️  يحتاج تصحيح"
-                    correct_name = correct
-                    matched = True
-                    mapping[excel_name] = correct_name
-                    break
+            correct_name = next((correct for correct in CORRECT_GOVERNORATES
+                                 if excel_name in correct or correct in excel_name), None)
         
-        if not matched:
+        if correct_name:
+            status = f"⚠️  يحتاج تصحيح"
+            mapping[excel_name] = correct_name
+        else:
             status = "❌ غير موجود"
             correct_name = "؟؟؟"
     
@@ -105,7 +96,7 @@ if mapping:
     print("-"*100)
     total_affected = 0
     for excel_name, correct_name in mapping.items():
-        count = len(df[df['المحافظة'] == excel_name])
+        count = excel_counts[excel_name]
         total_affected += count
         print(f"   '{excel_name}' → '{correct_name}' ({count} مرشح)")
     print(f"\n   📊 إجمالي المرشحين المتأثرين: {total_affected}")
@@ -118,7 +109,7 @@ print("\n" + "="*100 + "\n")
 if mapping:
     print("💾 حفظ التصحيحات في ملف...")
     import json
-    with open('/home/ubuntu/naebak-xx/scripts/governorate_mapping.json', 'w', encoding='utf-8') as f:
+    with open(os.path.join(SCRIPTS_DIR, 'governorate_mapping.json'), 'w', encoding='utf-8') as f:
         json.dump(mapping, f, ensure_ascii=False, indent=2)
     print("✅ تم الحفظ في: scripts/governorate_mapping.json\n")
 
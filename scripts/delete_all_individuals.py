@@ -1,59 +1,45 @@
 #!/usr/bin/env python3
-import os
-from supabase import create_client
-
-SUPABASE_URL = os.getenv('SUPABASE_URL')
-SUPABASE_SERVICE_KEY = os.getenv('SUPABASE_SERVICE_KEY')
-
-supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+from naebak_import import (
+    fetch_all,
+    build_delete_parser,
+    delete_options,
+    add_plan_options,
+    CascadeDeleter,
+    CostEstimate,
+    load_snapshot,
+    offline,
+    estimate_deletion,
+)
+
+args = add_plan_options(build_delete_parser('حذف جميع المرشحين الأفراد')).parse_args()
 
 print("\n" + "="*80)
 print("🗑️  حذف جميع المرشحين الأفراد")
 print("="*80 + "\n")
 
+if args.plan:
+    snapshot = load_snapshot(refresh=args.refresh_snapshot)
+    with offline(snapshot):
+        all_deputies = fetch_all('deputy_profiles', 'id, user_id', candidate_type='individual')
+    print(f"\n🗑️  سيتم حذف {len(all_deputies)} مرشح فردي مع ملفاتهم الشخصية و Auth users\n")
+    cost = CostEstimate()
+    cost.read(snapshot, 'deputy_profiles', candidate_type='individual')
+    estimate_deletion(len(all_deputies), cost=cost, **delete_options(args))
+    cost.print_summary()
+    print("\n" + "="*80 + "\n")
+    exit(0)
+
 # Get all individual deputies
 print("📖 جلب جميع المرشحين الأفراد...")
-all_deputies = []
-batch_size = 1000
-offset = 0
-
-count_result = supabase.table('deputy_profiles').select('id', count='exact').eq('candidate_type', 'individual').execute()
-total_count = count_result.count
-print(f"   • إجمالي المرشحين: {total_count}\n")
-
-while offset < total_count:
-    result = supabase.table('deputy_profiles').select('id, user_id').eq('candidate_type', 'individual').range(offset, offset + batch_size - 1).execute()
-    all_deputies.extend(result.data)
-    offset += batch_size
+all_deputies = fetch_all('deputy_profiles', 'id, user_id', candidate_type='individual')
 
 print(f"✅ تم جلب {len(all_deputies)} مرشح\n")
 print("🔄 بدء الحذف...\n")
 
-deleted_count = 0
-
-for i, deputy in enumerate(all_deputies, 1):
-    try:
-        user_id = deputy['user_id']
-        
-        # Delete deputy_profile
-        supabase.table('deputy_profiles').delete().eq('id', deputy['id']).execute()
-        
-        # Delete user_profile
-        supabase.table('user_profiles').delete().eq('id', user_id).execute()
-        
-        # Delete auth user
-        try:
-            supabase.auth.admin.delete_user(user_id)
-        except:
-            pass
-        
-        deleted_count += 1
-        
-        if i % 100 == 0:
-            print(f"   ✅ تم حذف {deleted_count}/{len(all_deputies)} مرشح...")
-    except Exception as e:
-        print(f"   ❌ خطأ: {e}")
+# Profiles go in chunked in_() deletes, auth users on a bounded pool
+deleter = CascadeDeleter('delete_all_individuals', **delete_options(args))
+stats = deleter.run([deputy['user_id'] for deputy in all_deputies])
 
 print(f"\n✅ اكتمل الحذف!")
-print(f"   • تم حذف {deleted_count} مرشح\n")
+print(f"   • تم حذف {stats.auth} مرشح\n")
 print("="*80 + "\n")
@@ -3,19 +3,21 @@
 Find candidates that are in Excel but not in database
 """
 
-import os
-from supabase import create_client, Client
-import pandas as pd
+import argparse
 
-# Supabase configuration
-SUPABASE_URL = os.getenv('SUPABASE_URL')
-SUPABASE_SERVICE_KEY = os.getenv('SUPABASE_SERVICE_KEY')
+from naebak_import import (
+    DEFAULT_MIN_SCORE,
+    INDIVIDUAL,
+    REASON_SIMILAR_NAME,
+    data_path,
+    read_sheet,
+    reconcile,
+)
 
-if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
-    print("❌ Error: SUPABASE_URL and SUPABASE_SERVICE_KEY must be set")
-    exit(1)
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+parser = argparse.ArgumentParser(description='البحث عن المرشحين الناقصين')
+parser.add_argument('--min-score', type=float, default=DEFAULT_MIN_SCORE,
+                    help=f'fuzzy match score that counts as the same name (default: {DEFAULT_MIN_SCORE})')
+args = parser.parse_args()
 
 print("\n" + "="*80)
 print("🔍 البحث عن المرشحين الناقصين")
@@ -23,56 +25,41 @@ print("="*80 + "\n")
 
 # Read Excel file
 print("📖 قراءة ملف Excel...")
-excel_file = '/home/ubuntu/naebak-xx/data/جميعالمرشحين.xlsx'
-df = pd.read_excel(excel_file)
-excel_names = set(df['اسم المرشح'].tolist())
-print(f"   • عدد المرشحين في Excel: {len(excel_names)}\n")
-
-# Get all names from database
-print("📖 قراءة الأسماء من قاعدة البيانات...")
-all_deputies = []
-batch_size = 1000
-offset = 0
+excel_file = data_path('جميعالمرشحين.xlsx')
+df = read_sheet(excel_file)
+print(f"   • عدد الصفوف في Excel: {len(df)}\n")
 
-count_result = supabase.table('deputy_profiles')\
-    .select('id', count='exact')\
-    .eq('candidate_type', 'individual')\
-    .execute()
-total_count = count_result.count
-
-while offset < total_count:
-    result = supabase.table('deputy_profiles')\
-        .select('user_profiles!inner(full_name)')\
-        .eq('candidate_type', 'individual')\
-        .range(offset, offset + batch_size - 1)\
-        .execute()
-    
-    all_deputies.extend(result.data)
-    offset += batch_size
+# One read of the database, hash-joined against the sheet by candidate identity
+print("📖 مقارنة الملف بقاعدة البيانات...")
+plan = reconcile(df, INDIVIDUAL, min_score=args.min_score)
+print(f"   • عدد المرشحين في قاعدة البيانات: {plan.db_rows}\n")
 
-db_names = set([d['user_profiles']['full_name'] for d in all_deputies if d.get('user_profiles')])
-print(f"   • عدد المرشحين في قاعدة البيانات: {len(db_names)}\n")
+# Near matches in the same district are spelling differences, not missing rows
+similar = plan.by_reason(plan.conflicts, REASON_SIMILAR_NAME)
+if similar:
+    print(f"🔤 أسماء مشابهة في نفس الدائرة (ليست ناقصة، راجعها): {len(similar)}")
+    for item in sorted(similar, key=lambda item: item.score)[:20]:
+        print(f"   • {item.record.name} ≈ {item.existing.full_name} ({item.score:.2f})")
+    print()
 
-# Find missing
-missing_names = excel_names - db_names
-print(f"🔍 المرشحين الناقصين: {len(missing_names)}\n")
+missing = plan.inserts
+print(f"🔍 المرشحين الناقصين: {len(missing)}\n")
 
-if missing_names:
+if missing:
     print("📋 قائمة المرشحين الناقصين (أول 50):")
     print("-" * 80)
-    for i, name in enumerate(sorted(missing_names)[:50], 1):
-        # Find row in Excel
-        row = df[df['اسم المرشح'] == name].iloc[0]
-        print(f"{i:3}. {name}")
-        print(f"     • المحافظة: {row['المحافظة']}")
-        print(f"     • الدائرة: {row['دائرة فردي']}")
+    for i, item in enumerate(sorted(missing, key=lambda item: item.record.name)[:50], 1):
+        row = item.record
+        print(f"{i:3}. {row.name}")
+        print(f"     • المحافظة: {row.governorate}")
+        print(f"     • الدائرة: {row.district}")
     
-    if len(missing_names) > 50:
-        print(f"\n... و {len(missing_names) - 50} مرشح آخر")
+    if len(missing) > 50:
+        print(f"\n... و {len(missing) - 50} مرشح آخر")
     
     # Save to file
-    missing_df = df[df['اسم المرشح'].isin(missing_names)]
-    output_file = '/home/ubuntu/naebak-xx/data/missing_candidates.xlsx'
+    missing_df = df.loc[[item.row_index for item in missing]]
+    output_file = data_path('missing_candidates.xlsx')
     missing_df.to_excel(output_file, index=False)
     print(f"\n💾 تم حفظ المرشحين الناقصين في: {output_file}")
 else:
@@ -3,15 +3,16 @@
 Fix governorate names in Excel file
 """
 
-import pandas as pd
 import json
 import os
 from datetime import datetime
 
+from naebak_import import SCRIPTS_DIR, data_path, read_sheet
+
 # Paths
-excel_file = '/home/ubuntu/naebak-xx/data/جميعالمرشحين.xlsx'
-mapping_file = '/home/ubuntu/naebak-xx/scripts/governorate_mapping.json'
-backup_file = f'/home/ubuntu/naebak-xx/data/جميعالمرشحين_backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
+excel_file = data_path('جميعالمرشحين.xlsx')
+mapping_file = os.path.join(SCRIPTS_DIR, 'governorate_mapping.json')
+backup_file = data_path(f'جميعالمرشحين_backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx')
 
 print("\n" + "="*80)
 print("🔧 تصحيح أسماء المحافظات في ملف Excel")
@@ -26,7 +27,7 @@ print(f"✅ تم تحميل {len(mapping)} تصحيح\n")
 
 # Read Excel
 print("📖 قراءة ملف Excel...")
-df = pd.read_excel(excel_file)
+df = read_sheet(excel_file)
 print(f"✅ تم قراءة {len(df)} صف\n")
 
 # Create backup
@@ -38,25 +39,29 @@ print(f"✅ تم الحفظ في: {os.path.basename(backup_file)}\n")
 print("🔧 تطبيق التصحيحات:")
 print("-"*80)
 
+governorate_counts = df['المحافظة'].value_counts()
 total_fixed = 0
 for old_name, new_name in mapping.items():
-    count = len(df[df['المحافظة'] == old_name])
+    count = governorate_counts.get(old_name, 0)
     if count > 0:
-        df.loc[df['المحافظة'] == old_name, 'المحافظة'] = new_name
         total_fixed += count
         print(f"  ✅ '{old_name}' → '{new_name}' ({count} مرشح)")
 
+# One replace pass over the column for every mapping
+df['المحافظة'] = df['المحافظة'].replace(mapping)
+
 print("-"*80)
 print(f"\n📊 إجمالي المرشحين المصححين: {total_fixed}\n")
 
 # Verify
 print("🔍 التحقق من النتائج:")
 print("-"*80)
-unique_governorates = sorted(df['المحافظة'].unique())
+governorate_counts = df['المحافظة'].value_counts()
+unique_governorates = sorted(governorate_counts.index)
 print(f"  • عدد المحافظات الفريدة بعد التصحيح: {len(unique_governorates)}")
 print(f"  • قائمة المحافظات:")
 for gov in unique_governorates:
-    count = len(df[df['المحافظة'] == gov])
+    count = governorate_counts[gov]
     print(f"    - {gov:30} ({count:4} مرشح)")
 print("-"*80 + "\n")
 
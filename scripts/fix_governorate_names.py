@@ -22,13 +22,14 @@ def fix_excel_file(file_path, column_name):
         return
     
     # Count changes
+    counts = df[column_name].value_counts()
     changes = 0
     for old_name, new_name in GOVERNORATE_MAPPING.items():
-        count = (df[column_name] == old_name).sum()
+        count = counts.get(old_name, 0)
         if count > 0:
-            df.loc[df[column_name] == old_name, column_name] = new_name
             changes += count
             print(f"   ✅ تم تعديل '{old_name}' → '{new_name}' ({count} صف)")
+    df[column_name] = df[column_name].replace(GOVERNORATE_MAPPING)
     
     if changes > 0:
         # Save back to Excel
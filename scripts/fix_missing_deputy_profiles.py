@@ -3,82 +3,105 @@
 Create deputy_profiles for users who have user_profiles but no deputy_profiles
 """
 
-import pandas as pd
-import os
-from supabase import create_client, Client
+import math
 
-# Supabase configuration
-SUPABASE_URL = os.getenv('SUPABASE_URL')
-SUPABASE_SERVICE_KEY = os.getenv('SUPABASE_SERVICE_KEY')
+from naebak_import import (
+    DEFAULT_CHUNK_SIZE,
+    INDIVIDUAL,
+    data_path,
+    read_rows,
+    count_rows,
+    build_parser,
+    add_plan_options,
+    get_client,
+    warm_up,
+    get_governorate_id,
+    create_or_get_electoral_district,
+    normalize_arabic,
+    ProfileWriter,
+    CostEstimate,
+    load_snapshot,
+    offline,
+)
 
-if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
-    print("❌ Error: SUPABASE_URL and SUPABASE_SERVICE_KEY must be set")
-    exit(1)
+supabase = get_client()
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+def plan_missing_deputy_profiles(chunk_size=DEFAULT_CHUNK_SIZE, refresh=False):
+    """--plan: the rows a run would fix and its requests, worked out from the snapshot"""
+    print("\n" + "="*80)
+    print("🔧 خطة إصلاح deputy_profiles الناقصة")
+    print("="*80 + "\n")
 
-# مجلس النواب ID
-COUNCIL_ID = 'ce2c7990-fe24-4550-a9d7-964ad4d65137'
+    source = data_path('missing_candidates.xlsx')
+    snapshot = load_snapshot(refresh)
+    tables = snapshot['tables']
+    # The run matches users by full name and takes the first one
+    users = {}
+    for user in tables['user_profiles']:
+        users.setdefault(user['full_name'], user['id'])
+    with_profile = {deputy['user_id'] for deputy in tables['deputy_profiles']}
 
-# Cache
-governorate_cache = {}
-district_cache = {}
+    rows = fixes = errors = checked = 0
+    new_districts = set()
+    with offline(snapshot):
+        warm_up()
+        for idx, row in read_rows(source, INDIVIDUAL):
+            rows += 1
+            user_id = users.get(row.name)
+            if not user_id:
+                errors += 1
+                continue
+            checked += 1
+            if user_id in with_profile:
+                continue
+            gov_id = get_governorate_id(row.governorate)
+            if not gov_id:
+                errors += 1
+                continue
+            if not create_or_get_electoral_district(row.district, gov_id, 'individual', create=False):
+                new_districts.add((normalize_arabic(row.district), gov_id))
+            fixes += 1
 
-def get_governorate_id(governorate_name):
-    """Get governorate ID by name"""
-    if governorate_name in governorate_cache:
-        return governorate_cache[governorate_name]
-    
-    try:
-        result = supabase.table('governorates').select('id').eq('name_ar', governorate_name).single().execute()
-        gov_id = result.data['id'] if result.data else None
-        governorate_cache[governorate_name] = gov_id
-        return gov_id
-    except:
-        return None
+    cost = CostEstimate()
+    for table in ('governorates', 'electoral_districts', 'parties'):
+        cost.read(snapshot, table)
+    # One lookup per row, and one profile check per user found
+    cost.add('select:user_profiles', rows)
+    cost.add('select:deputy_profiles', checked)
+    cost.add('upsert:electoral_districts', len(new_districts))
+    cost.add('upsert:deputy_profiles', math.ceil(fixes / max(1, chunk_size)))
 
-def create_or_get_electoral_district(name, governorate_id, district_type):
-    """Create or get electoral district"""
-    cache_key = f"{name}_{governorate_id}_{district_type}"
-    if cache_key in district_cache:
-        return district_cache[cache_key]
-    
-    try:
-        result = supabase.table('electoral_districts').select('id').eq('name', name).eq('governorate_id', governorate_id).eq('district_type', district_type).execute()
-        
-        if result.data and len(result.data) > 0:
-            district_id = result.data[0]['id']
-            district_cache[cache_key] = district_id
-            return district_id
-        
-        result = supabase.table('electoral_districts').insert({'name': name, 'governorate_id': governorate_id, 'district_type': district_type}).execute()
-        
-        district_id = result.data[0]['id']
-        district_cache[cache_key] = district_id
-        return district_id
-    except Exception as e:
-        return None
+    print(f"\n   • صفوف المصدر: {rows}")
+    print(f"   ➕ deputy_profiles تُنشأ: {fixes}")
+    print(f"   ➕ دوائر جديدة: {len(new_districts)}")
+    print(f"   ❌ بلا مستخدم أو محافظة: {errors}")
+    cost.print_summary()
+    print("\n" + "="*80 + "\n")
 
-def fix_missing_deputy_profiles():
+def fix_missing_deputy_profiles(chunk_size=DEFAULT_CHUNK_SIZE):
     """Create deputy_profiles for existing user_profiles"""
     print("\n" + "="*80)
     print("🔧 إصلاح deputy_profiles الناقصة")
     print("="*80 + "\n")
     
-    missing_file = '/home/ubuntu/naebak-xx/data/missing_candidates.xlsx'
-    df = pd.read_excel(missing_file)
-    print(f"📖 عدد المرشحين الناقصين: {len(df)}\n")
+    source = data_path('missing_candidates.xlsx')
+    total = count_rows(source, INDIVIDUAL)
+    print(f"📖 عدد المرشحين الناقصين: {total}\n")
+    
+    warm_up()
+    writer = ProfileWriter(chunk_size=chunk_size)
+    queued = set()
     
     success_count = 0
     error_count = 0
     
     print("🚀 بدء الإصلاح...\n")
     
-    for idx, row in df.iterrows():
+    for idx, row in read_rows(source, INDIVIDUAL):
         try:
-            candidate_name = row['اسم المرشح']
-            governorate_name = row['المحافظة']
-            district_name = row['دائرة فردي']
+            candidate_name = row.name
+            governorate_name = row.governorate
+            district_name = row.district
             
             user_result = supabase.table('user_profiles').select('id, governorate_id').eq('full_name', candidate_name).execute()
             
@@ -105,16 +128,20 @@ def fix_missing_deputy_profiles():
             
             slug = f"candidate-{user_id[:8]}"
             
-            supabase.table('deputy_profiles').insert({'user_id': user_id, 'slug': slug, 'electoral_district_id': district_id, 'candidate_type': 'individual', 'deputy_status': 'candidate', 'council_id': COUNCIL_ID}).execute()
-            
-            success_count += 1
+            writer.add_deputy_profile(idx, user_id, slug, district_id, 'individual')
+            queued.add(idx)
             
             if (idx + 1) % 10 == 0:
-                print(f"   📊 {idx + 1}/{len(df)} | ✅ {success_count} | ❌ {error_count}")
+                print(f"   📊 {idx + 1}/{total} | ⏳ {len(queued)} | ❌ {error_count}")
             
         except Exception as e:
             error_count += 1
     
+    writer.flush()
+    writer.print_failures()
+    success_count = len(queued - writer.failed_rows)
+    error_count += len(queued & writer.failed_rows)
+    
     print("\n" + "="*80)
     print("✅ اكتمل الإصلاح!")
     print("="*80)
@@ -131,4 +158,8 @@ def fix_missing_deputy_profiles():
     print("="*80 + "\n")
 
 if __name__ == "__main__":
-    fix_missing_deputy_profiles()
+    args = add_plan_options(build_parser('إنشاء deputy_profiles الناقصة')).parse_args()
+    if args.plan:
+        plan_missing_deputy_profiles(chunk_size=args.chunk_size, refresh=args.refresh_snapshot)
+    else:
+        fix_missing_deputy_profiles(chunk_size=args.chunk_size)
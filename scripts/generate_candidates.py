@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Write a synthetic candidate spreadsheet in the layout of the real ones
+(individual: جميعالمرشحين, list: جميعمرشحيالقوائم, senate: senate_members)
+with injected spelling variants and duplicates, for stress tests:
+
+    python3 generate_candidates.py individual --rows 250000 --truth truth.csv
+"""
+
+import argparse
+import time
+
+from naebak_import import (
+    DEFAULT_DUPLICATE_RATE,
+    DEFAULT_VARIANT_RATE,
+    INDIVIDUAL,
+    LIST,
+    SENATE,
+    CandidateGenerator,
+    data_path,
+    format_duration,
+    write_workbook,
+)
+
+FORMATS = {fmt.name: fmt for fmt in (INDIVIDUAL, LIST, SENATE)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='توليد ملف مرشحين تجريبي بنفس أعمدة الملفات الحقيقية')
+    parser.add_argument('kind', choices=list(FORMATS), help='spreadsheet layout')
+    parser.add_argument('--rows', type=int, default=26200, help='rows to write (default: 26200, 10x production)')
+    parser.add_argument('--output', help='workbook to write (default: data/synthetic_<kind>.xlsx)')
+    parser.add_argument('--duplicates', type=float, default=DEFAULT_DUPLICATE_RATE,
+                        help=f'share of rows repeating an earlier candidate (default: {DEFAULT_DUPLICATE_RATE})')
+    parser.add_argument('--variants', type=float, default=DEFAULT_VARIANT_RATE,
+                        help=f'share of names and places spelled differently (default: {DEFAULT_VARIANT_RATE})')
+    parser.add_argument('--seed', type=int, default=1, help='random seed (default: 1)')
+    parser.add_argument('--truth', metavar='FILE', help='CSV of row, candidate number and kind of every row')
+    args = parser.parse_args()
+
+    fmt = FORMATS[args.kind]
+    output = args.output or data_path(f'synthetic_{args.kind}.xlsx')
+    generator = CandidateGenerator(seed=args.seed, duplicate_rate=args.duplicates, variant_rate=args.variants)
+
+    print(f"🧪 توليد {args.rows} صف ({args.kind}) ...")
+    start = time.perf_counter()
+    kinds = write_workbook(output, fmt, generator.rows(fmt, args.rows), truth_path=args.truth)
+    print(f"✅ {output} في {format_duration(time.perf_counter() - start)}")
+    print(f"   • مرشحون: {kinds['original']}")
+    print(f"   • مكرر حرفياً: {kinds['exact']}")
+    print(f"   • مكرر بتهجئة مختلفة: {kinds['variant']}")
+    print(f"   • مكرر في دائرة أخرى: {kinds['moved']}")
+    if args.truth:
+        print(f"   • الحقيقة: {args.truth}")
+
+
+if __name__ == '__main__':
+    main()
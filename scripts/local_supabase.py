@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Serve the local Supabase stand-in until Ctrl-C, to run any script against it
+by hand:
+
+    python3 local_supabase.py --db /tmp/naebak.sqlite --auth-429 0.05
+    export SUPABASE_URL=http://127.0.0.1:54321 SUPABASE_SERVICE_KEY=local-standin-service-key
+    python3 import_all_candidates.py
+"""
+
+import argparse
+import os
+import time
+
+from naebak_import.standin import Faults, LocalSupabase
+
+
+def main():
+    parser = argparse.ArgumentParser(description='بديل Supabase محلي (SQLite) للتجربة والقياس')
+    parser.add_argument('--db', default=':memory:', help='SQLite file (default: in memory)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=54321)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every REST request')
+    parser.add_argument('--auth-latency', type=float, help='seconds added to every auth request (default: --latency)')
+    parser.add_argument('--row-latency', type=float, default=0.0,
+                        help='seconds added per row a REST request writes or returns')
+    parser.add_argument('--jitter', type=float, default=0.0, help='latency jitter fraction')
+    parser.add_argument('--rest-429', type=float, default=0.0, help='probability of a 429 per REST request')
+    parser.add_argument('--auth-429', type=float, default=0.0, help='probability of a 429 per auth request')
+    parser.add_argument('--auth-rate-limit', type=float,
+                        help='auth requests per second above which the server answers 429')
+    args = parser.parse_args()
+
+    fresh = args.db == ':memory:' or not os.path.exists(args.db)
+    faults = Faults(latency=args.latency, auth_latency=args.auth_latency, row_latency=args.row_latency,
+                    jitter=args.jitter, rest_429=args.rest_429, auth_429=args.auth_429,
+                    auth_rate_limit=args.auth_rate_limit)
+    server = LocalSupabase(args.db, faults).start(args.host, args.port)
+    if fresh:
+        print(f"🏛️  تمت إضافة {server.seed_reference()} محافظة")
+    print(f"🚀 {server.url} ({args.db})")
+    print(f"   {faults}")
+    for name, value in server.env().items():
+        print(f"   export {name}={value}")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print("\n📊 الطلبات:")
+        for endpoint, count in sorted(server.requests.items(), key=lambda item: -item[1]):
+            throttled = server.throttled.get(endpoint)
+            print(f"   {endpoint:<34}{count:>7}" + (f"  (429×{throttled})" if throttled else ''))
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
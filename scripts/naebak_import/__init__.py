@@ -0,0 +1,124 @@
+"""
+Shared library for the candidate import and maintenance scripts.
+
+The CLI scripts in ``scripts/`` import their Supabase client, lookup caches
+and auth/profile helpers from here instead of carrying their own copies.
+Call ``warm_up()`` once before the row loop to load the lookup tables.
+"""
+
+from .config import (
+    COUNCIL_ID,
+    SENATE_COUNCIL_ID,
+    VIRTUAL_GOVERNORATE_ID,
+    DEFAULT_AVATAR_URL,
+    SCRIPTS_DIR,
+    DATA_DIR,
+    STATE_DIR,
+    SUPABASE_DB_URL,
+    data_path,
+    get_client,
+)
+from .arabic import normalize_arabic, normalize_series, normalize_frame
+from .db import PAGE_SIZE, stream_rows, fetch_all, fetch_rpc
+from .matching import DEFAULT_MIN_SCORE, NameIndex, canonical_name, name_score
+from .duplicates import find_duplicates, group_duplicates
+from .lookups import (
+    governorate_index,
+    district_index,
+    party_index,
+    warm_up,
+    get_governorate_id,
+    create_or_get_electoral_district,
+    get_party_id,
+)
+from .accounts import (
+    AUTH_USERS,
+    load_auth_users,
+    reload_auth_users,
+    known_auth_user,
+    stream_auth_users,
+    find_auth_user,
+    lookup_auth_user,
+    generate_temp_email,
+    generate_temp_password,
+    create_auth_user,
+    create_auth_users,
+)
+from .identity import (
+    identity_index,
+    candidate_identity,
+    identity_hash,
+    identity_email,
+    identity_slug,
+    load_identity_index,
+    index_profiles,
+    find_identity,
+)
+from .concurrency import DEFAULT_WORKERS, DEFAULT_RATE, TokenBucket
+from .aio import DEFAULT_MAX_IN_FLIGHT, AsyncEngine, get_engine, run_async
+from .profiles import user_profile_row, deputy_profile_row
+from .writer import DEFAULT_CHUNK_SIZE, DEFAULT_WRITE_CONCURRENCY, ProfileWriter
+from .pgload import PostgresLoader
+from .sources import SourceFormat, INDIVIDUAL, LIST, SENATE, read_rows, count_rows
+from .cache import read_sheet, file_hash
+from .importer import (
+    ImportStats,
+    Candidate,
+    resolve_candidate,
+    import_individual_candidates,
+    import_list_candidates,
+    import_senate_members,
+    import_records,
+)
+from .deletion import DEFAULT_DELETE_CHUNK, DeletionStats, CascadeDeleter
+from .ratings import (
+    DEFAULT_RATING_CHUNK,
+    DEFAULT_RATING_CONCURRENCY,
+    unrated_deputies,
+    generate_ratings,
+    set_ratings,
+    rating_stats,
+    rating_drift,
+    recompute_all_ratings,
+    recompute_rating,
+)
+from .integrity import ORPHAN_CLASSES, IntegrityReport, scan_integrity, repair
+from .reconcile import (
+    INSERT,
+    UPDATE,
+    DELETE,
+    CONFLICT,
+    REASON_MISSING,
+    REASON_CHANGED,
+    REASON_DUPLICATE,
+    REASON_NOT_IN_SOURCE,
+    REASON_UNRESOLVED,
+    REASON_SOURCE_DUPLICATE,
+    REASON_SIMILAR_NAME,
+    DbCandidate,
+    PlanItem,
+    ReconcilePlan,
+    DatabaseState,
+    reconcile,
+    apply_plan,
+)
+from .latency import timed
+from .telemetry import METRICS_DIR, Telemetry, stage
+from .planning import (
+    SNAPSHOT_TABLES,
+    CostEstimate,
+    load_snapshot,
+    offline,
+    estimate_import,
+    estimate_deletion,
+    plan_import,
+    format_duration,
+)
+from .synthetic import (
+    DEFAULT_DUPLICATE_RATE,
+    DEFAULT_VARIANT_RATE,
+    Vocabulary,
+    CandidateGenerator,
+    write_workbook,
+)
+from .cli import build_parser, import_options, add_plan_options, build_delete_parser, delete_options
@@ -0,0 +1,317 @@
+"""
+Temporary credentials and auth user creation for imported candidates.
+
+Existing auth users are looked up in an email -> id index that is built
+once per run from a paged ``auth.admin.list_users()`` scan and kept up to
+date as users are created, so existence checks are O(1) and see every page.
+A scan builds a new dict and swaps it in, so a concurrent reader never sees
+it half filled. An "already registered" answer triggers a rescan unless one
+started after its request was sent, so a burst of them costs one scan.
+Scan pages are retried on 429 / 5xx; a scan that still fails leaves the
+index as it was and each email is then asked of auth on its own.
+Bulk creation goes through the asyncio engine (``aio.py``), so up to
+``workers`` create requests are in flight at once; the import pipeline
+awaits ``create_auth_user_async()`` from its own worker tasks instead.
+"""
+
+import asyncio
+import random
+import string
+import threading
+import time
+from types import SimpleNamespace
+from slugify import slugify
+
+from .config import get_client
+from .db import prefetched, next_cursor, snapshot_rows
+from .latency import timed
+from .concurrency import DEFAULT_WORKERS, TokenBucket
+from .aio import get_engine, run_async, run_request
+
+# Users per page when scanning auth.admin.list_users()
+AUTH_PAGE_SIZE = 1000
+
+# Name of the auth users in a planning snapshot
+AUTH_USERS = 'auth.users'
+
+# GoTrue error codes for "a user with this email exists"
+ALREADY_REGISTERED = frozenset({'email_exists', 'user_already_exists'})
+
+# lowercase email -> auth user id (replaced as a whole by every scan: read it
+# through known_auth_user(), not a reference taken at import time)
+auth_user_index = {}
+_auth_loaded = False
+# The first scan failed: emails are looked up one at a time
+_index_failed = False
+# Held for a whole scan
+_auth_lock = threading.Lock()
+# Held to add one user or to swap the index
+_index_lock = threading.Lock()
+# Users created while a scan runs, merged into its result
+_created_during_scan = None
+# time.monotonic() at which the last completed scan started
+_scanned_at = None
+# Rescan running on the engine's loop, shared by the workers that asked for it
+_rescan = None
+
+
+def generate_temp_email(name, candidate_type, key=None):
+    """
+    Generate temporary email for candidate.
+
+    Pass the candidate's identity hash as key to get the same address on
+    every run; without it a random suffix is used.
+    """
+    slug = slugify(name, allow_unicode=False)
+    suffix = key or ''.join(random.choices(string.ascii_lowercase + string.digits, k=4))
+    return f"{slug}-{candidate_type}-{suffix}@temp.naebak.com"
+
+
+def generate_temp_password():
+    """Generate temporary password"""
+    return ''.join(random.choices(string.ascii_letters + string.digits, k=16))
+
+
+def load_auth_users(force=False):
+    """
+    Build the email -> id index from every page of auth users. Returns
+    False when it could not be loaded (find_auth_user() then asks per email).
+    """
+    with _auth_lock:
+        if not force and (_auth_loaded or _index_failed):
+            return _auth_loaded
+        if not _scan():
+            return False
+    print(f"   👥 تم تحميل {len(auth_user_index)} مستخدم من Auth")
+    return True
+
+
+def stream_auth_users(per_page=AUTH_PAGE_SIZE, prefetch=True):
+    """Yield every auth user, page by page (the next page is fetched in the background)"""
+    snapshot = snapshot_rows(AUTH_USERS)
+    if snapshot is not None:
+        yield from (SimpleNamespace(**user) for user in snapshot)
+        return
+
+    def fetch(page):
+        users = run_request('auth:list_users',
+                            lambda client: client.auth.admin.list_users(page=page, per_page=per_page))
+        return users, next_cursor(users, per_page, page + 1)
+
+    for users in prefetched(fetch, cursor=1, prefetch=prefetch):
+        yield from users
+
+
+def _load_auth_users():
+    """Scan every auth user into a new index and swap it in (caller holds _auth_lock)"""
+    global auth_user_index, _auth_loaded, _created_during_scan, _scanned_at
+    started = time.monotonic()
+    with _index_lock:
+        _created_during_scan = {}
+    try:
+        index = {user.email.lower(): user.id for user in stream_auth_users() if user.email}
+    finally:
+        with _index_lock:
+            created, _created_during_scan = _created_during_scan, None
+    index.update(created)
+    with _index_lock:
+        auth_user_index = index
+    _auth_loaded = True
+    _scanned_at = started
+
+
+def _scan():
+    """_load_auth_users(), or False after reporting why it failed (caller holds _auth_lock)"""
+    global _index_failed
+    try:
+        _load_auth_users()
+    except Exception as e:
+        _index_failed = not _auth_loaded
+        print(f"   ⚠️  تعذر تحميل مستخدمي Auth، البحث بالبريد لكل مستخدم: {str(e)[:120]}")
+        return False
+    _index_failed = False
+    return True
+
+
+def reload_auth_users(since):
+    """
+    Rescan the auth users after an "already registered" answer to a request
+    sent at since (time.monotonic()), unless a scan started after that: the
+    user existed before the request, so that scan has it. Callers waiting
+    for the same scan do not start another one. Returns False when the
+    scan failed.
+    """
+    with _auth_lock:
+        if _scanned_at is None or _scanned_at < since:
+            return _scan()
+    return True
+
+
+async def reload_auth_users_async(since):
+    """reload_auth_users() for the engine's loop: concurrent callers await one rescan"""
+    global _rescan
+    while _scanned_at is None or _scanned_at < since:
+        if _rescan is None or _rescan.done():
+            _rescan = asyncio.ensure_future(asyncio.to_thread(reload_auth_users, since))
+        if not await asyncio.shield(_rescan):
+            return False
+    return True
+
+
+def remember_auth_user(email, user_id):
+    """Add a user just created to the index (and to the scan running, if any)"""
+    with _index_lock:
+        auth_user_index[email.lower()] = user_id
+        if _created_during_scan is not None:
+            _created_during_scan[email.lower()] = user_id
+
+
+def known_auth_user(email):
+    """Auth user ID for an email in the index as it is now (no scan)"""
+    return auth_user_index.get(email.lower())
+
+
+def find_auth_user(email):
+    """Return the auth user ID for an email, or None"""
+    if load_auth_users():
+        return known_auth_user(email)
+    return lookup_auth_user(email)
+
+
+async def lookup_auth_user_async(engine, email):
+    """
+    Ask auth for one email's user (when the index could not be loaded).
+    Returns its ID, or None when there is none or the lookup failed.
+    """
+    users, error = await engine.attempt(lambda: engine.find_users(email))
+    if error is not None:
+        print(f"   ❌ Error looking up auth user {email}: {str(error)[:120]}")
+        return None
+    for user in users:
+        if user.email and user.email.lower() == email.lower():
+            remember_auth_user(email, user.id)
+            return user.id
+    return None
+
+
+def lookup_auth_user(email):
+    """Blocking lookup_auth_user_async()"""
+    engine = get_engine()
+    return engine.run(lookup_auth_user_async(engine, email))
+
+
+def _already_registered(error):
+    """True when auth refused to create a user because the email exists"""
+    return getattr(error, 'code', None) in ALREADY_REGISTERED
+
+
+def _create_user(email, password, full_name):
+    """Create one auth user and record it in the index (raises on failure)"""
+    with timed('auth:create_user'):
+        result = get_client().auth.admin.create_user({
+            "email": email,
+            "password": password,
+            "email_confirm": True,
+            "user_metadata": {
+                "full_name": full_name
+            }
+        })
+    if not result.user:
+        return None
+    remember_auth_user(email, result.user.id)
+    return result.user.id
+
+
+def create_auth_user(email, password, full_name, check_existing=True):
+    """Create auth user or get existing user ID"""
+    if check_existing:
+        existing_id = find_auth_user(email)
+        if existing_id:
+            return existing_id
+
+    sent = time.monotonic()
+    try:
+        return _create_user(email, password, full_name)
+    except Exception as e:
+        if _already_registered(e):
+            # Created by an earlier run after our index was loaded
+            existing_id = known_auth_user(email) if reload_auth_users(sent) else lookup_auth_user(email)
+            if existing_id:
+                return existing_id
+        print(f"   ❌ Error with auth user: {e}")
+        return None
+
+
+async def create_auth_user_async(engine, email, password, full_name, limiter=None):
+    """
+    create_auth_user() for coroutines on the engine's loop: the caller checks
+    the index first. Returns the user ID, or None after printing the error.
+    """
+    sent = time.monotonic()
+    user_id, error = await engine.attempt(lambda: engine.create_user(email, password, full_name), limiter)
+    if error is not None and _already_registered(error):
+        # Created by an earlier run after our index was loaded
+        user_id = known_auth_user(email)
+        if not user_id:
+            if await reload_auth_users_async(sent):
+                user_id = known_auth_user(email)
+            else:
+                user_id = await lookup_auth_user_async(engine, email)
+        if user_id:
+            return user_id
+    if error is not None:
+        print(f"   ❌ Error with auth user {email}: {str(error)[:120]}")
+    elif user_id:
+        remember_auth_user(email, user_id)
+    return user_id
+
+
+def create_auth_users(requests, check_existing=True, workers=DEFAULT_WORKERS, limiter=None, on_created=None):
+    """
+    Create many auth users concurrently.
+
+    requests is a list of (email, password, full_name) tuples. Returns the
+    user IDs in the same order, with None where creation failed.
+    on_created(position, user_id) is called from the worker as soon as a
+    user exists, so callers can checkpoint it before the batch finishes.
+    """
+    user_ids = [None] * len(requests)
+    to_create = []
+    for position, request in enumerate(requests):
+        existing_id = find_auth_user(request[0]) if check_existing else None
+        if existing_id:
+            user_ids[position] = existing_id
+        else:
+            to_create.append(position)
+
+    async def create(engine, position):
+        email = requests[position][0]
+        user_id = await engine.create_user(*requests[position])
+        if user_id:
+            remember_auth_user(email, user_id)
+            if on_created:
+                on_created(position, user_id)
+        return user_id
+
+    started = time.monotonic()
+    results = run_async(create, to_create, workers, limiter=limiter or TokenBucket())
+    conflicts = []
+    for position, (user_id, error) in zip(to_create, results):
+        if error is not None and _already_registered(error):
+            conflicts.append((position, error))
+        elif error is not None:
+            print(f"   ❌ Error with auth user {requests[position][0]}: {str(error)[:120]}")
+        user_ids[position] = user_id
+
+    if conflicts:
+        # Deterministic emails that already exist: pick up their IDs
+        rescanned = reload_auth_users(started)
+        for position, error in conflicts:
+            email = requests[position][0]
+            user_ids[position] = known_auth_user(email) if rescanned else lookup_auth_user(email)
+            if user_ids[position]:
+                if on_created:
+                    on_created(position, user_ids[position])
+            else:
+                print(f"   ❌ Error with auth user {requests[position][0]}: {str(error)[:120]}")
+    return user_ids
@@ -0,0 +1,285 @@
+"""
+Asyncio I/O engine: every request of a run over one pooled HTTP/2 client.
+
+The blocking client waits out each round trip before sending the next, so
+a run costs the sum of its latencies. ``AsyncEngine`` keeps an event loop
+on a background thread with an ``httpx.AsyncClient`` (HTTP/2, keep-alive
+pool) that the async Supabase client uses for REST, RPC and auth alike.
+Its operations (``select``, ``upsert``, ``delete_in``, ``rpc``,
+``create_user``, ``delete_user``, ``list_users``, ``find_users``) are awaitable and timed
+under the same endpoint names as the blocking calls.
+
+Concurrency is structured and bounded twice: ``gather()`` runs a coroutine
+per item on at most ``limit`` worker tasks inside a ``TaskGroup`` (pacing
+each start with a ``TokenBucket`` when given one, retrying 429 / 5xx and
+dropped connections), and the engine never has more than ``max_in_flight``
+requests open whatever is gathering. PostgREST errors do not say which HTTP
+status they came with, so the engine records each response's status and
+sets it on the error: a constraint violation (400 / 409) is not retried.
+
+HTTP/2 multiplexes those requests over a few connections. A server that
+only speaks HTTP/1.1 (seen on a first health request) needs a connection per
+request in flight, and one large httpcore pool spends quadratic CPU matching
+queued requests to connections, so the engine then opens several small
+pools and sends each request through the least busy one.
+
+Synchronous code hands coroutines to the loop with ``run()``, so the
+importers, deletions and ratings seeding keep their blocking API while
+their requests overlap. ``run_request()`` sends one such request with the
+same retries, for the blocking lookups and page reads.
+"""
+
+import asyncio
+import atexit
+import contextvars
+import math
+import threading
+
+import httpx
+from supabase_auth.helpers import model_validate
+from supabase_auth.types import UserList
+
+from .config import create_async_client, ensure_online
+from .latency import timed
+from .concurrency import DEFAULT_MAX_RETRIES, error_status, is_retryable
+from .telemetry import request_retried
+
+# Requests open at once across every gather() of the process
+DEFAULT_MAX_IN_FLIGHT = 256
+
+# Connections per pool; HTTP/2 multiplexes many requests on each
+DEFAULT_CONNECTIONS = 16
+
+# Same timeout the blocking PostgREST client uses
+REQUEST_TIMEOUT = 120.0
+
+_engine = None
+_engine_lock = threading.Lock()
+
+# Status of the last response the current task received
+_last_status = contextvars.ContextVar('last_status', default=None)
+
+
+async def _record_status(response):
+    _last_status.set(response.status_code)
+
+
+class AsyncEngine:
+    """Event loop thread, pooled HTTP/2 client(s) and the async Supabase client on each"""
+
+    def __init__(self, max_in_flight=DEFAULT_MAX_IN_FLIGHT, connections=DEFAULT_CONNECTIONS):
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.connections = max(1, int(connections))
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name='naebak-aio', daemon=True)
+        self._thread.start()
+        self.http_version = None
+        # One (httpx client, Supabase client) per pool and the requests each has in flight
+        self.pools = []
+        self._busy = []
+        self._in_flight = None
+        self.run(self._open())
+
+    async def _open_pool(self):
+        http = httpx.AsyncClient(
+            http2=True,
+            timeout=REQUEST_TIMEOUT,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=self.connections,
+                                max_keepalive_connections=self.connections),
+            event_hooks={'response': [_record_status]},
+        )
+        self.pools.append((http, await create_async_client(http)))
+        self._busy.append(0)
+
+    async def _open(self):
+        await self._open_pool()
+        http, client = self.pools[0]
+        response = await http.get(f'{client.auth_url}/health', headers={'apikey': client.supabase_key})
+        self.http_version = response.http_version
+        if self.http_version != 'HTTP/2':
+            for _ in range(math.ceil(self.max_in_flight / self.connections) - 1):
+                await self._open_pool()
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+
+    def run(self, coroutine):
+        """Run a coroutine on the engine's loop and return its result (blocks the caller)"""
+        if threading.current_thread() is self._thread:
+            coroutine.close()
+            raise RuntimeError("AsyncEngine.run() called from the engine's own loop; await instead")
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        try:
+            return future.result()
+        except BaseException:
+            # Ctrl-C or an error in the caller: cancel the task group instead of leaving it running
+            future.cancel()
+            raise
+
+    def close(self):
+        """Close the connection pools and stop the loop"""
+        if self.loop.is_closed():
+            return
+        for http, _ in self.pools:
+            asyncio.run_coroutine_threadsafe(http.aclose(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+    async def request(self, endpoint, make):
+        """await make(client) under the in-flight limit, timed as endpoint"""
+        ensure_online()
+        async with self._in_flight:
+            pool = min(range(len(self.pools)), key=self._busy.__getitem__)
+            self._busy[pool] += 1
+            _last_status.set(None)
+            try:
+                with timed(endpoint):
+                    return await make(self.pools[pool][1])
+            except Exception as e:
+                status = _last_status.get()
+                if error_status(e) is None and status is not None and status >= 400:
+                    # PostgREST's APIError only has the SQLSTATE; is_retryable() needs the status
+                    e.status = status
+                raise
+            finally:
+                self._busy[pool] -= 1
+
+    async def gather(self, func, items, limit, limiter=None, max_retries=DEFAULT_MAX_RETRIES):
+        """
+        Await func(item) for every item with at most limit running at once.
+
+        Returns (result, error) pairs in input order.
+        With a limiter every attempt waits for a token; retryable errors back
+        it off and are retried up to max_retries times.
+        """
+        items = list(items)
+        results = [None] * len(items)
+        positions = iter(range(len(items)))
+
+        async def worker():
+            # Workers share one iterator, so items are started in order and never all at once
+            for position in positions:
+                results[position] = await self.attempt(lambda: func(items[position]), limiter, max_retries)
+
+        async with asyncio.TaskGroup() as group:
+            for _ in range(max(1, min(int(limit), len(items)))):
+                group.create_task(worker())
+        return results
+
+    async def attempt(self, make, limiter=None, max_retries=DEFAULT_MAX_RETRIES):
+        """await make() with gather()'s pacing and retries; returns (result, error)"""
+        attempt = 0
+        while True:
+            if limiter:
+                await limiter.acquire_async()
+            try:
+                result = await make()
+            except Exception as e:
+                if is_retryable(e) and attempt < max_retries:
+                    attempt += 1
+                    request_retried(str(error_status(e) or type(e).__name__))
+                    if limiter:
+                        limiter.on_throttle()
+                    else:
+                        await asyncio.sleep(min(2 ** attempt * 0.1, 5.0))
+                    continue
+                return None, e
+            if limiter:
+                limiter.on_success()
+            return result, None
+
+    # Table operations
+
+    async def select(self, table, columns='*', limit=None, **filters):
+        """Rows of table matching the eq filters"""
+        def query(client):
+            query = client.table(table).select(columns)
+            for column, value in filters.items():
+                query = query.eq(column, value)
+            if limit is not None:
+                query = query.limit(limit)
+            return query.execute()
+
+        result = await self.request(f'select:{table}', query)
+        return result.data or []
+
+    async def upsert(self, table, rows, on_conflict):
+        """Upsert rows (one request) and return what PostgREST sent back"""
+        result = await self.request(f'upsert:{table}', lambda client: client.table(table)
+                                    .upsert(rows, on_conflict=on_conflict).execute())
+        return result.data or []
+
+    async def delete_in(self, table, column, values):
+        """Delete the rows whose column is one of values (one request)"""
+        result = await self.request(f'delete:{table}', lambda client: client.table(table)
+                                    .delete().in_(column, list(values)).execute())
+        return result.data or []
+
+    async def rpc(self, function, params=None):
+        """Call a SQL function and return its result"""
+        result = await self.request(f'rpc:{function}',
+                                    lambda client: client.rpc(function, params or {}).execute())
+        return result.data
+
+    # Auth admin operations
+
+    async def create_user(self, email, password, full_name):
+        """Create a confirmed auth user; returns its id (raises on failure)"""
+        result = await self.request('auth:create_user', lambda client: client.auth.admin.create_user({
+            "email": email,
+            "password": password,
+            "email_confirm": True,
+            "user_metadata": {
+                "full_name": full_name
+            }
+        }))
+        return result.user.id if result.user else None
+
+    async def delete_user(self, user_id):
+        await self.request('auth:delete_user', lambda client: client.auth.admin.delete_user(user_id))
+
+    async def list_users(self, page, per_page):
+        return await self.request('auth:list_users',
+                                  lambda client: client.auth.admin.list_users(page=page, per_page=per_page))
+
+    async def find_users(self, email):
+        """Auth users whose email contains email (GoTrue's filter parameter, which list_users() does not pass)"""
+        response = await self.request('auth:find_user', lambda client: client.auth.admin._request(
+            'GET', 'admin/users', query=httpx.QueryParams(filter=email)))
+        return model_validate(UserList, response.content).users
+
+
+def get_engine():
+    """Return the shared AsyncEngine, starting it on first use"""
+    global _engine
+    ensure_online()
+    with _engine_lock:
+        if _engine is None:
+            _engine = AsyncEngine()
+            atexit.register(_engine.close)
+        return _engine
+
+
+def run_async(func, items, limit, limiter=None, max_retries=DEFAULT_MAX_RETRIES):
+    """
+    Blocking counterpart of AsyncEngine.gather(): func is a coroutine
+    function taking (engine, item). Returns (result, error) pairs in order.
+    """
+    if not items:
+        return []
+    engine = get_engine()
+    return engine.run(engine.gather(lambda item: func(engine, item), items, limit,
+                                    limiter=limiter, max_retries=max_retries))
+
+
+def run_request(endpoint, make, max_retries=DEFAULT_MAX_RETRIES):
+    """
+    Blocking counterpart of AsyncEngine.request() with attempt()'s retries:
+    make(client) builds the call on the async client. Returns its result or
+    raises the last error.
+    """
+    engine = get_engine()
+    result, error = engine.run(engine.attempt(lambda: engine.request(endpoint, make), max_retries=max_retries))
+    if error is not None:
+        raise error
+    return result
@@ -0,0 +1,58 @@
+"""
+Arabic text normalization used to key lookups and compare names.
+
+``normalize_arabic`` handles one value (memoized, since governorate, district
+and party names repeat on every row). ``normalize_series`` and
+``normalize_frame`` apply the same translation table to whole columns with
+pandas' vectorized string methods.
+"""
+
+import re
+from functools import lru_cache
+
+# Characters that vary between spreadsheets and the database for the same name
+_CHAR_MAP = {
+    'أ': 'ا',
+    'إ': 'ا',
+    'آ': 'ا',
+    'ٱ': 'ا',
+    'ة': 'ه',
+    'ى': 'ي',
+    'ـ': None,  # tatweel
+}
+# Harakat (fathatan .. sukun) and superscript alef carry no meaning for matching
+_CHAR_MAP.update({chr(code): None for code in range(0x064B, 0x0653)})
+_CHAR_MAP['ٰ'] = None
+
+TRANSLATION_TABLE = str.maketrans(_CHAR_MAP)
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_arabic(text):
+    """Normalize an Arabic name for use as a lookup key"""
+    if text is None or text != text:  # None or NaN
+        return ''
+    return _normalize_text(str(text))
+
+
+@lru_cache(maxsize=65536)
+def _normalize_text(text):
+    return _WHITESPACE.sub(' ', text.translate(TRANSLATION_TABLE)).strip()
+
+
+def normalize_series(series):
+    """Normalize every value of a pandas Series in one vectorized pass"""
+    return series.fillna('').astype(str)\
+        .str.translate(TRANSLATION_TABLE)\
+        .str.replace(_WHITESPACE, ' ', regex=True)\
+        .str.strip()
+
+
+def normalize_frame(df, columns):
+    """Return a copy of df with the given text columns normalized"""
+    df = df.copy()
+    for column in columns:
+        if column in df.columns:
+            df[column] = normalize_series(df[column])
+    return df
@@ -0,0 +1,116 @@
+"""
+Columnar cache of parsed source spreadsheets.
+
+``read_sheet(path)`` parses a workbook with ``pd.read_excel`` once and
+stores the DataFrame under the state directory (``NAEBAK_STATE_DIR``, the
+scripts directory by default), keyed by a hash of the file's contents. Later calls load the cached copy, which takes milliseconds
+instead of re-parsing the ``.xlsx``. Editing the workbook changes its hash,
+so a stale copy is never used. The cache is Parquet when pyarrow is
+installed and a NumPy ``.npz`` archive (one array per column) otherwise.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .config import STATE_DIR
+
+CACHE_DIR = os.path.join(STATE_DIR, '.cache', 'sheets')
+
+try:
+    import pyarrow  # noqa: F401
+    CACHE_FORMAT = 'parquet'
+except ImportError:
+    CACHE_FORMAT = 'npz'
+
+
+def file_hash(path):
+    """Hex SHA-256 of a file's contents (first 16 characters)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def cache_path(path, key=None):
+    """Where the cached copy of a workbook lives for its current contents"""
+    stem = os.path.basename(path).replace('.', '_')
+    return os.path.join(CACHE_DIR, f"{stem}-{key or file_hash(path)}.{CACHE_FORMAT}")
+
+
+def _save_npz(df, target):
+    arrays = {}
+    kinds = []
+    for i, column in enumerate(df.columns):
+        series = df[column]
+        if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            arrays[f"c{i}"] = series.to_numpy()
+            kinds.append('numeric')
+        else:
+            missing = series.isna().to_numpy()
+            arrays[f"c{i}"] = series.where(~missing, '').astype(str).to_numpy(dtype=str)
+            arrays[f"c{i}_na"] = missing
+            kinds.append('text')
+    meta = json.dumps({'columns': [str(c) for c in df.columns], 'kinds': kinds}, ensure_ascii=False)
+    np.savez(target, __meta__=np.array(meta), **arrays)
+
+
+def _load_npz(source):
+    with np.load(source, allow_pickle=False) as archive:
+        meta = json.loads(str(archive['__meta__']))
+        data = {}
+        for i, (column, kind) in enumerate(zip(meta['columns'], meta['kinds'])):
+            values = archive[f"c{i}"]
+            if kind == 'text':
+                values = values.astype(object)
+                values[archive[f"c{i}_na"]] = np.nan
+            data[column] = values
+    return pd.DataFrame(data, columns=meta['columns'])
+
+
+def _save(df, target):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # Write to a temporary name first so a crash never leaves a torn cache file
+    partial = f"{target}.partial"
+    if CACHE_FORMAT == 'parquet':
+        df.to_parquet(partial, index=False)
+    else:
+        with open(partial, 'wb') as f:
+            _save_npz(df, f)
+    os.replace(partial, target)
+
+
+def _load(source):
+    if CACHE_FORMAT == 'parquet':
+        return pd.read_parquet(source)
+    return _load_npz(source)
+
+
+def _prune(path, keep):
+    """Remove cached copies of older versions of the same workbook"""
+    prefix = os.path.basename(path).replace('.', '_') + '-'
+    for name in os.listdir(CACHE_DIR):
+        if name.startswith(prefix) and os.path.join(CACHE_DIR, name) != keep:
+            os.remove(os.path.join(CACHE_DIR, name))
+
+
+def read_sheet(path, refresh=False):
+    """Return a workbook's first sheet as a DataFrame, from the cache when fresh"""
+    target = cache_path(path)
+    if not refresh and os.path.exists(target):
+        try:
+            return _load(target)
+        except Exception as e:
+            print(f"   ⚠️  تعذرت قراءة النسخة المخزنة ({e}), إعادة التحليل...")
+
+    df = pd.read_excel(path)
+    try:
+        _save(df, target)
+        _prune(path, target)
+    except Exception as e:
+        print(f"   ⚠️  تعذر حفظ النسخة المخزنة: {e}")
+    return df
@@ -0,0 +1,84 @@
+"""
+Command line options shared by the import scripts
+"""
+
+import argparse
+
+from .config import SUPABASE_DB_URL
+from .concurrency import DEFAULT_WORKERS, DEFAULT_RATE
+from .writer import DEFAULT_CHUNK_SIZE
+from .deletion import DEFAULT_DELETE_CHUNK
+
+
+def build_parser(description):
+    """Return an ArgumentParser with the options every importer accepts"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'rows per bulk upsert (default: {DEFAULT_CHUNK_SIZE})')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'auth user creations in flight at once (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--auth-rate', type=float, default=DEFAULT_RATE,
+                        help=f'starting auth requests per second, adapts to 429s (default: {DEFAULT_RATE:g})')
+    parser.add_argument('--resume', action='store_true',
+                        help='skip rows the journal marks as done and finish half-done ones')
+    parser.add_argument('--metrics', metavar='FILE',
+                        help='JSONL file for progress / latency metrics (default: one per run in .cache/metrics)')
+    parser.add_argument('--database-url', nargs='?', const='', metavar='URL',
+                        help='load over a direct Postgres connection (COPY, one transaction; needs psycopg); '
+                             'without URL, $SUPABASE_DB_URL is used')
+    return parser
+
+
+def import_options(args):
+    """Keyword arguments for the shared import loops taken from parsed args"""
+    database_url = args.database_url
+    if database_url == '':
+        database_url = SUPABASE_DB_URL
+        if not database_url:
+            print("❌ Error: --database-url needs a URL or SUPABASE_DB_URL")
+            exit(1)
+    return {
+        'chunk_size': args.chunk_size,
+        'workers': args.workers,
+        'auth_rate': args.auth_rate,
+        'resume': args.resume,
+        'metrics': args.metrics,
+        'database_url': database_url,
+    }
+
+
+def add_plan_options(parser):
+    """Add --plan / --refresh-snapshot to a script that supports planning mode"""
+    parser.add_argument('--plan', action='store_true',
+                        help='work out the changes against a cached snapshot and estimate requests '
+                             'and run time; nothing is sent to the database')
+    parser.add_argument('--refresh-snapshot', action='store_true',
+                        help='with --plan, read a fresh snapshot first (read only)')
+    return parser
+
+
+def build_delete_parser(description):
+    """Return an ArgumentParser with the options every bulk deletion accepts"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_DELETE_CHUNK,
+                        help=f'ids per bulk delete (default: {DEFAULT_DELETE_CHUNK})')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'auth user deletions in flight at once (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--auth-rate', type=float, default=DEFAULT_RATE,
+                        help=f'starting auth requests per second, adapts to 429s (default: {DEFAULT_RATE:g})')
+    parser.add_argument('--resume', action='store_true',
+                        help='finish the users an interrupted run left half deleted')
+    parser.add_argument('--metrics', metavar='FILE',
+                        help='JSONL file for progress / latency metrics (default: one per run in .cache/metrics)')
+    return parser
+
+
+def delete_options(args):
+    """Keyword arguments for CascadeDeleter taken from parsed args"""
+    return {
+        'chunk_size': args.chunk_size,
+        'workers': args.workers,
+        'auth_rate': args.auth_rate,
+        'resume': args.resume,
+        'metrics': args.metrics,
+    }
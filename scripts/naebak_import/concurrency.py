@@ -0,0 +1,120 @@
+"""
+Adaptive token-bucket rate limiter and retry classification.
+
+The limiter starts at a configured rate, halves it whenever the server
+answers 429 or 5xx, and adds a little back after each success (AIMD), so
+throughput settles at what the endpoint actually tolerates. Only a run of
+throttled answers halves it: a lone 429 among many successes pauses the
+bucket briefly, or a 2% error rate would hold it at a few requests a second.
+"""
+
+import asyncio
+import threading
+import time
+
+DEFAULT_WORKERS = 8
+DEFAULT_RATE = 10.0  # requests per second
+DEFAULT_MAX_RETRIES = 5
+
+# Weight of one answer in the limiter's moving share of throttled answers (about the last 20)
+THROTTLE_WEIGHT = 0.05
+# Throttled share above which the limiter halves its rate
+CUT_SHARE = 0.1
+
+
+class TokenBucket:
+    """Thread-safe token bucket whose refill rate adapts to throttling"""
+
+    def __init__(self, rate=DEFAULT_RATE, min_rate=0.5, max_rate=None, increase=0.5):
+        self.rate = float(rate)
+        self.min_rate = float(min_rate)
+        self.max_rate = float(max_rate) if max_rate else self.rate * 4
+        self.increase = increase
+        self.capacity = max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.cut_at = 0.0
+        self.throttled = 0
+        self.throttled_share = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _take(self):
+        """Take a token and return 0, or return the seconds to wait for one"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = self.paused_until - now
+            if wait <= 0 and self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return wait if wait > 0 else (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while (wait := self._take()) > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Wait, without blocking the event loop, until a request may be sent"""
+        while (wait := self._take()) > 0:
+            await asyncio.sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            self.throttled_share *= 1 - THROTTLE_WEIGHT
+            self.rate = min(self.max_rate, self.rate + self.increase / max(self.rate, 1.0))
+            self.capacity = max(1.0, self.rate)
+
+    def on_throttle(self, retry_after=None):
+        with self._lock:
+            self.throttled += 1
+            self.throttled_share += THROTTLE_WEIGHT * (1 - self.throttled_share)
+            now = time.monotonic()
+            # Requests already in flight fail together; cut the rate once per burst
+            if now - self.cut_at < 1.0:
+                self.paused_until = max(self.paused_until, now + (retry_after or 0))
+                return
+            if self.throttled_share < CUT_SHARE:
+                # A stray 429: wait a moment, keep the rate
+                self.paused_until = max(self.paused_until, now + (retry_after or 1.0 / self.rate))
+                return
+            self.cut_at = now
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.capacity = max(1.0, self.rate)
+            self.tokens = 0
+            pause = retry_after if retry_after else 1.0 / self.rate
+            self.paused_until = max(self.paused_until, now + pause)
+            rate = self.rate
+        print(f"   ⏳ تم تخفيض المعدل إلى {rate:.1f} طلب/ث")
+
+
+def error_status(error):
+    """
+    HTTP status carried by a Supabase/httpx exception, if any.
+
+    PostgREST's APIError.code is a SQLSTATE ('23505') or PGRST code, not a
+    status, so it is never read; the engine sets .status on those errors
+    from the response they came with (see aio.py).
+    """
+    for attr in ('status', 'status_code'):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+        if isinstance(value, str) and value.isdigit():
+            return int(value)
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None)
+
+
+def is_retryable(error):
+    """True for rate limiting, server errors and dropped connections"""
+    status = error_status(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    name = type(error).__name__
+    return 'Retryable' in name or 'Timeout' in name or 'Connect' in name
@@ -0,0 +1,83 @@
+"""
+Shared configuration and the single Supabase client used by every script
+"""
+
+import os
+from supabase import create_client, acreate_client, Client, AsyncClient, AsyncClientOptions
+
+# Supabase configuration
+SUPABASE_URL = os.getenv('SUPABASE_URL')
+SUPABASE_SERVICE_KEY = os.getenv('SUPABASE_SERVICE_KEY')
+
+# Direct Postgres connection string (Project Settings -> Database), only for --database-url
+SUPABASE_DB_URL = os.getenv('SUPABASE_DB_URL')
+
+# مجلس النواب ID
+COUNCIL_ID = 'ce2c7990-fe24-4550-a9d7-964ad4d65137'
+
+# مجلس الشيوخ ID
+SENATE_COUNCIL_ID = 'a2fac295-2777-49a1-ab50-3e3bc07e6530'
+
+# Virtual governorate used for list districts (دوائر القوائم)
+VIRTUAL_GOVERNORATE_ID = '2c6d34f9-9b60-421c-b8dd-8fed0fc2e5bc'
+
+# Default avatar URL
+DEFAULT_AVATAR_URL = 'https://fvpwvnghkkhrzupglsrh.supabase.co/storage/v1/object/public/Bucket_avatars/AGCRNZJVQrtFQTLKB8PYWG.jpg'
+
+# Project paths
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_ROOT = os.path.dirname(SCRIPTS_DIR)
+DATA_DIR = os.getenv('NAEBAK_DATA_DIR') or os.path.join(PROJECT_ROOT, 'data')
+
+# Journals, latencies, metrics and snapshots (the benchmark points this at a scratch directory)
+STATE_DIR = os.getenv('NAEBAK_STATE_DIR') or SCRIPTS_DIR
+
+_client = None
+
+# Set while planning against a snapshot: no request may reach Supabase
+_offline = False
+
+
+def data_path(filename):
+    """Return the absolute path of a file in the project's data directory"""
+    return os.path.join(DATA_DIR, filename)
+
+
+def set_offline(offline=True):
+    """Make get_client() refuse to hand out the client (see planning.py)"""
+    global _offline
+    _offline = offline
+
+
+def ensure_online():
+    """Raise while planning: no request may reach Supabase"""
+    if _offline:
+        raise RuntimeError("Planning mode works on a snapshot and must not reach Supabase")
+
+
+def _require_credentials():
+    if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
+        print("❌ Error: SUPABASE_URL and SUPABASE_SERVICE_KEY must be set")
+        print("   Run: export SUPABASE_URL='your_url'")
+        print("   Run: export SUPABASE_SERVICE_KEY='your_service_key'")
+        exit(1)
+
+
+def get_client() -> Client:
+    """Return the shared Supabase client, creating it on first use"""
+    global _client
+    ensure_online()
+    if _client is not None:
+        return _client
+
+    _require_credentials()
+    _client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+    return _client
+
+
+async def create_async_client(http_client) -> AsyncClient:
+    """An async Supabase client whose REST, RPC and auth calls all go through http_client"""
+    ensure_online()
+    _require_credentials()
+    return await acreate_client(SUPABASE_URL, SUPABASE_SERVICE_KEY,
+                                options=AsyncClientOptions(httpx_client=http_client))
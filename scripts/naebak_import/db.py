@@ -0,0 +1,156 @@
+"""
+Small query helpers on top of the shared client.
+
+``stream_rows()`` walks a table with keyset pagination (``id > last id``,
+or ``(created_at, id) >`` for a composite key) instead of ``range()``
+offsets, so every page is an index range scan and rows inserted or deleted
+during the scan cannot shift a page. The next page is fetched on a
+background thread while the caller works through the current one. Pages
+are fetched through the engine (``aio.run_request()``), so a 429 / 5xx or
+a dropped connection is retried instead of ending the scan.
+
+While a planning snapshot is served (``serve_snapshot()``, see
+``planning.py``) the same calls read the snapshot instead.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .aio import run_request
+
+# PostgREST returns at most this many rows per request
+PAGE_SIZE = 1000
+
+# Cursor value marking the last page
+_DONE = object()
+
+# table -> rows served instead of the database while planning
+_snapshot = None
+
+
+def serve_snapshot(tables):
+    """Answer stream_rows() from tables (table -> list of rows); None goes back to the database"""
+    global _snapshot
+    _snapshot = tables
+
+
+def snapshot_rows(table):
+    """Rows of table in the snapshot being served, or None when reading the database"""
+    if _snapshot is None:
+        return None
+    if table not in _snapshot:
+        raise RuntimeError(f"{table} is not in the planning snapshot")
+    return _snapshot[table]
+
+
+def prefetched(fetch, cursor=None, prefetch=True):
+    """
+    Yield pages from fetch(cursor) -> (page, next_cursor) until the cursor
+    is exhausted. With prefetch the next page is requested as soon as the
+    current one arrives, before it is handed to the caller.
+    """
+    if not prefetch:
+        while cursor is not _DONE:
+            page, cursor = fetch(cursor)
+            yield page
+        return
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        future = pool.submit(fetch, cursor)
+        while future is not None:
+            page, cursor = future.result()
+            future = pool.submit(fetch, cursor) if cursor is not _DONE else None
+            yield page
+
+
+def next_cursor(page, page_size, cursor):
+    """Cursor for the page after page, or the end marker when it was short"""
+    return cursor if len(page) >= page_size else _DONE
+
+
+def _selected(columns, keys):
+    """Projection that includes the key columns the cursor is built from"""
+    selected = [c.strip() for c in columns.split(',')]
+    if '*' in selected:
+        return columns
+    missing = [key for key in keys if key not in selected]
+    return ', '.join(missing + [columns]) if missing else columns
+
+
+def _after(query, keys, values):
+    """Filter query to rows after values in (keys) order"""
+    if len(keys) == 1:
+        return query.gt(keys[0], values[0])
+    first, second = keys
+    first_value, second_value = values
+    return query.or_(f'{first}.gt."{first_value}",'
+                     f'and({first}.eq."{first_value}",{second}.gt."{second_value}")')
+
+
+def stream_rows(table, columns='id', key='id', page_size=PAGE_SIZE, prefetch=True, **filters):
+    """
+    Yield every row of a table, one keyset page at a time.
+
+    columns is the select projection (key columns are added when missing);
+    key is a unique non-null column or a (column, unique column) pair such
+    as ('created_at', 'id'); keyword args are eq filters.
+    """
+    keys = (key,) if isinstance(key, str) else tuple(key)
+    projection = _selected(columns, keys)
+    snapshot = snapshot_rows(table)
+    if snapshot is not None:
+        yield from _from_snapshot(snapshot, projection, keys, filters)
+        return
+
+    def query(client, after):
+        query = client.table(table).select(projection)
+        for column, value in filters.items():
+            query = query.eq(column, value)
+        if after is not None:
+            query = _after(query, keys, after)
+        for column in keys:
+            query = query.order(column)
+        return query.limit(page_size).execute()
+
+    def fetch(after):
+        page = run_request(f'select:{table}', lambda client: query(client, after)).data or []
+        cursor = tuple(page[-1][column] for column in keys) if page else None
+        return page, next_cursor(page, page_size, cursor)
+
+    for page in prefetched(fetch, prefetch=prefetch):
+        yield from page
+
+
+def _from_snapshot(rows, projection, keys, filters):
+    """stream_rows() over snapshot rows: same filters, projection and key order"""
+    rows = [row for row in rows if all(row.get(column) == value for column, value in filters.items())]
+    rows.sort(key=lambda row: tuple(row[column] for column in keys))
+    columns = [c.strip() for c in projection.split(',')]
+    if '*' in columns:
+        yield from (dict(row) for row in rows)
+        return
+    if rows:
+        missing = [column for column in columns if column not in rows[0]]
+        if missing:
+            raise RuntimeError(f"The planning snapshot has no {', '.join(missing)} column")
+    for row in rows:
+        yield {column: row[column] for column in columns}
+
+
+def fetch_all(table, columns, page_size=PAGE_SIZE, order='id', **filters):
+    """Read every row of a table into a list (keyword args are eq filters)"""
+    return list(stream_rows(table, columns, key=order, page_size=page_size, **filters))
+
+
+def fetch_rpc(function, params=None, page_size=PAGE_SIZE):
+    """Read every row returned by a set-returning RPC, one page at a time"""
+    rows = []
+    offset = 0
+    while True:
+        result = run_request(f'rpc:{function}', lambda client: client.rpc(function, params or {})
+                             .range(offset, offset + page_size - 1)
+                             .execute())
+        page = result.data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        offset += page_size
@@ -0,0 +1,146 @@
+"""
+Bulk cascade deletion of imported candidates.
+
+A candidate is a trio: its ``deputy_profiles`` row, its ``user_profiles`` row
+and its auth user. ``CascadeDeleter`` removes the profile rows with chunked
+``in_()`` deletes (deputy profiles first, for the foreign key), then deletes
+the auth users, ``workers`` at a time and paced by an adaptive rate limiter.
+Chunks overlap on the asyncio engine (``aio.py``): the next chunk's profile
+deletes run while the auth users of the one before are still going, so the
+auth workers never wait for them. Each stage is recorded in a
+journal, so a purge interrupted between the profile deletes and the auth
+deletes finishes those users on ``--resume`` instead of leaving them behind.
+Progress is reported by a ``Telemetry`` session.
+"""
+
+import asyncio
+import math
+
+from .aio import get_engine
+from .concurrency import DEFAULT_WORKERS, DEFAULT_RATE, TokenBucket, error_status
+from .journal import STATUS_DONE, ImportJournal
+from .telemetry import Telemetry, task_stage
+
+# ids per in_() filter; keeps the request URL well under PostgREST's limit
+DEFAULT_DELETE_CHUNK = 100
+
+# Profile rows are gone, the auth user is not yet
+STATUS_PROFILES_DELETED = 'profiles_deleted'
+
+
+class DeletionStats:
+    """Counters for one bulk deletion"""
+
+    def __init__(self, total):
+        self.total = total
+        self.profiles = 0
+        self.auth = 0
+        self.errors = 0
+
+    def print_summary(self):
+        print(f"\n   ✅ ملفات شخصية محذوفة: {self.profiles}")
+        print(f"   ✅ Auth users محذوفة: {self.auth}")
+        print(f"   ❌ فشل: {self.errors}")
+
+
+class CascadeDeleter:
+    """Deletes users with their profiles in chunks, journaled for resume"""
+
+    def __init__(self, name, chunk_size=DEFAULT_DELETE_CHUNK, workers=DEFAULT_WORKERS,
+                 auth_rate=DEFAULT_RATE, resume=False, profiles=True, auth=True, metrics=None):
+        self.name = name
+        self.metrics = metrics
+        self.chunk_size = max(1, int(chunk_size))
+        self.workers = workers
+        self.limiter = TokenBucket(auth_rate)
+        self.delete_profiles = profiles
+        self.delete_auth = auth
+        self.journal = ImportJournal(name, resume=resume)
+
+    def run(self, user_ids):
+        """Delete every user in user_ids (plus unfinished ones from the journal)"""
+        user_ids = list(dict.fromkeys(user_ids))
+        # Users whose profiles went in an earlier run but whose auth user did not
+        requested = set(user_ids)
+        leftovers = [u for u in self.journal.with_status(STATUS_PROFILES_DELETED) if u not in requested]
+        if leftovers:
+            print(f"   📒 استكمال حذف {len(leftovers)} Auth user من تشغيل سابق")
+        pending = [u for u in user_ids if not self.journal.is_done(u)]
+
+        stats = DeletionStats(len(pending) + len(leftovers))
+        jobs = [(chunk, self.delete_profiles) for chunk in self._chunks(pending)]
+        jobs += [(chunk, False) for chunk in self._chunks(leftovers)]
+        with Telemetry(self.name, stats.total, self.metrics) as telemetry:
+            if jobs:
+                engine = get_engine()
+                engine.run(self._run(engine, jobs, stats, telemetry))
+
+        self.journal.close()
+        stats.print_summary()
+        return stats
+
+    def _chunks(self, user_ids):
+        for start in range(0, len(user_ids), self.chunk_size):
+            yield user_ids[start:start + self.chunk_size]
+
+    async def _run(self, engine, jobs, stats, telemetry):
+        # Shared by every chunk, so workers bounds the auth deletes in flight overall
+        slots = asyncio.Semaphore(max(1, self.workers))
+        done = 0
+
+        async def job(item):
+            nonlocal done
+            chunk, profiles = item
+            if not profiles or await self._delete_profiles(engine, chunk, stats):
+                await self._finish(engine, chunk, stats, slots)
+            done += len(chunk)
+            telemetry.progress(done, deleted=stats.auth if self.delete_auth else stats.profiles,
+                               errors=stats.errors)
+
+        # Enough chunks in flight to keep the auth workers busy, plus one deleting profiles ahead
+        overlap = 1 + math.ceil(self.workers / self.chunk_size) if self.delete_auth else self.workers
+        await engine.gather(job, jobs, overlap)
+
+    async def _delete_profiles(self, engine, chunk, stats):
+        try:
+            with task_stage('profile_delete'):
+                # deputy_profiles references user_profiles, so it goes first
+                await engine.delete_in('deputy_profiles', 'user_id', chunk)
+                await engine.delete_in('user_profiles', 'id', chunk)
+        except Exception as e:
+            stats.errors += len(chunk)
+            print(f"   ❌ فشل حذف دفعة من {len(chunk)} ملف شخصي: {str(e)[:200]}")
+            return False
+        stats.profiles += len(chunk)
+        self.journal.record_many([(u, None) for u in chunk], STATUS_PROFILES_DELETED)
+        return True
+
+    async def _finish(self, engine, chunk, stats, slots):
+        if not self.delete_auth:
+            self.journal.record_many([(u, None) for u in chunk], STATUS_DONE)
+            return
+
+        async def delete(user_id):
+            async with slots:
+                await _delete_auth_user(engine, user_id)
+
+        with task_stage('auth_delete'):
+            results = await engine.gather(delete, chunk, self.workers, limiter=self.limiter)
+        done = []
+        for user_id, (_, error) in zip(chunk, results):
+            if error is None:
+                done.append((user_id, None))
+            else:
+                stats.errors += 1
+                print(f"   ❌ فشل حذف Auth user {user_id[:8]}...: {str(error)[:120]}")
+        stats.auth += len(done)
+        self.journal.record_many(done, STATUS_DONE)
+
+
+async def _delete_auth_user(engine, user_id):
+    try:
+        await engine.delete_user(user_id)
+    except Exception as e:
+        # Already gone counts as deleted
+        if error_status(e) != 404 and 'not found' not in str(e).lower():
+            raise
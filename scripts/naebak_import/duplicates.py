@@ -0,0 +1,34 @@
+"""
+Duplicate candidates found by the database.
+
+The ``find_duplicate_candidates`` SQL function (see supabase/migrations)
+groups deputy profiles by normalized name, electoral district and council
+with window functions and returns only the extra copies, oldest kept. Only
+the rows to delete cross the wire, however large the tables are.
+"""
+
+from collections import OrderedDict
+
+from .db import fetch_rpc
+
+
+def find_duplicates(candidate_type='individual', name_only=False):
+    """
+    Return the duplicate deputy profiles to delete.
+
+    Each row has deputy_id, user_id, full_name, created_at and the
+    keep_deputy_id / keep_created_at of the copy that stays, plus the
+    number of copies in its group. name_only groups by name alone.
+    """
+    return fetch_rpc('find_duplicate_candidates', {
+        'candidate_type_param': candidate_type,
+        'name_only_param': name_only,
+    })
+
+
+def group_duplicates(duplicates):
+    """Group duplicate rows by the profile that is kept, largest groups first"""
+    groups = OrderedDict()
+    for row in duplicates:
+        groups.setdefault(row['keep_deputy_id'], []).append(row)
+    return sorted(groups.values(), key=lambda rows: rows[0]['copies'], reverse=True)
@@ -0,0 +1,89 @@
+"""
+Deterministic candidate identity.
+
+A candidate is identified by normalized name, governorate, electoral
+district and council. The temporary email and the profile slug are derived
+from a hash of that key, so importing the same row twice reaches the same
+auth user and upserts the same profiles instead of creating a duplicate.
+``load_identity_index()`` maps the profiles already in the database to
+their identities, which also matches rows created before emails were
+deterministic. ``index_profiles()`` builds the same index from rows the
+caller already fetched (the reconciler reads the profiles once for both).
+"""
+
+import hashlib
+
+from .config import COUNCIL_ID
+from .arabic import normalize_arabic
+from .db import fetch_all
+from .accounts import generate_temp_email
+
+IDENTITY_HASH_LENGTH = 10
+
+# identity -> (user_id, slug) of the profile already in the database
+identity_index = {}
+_identity_loaded = False
+
+
+def candidate_identity(name, governorate_id, district_id, council_id=COUNCIL_ID, name_key=None):
+    """
+    Identity key of a candidate: (normalized name, governorate, district,
+    council). name_key is the name already normalized, if the caller has it.
+    """
+    name_key = name_key if name_key is not None else normalize_arabic(name)
+    return (name_key, governorate_id or '', district_id or '', council_id or '')
+
+
+def identity_hash(identity):
+    """Short stable hash of an identity key"""
+    return hashlib.sha1('|'.join(identity).encode('utf-8')).hexdigest()[:IDENTITY_HASH_LENGTH]
+
+
+def identity_email(name, candidate_type, identity):
+    """Temporary email that is the same on every run for this candidate"""
+    return generate_temp_email(name, candidate_type, key=identity_hash(identity))
+
+
+def identity_slug(prefix, identity):
+    """Profile slug that is the same on every run for this candidate"""
+    return f"{prefix}-{identity_hash(identity)}"
+
+
+def load_identity_index(force=False):
+    """Index the deputy profiles already in the database by identity"""
+    if _identity_loaded and not force:
+        return
+
+    users = fetch_all('user_profiles', 'id, full_name, governorate_id', role='deputy')
+    deputies = fetch_all('deputy_profiles', 'user_id, slug, electoral_district_id, council_id')
+    index_profiles(users, deputies)
+
+
+def index_profiles(users, deputies):
+    """Build the identity index from already fetched user / deputy profile rows"""
+    global _identity_loaded
+    users = {user['id']: user for user in users}
+
+    identity_index.clear()
+    duplicates = 0
+    for deputy in deputies:
+        user = users.get(deputy['user_id'])
+        if not user or not user.get('full_name'):
+            continue
+        identity = candidate_identity(user['full_name'], user.get('governorate_id'),
+                                      deputy.get('electoral_district_id'), deputy.get('council_id'))
+        if identity in identity_index:
+            duplicates += 1
+            continue
+        identity_index[identity] = (deputy['user_id'], deputy.get('slug'))
+
+    _identity_loaded = True
+    print(f"   🪪 تم فهرسة {len(identity_index)} مرشح موجود")
+    if duplicates:
+        print(f"   ⚠️  {duplicates} ملف مكرر بنفس الهوية (شغّل remove_duplicates.py)")
+
+
+def find_identity(identity):
+    """Return (user_id, slug) of an existing candidate, or None"""
+    load_identity_index()
+    return identity_index.get(identity)
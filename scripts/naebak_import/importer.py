@@ -0,0 +1,644 @@
+"""
+Candidate import pipeline shared by every importer CLI.
+
+A run is a chain of stages on the asyncio engine (``aio.py``) joined by
+bounded queues:
+
+    read -> normalize -> lookup -> auth create (``workers`` tasks) -> profile write
+
+The reader pulls ``READ_BATCH`` rows at a time from ``sources.read_rows()``
+on a thread; the normalizer keys each row for the journal (skipping finished
+ones) and normalizes the names its lookups and identity use (``RowKeys``)
+once; the resolver runs the lookups on a thread, since a new district or
+party is a blocking upsert, and sends known candidates straight to the
+writer; the auth workers create the missing users paced by the rate limiter;
+the writer batches profiles and flushes each chunk, or whatever has waited
+``writer.DEFAULT_FLUSH_INTERVAL``, while it fills the next. A full queue
+makes the stage before it wait, so at most a few batches are held in memory
+however large the sheet, while the auth workers always have rows queued.
+
+Candidates are matched on their identity (see ``identity.py``), so a
+re-import upserts the existing profiles instead of creating duplicates.
+Progress is checkpointed in an ``ImportJournal`` so a run started with
+``resume=True`` skips finished rows and completes the ones whose auth user
+already exists. Each run is a ``Telemetry`` session with read, lookup, auth
+create and profile write stages.
+
+Given a Postgres connection string (``database_url``) a run goes through
+``pgload.py`` instead: the rows are resolved up front, the auth users are
+created in bulk, and then new parties, new districts and both profile tables
+are merged with COPY in one transaction.
+"""
+
+import asyncio
+from collections import namedtuple
+from dataclasses import dataclass, field
+from itertools import islice
+
+from .config import COUNCIL_ID, SENATE_COUNCIL_ID, VIRTUAL_GOVERNORATE_ID
+from .lookups import warm_up, get_governorate_id, get_party_id, party_row, create_or_get_electoral_district
+from .accounts import (generate_temp_password, known_auth_user, load_auth_users, lookup_auth_user_async,
+                       create_auth_user_async, create_auth_users)
+from .aio import get_engine
+from .arabic import normalize_arabic
+from .identity import (candidate_identity, identity_email, identity_slug, find_identity, load_identity_index,
+                       index_profiles)
+from .concurrency import DEFAULT_WORKERS, DEFAULT_RATE, TokenBucket
+from .writer import DEFAULT_CHUNK_SIZE, ProfileWriter
+from .profiles import CONFLICT_KEYS, user_profile_row, deputy_profile_row
+from .pgload import PostgresLoader, planned_id, district_key, party_key
+from .journal import STATUS_AUTH, STATUS_DONE, ImportJournal, row_key
+from .sources import INDIVIDUAL, LIST, SENATE, read_rows, count_rows
+from .telemetry import Telemetry, stage, task_stage
+
+# Rows the reader takes from the source at a time
+READ_BATCH = 256
+
+# Batches the reader and normalizer may run ahead of the stage after them
+QUEUE_BATCHES = 4
+
+# End of a stage's output
+_DONE = object()
+
+# A row's names, normalized once by the normalize stage (None where the format has no such column)
+RowKeys = namedtuple('RowKeys', ['name', 'governorate', 'district', 'party'])
+
+
+class ImportStats:
+    """Success / error / skip counters for one import run"""
+
+    def __init__(self, total):
+        self.total = total
+        self.success = 0
+        self.errors = 0
+        self.skipped = 0
+        # Rows handed to the writer but not flushed yet
+        self.queued = 0
+
+    def progress(self, telemetry, done):
+        telemetry.progress(done, ok=self.success + self.queued, errors=self.errors, skipped=self.skipped)
+
+    def print_summary(self):
+        print(f"\n   ✅ نجح: {self.success}")
+        print(f"   ❌ فشل: {self.errors}")
+        print(f"   ⏭️  تم تخطيه: {self.skipped}")
+
+
+@dataclass
+class Candidate:
+    """A source row with its lookups resolved, waiting for an auth user"""
+    index: int
+    name: str
+    # Normalized name the identity is made from
+    name_key: str
+    candidate_type: str
+    slug_prefix: str
+    governorate_id: str = None
+    district_id: str = None
+    council_id: str = COUNCIL_ID
+    # (name, governorate_id, district_type) the district is looked up / created by
+    district: tuple = None
+    # parties row (lookups.party_row()) the party is looked up / created by
+    party: dict = None
+    # Type in the temporary email when it is not candidate_type
+    email_type: str = None
+    label: str = ''
+    user_fields: dict = field(default_factory=dict)
+    deputy_fields: dict = field(default_factory=dict)
+    key: str = None
+    identity: tuple = None
+    # Set when the database or the journal already holds this candidate's user
+    user_id: str = None
+    slug: str = None
+
+
+def _resolve_individual(idx, row, dry_run, keys):
+    candidate_name = row.name
+    governorate_name = row.governorate
+    district_name = row.district
+
+    # Get governorate ID
+    gov_id = get_governorate_id(governorate_name, key=keys.governorate)
+    if not gov_id:
+        return None
+
+    # Get or create electoral district
+    district_id = create_or_get_electoral_district(district_name, gov_id, 'individual', create=not dry_run,
+                                                   key=keys.district)
+    if not district_id and not dry_run:
+        return None
+
+    return Candidate(idx, candidate_name, keys.name, 'individual', 'candidate',
+                     governorate_id=gov_id, district_id=district_id,
+                     district=(district_name, gov_id, 'individual'),
+                     label=f"{governorate_name} - {district_name}")
+
+
+def normalize_party_name(name):
+    """Normalize list (alliance) name to handle variations"""
+    name = str(name).strip()
+    # Normalize "أجل" vs "اجل"
+    name = name.replace('اجل', 'أجل')
+    # Remove "القائمة" prefix and add "تحالف" prefix
+    name = name.replace('القائمة ', '')
+    if not name.startswith('تحالف'):
+        name = f'تحالف {name}'
+    return name
+
+
+def alliance_description(party_name):
+    """Description a party created for a list (alliance) gets"""
+    return f'تحالف انتخابي: {party_name}'
+
+
+def _resolve_list(idx, row, dry_run, keys):
+    candidate_name = row.name
+    district_name = row.district
+
+    # Get or create party (alliance)
+    party_name = normalize_party_name(row.list_name)
+    party_id = get_party_id(party_name, create=not dry_run, description=alliance_description(party_name),
+                            key=keys.party)
+    if not party_id and not dry_run:
+        return None
+
+    # List districts hang off the virtual governorate
+    district_id = create_or_get_electoral_district(district_name, VIRTUAL_GOVERNORATE_ID, 'list',
+                                                   create=not dry_run, key=keys.district)
+    if not district_id and not dry_run:
+        return None
+
+    return Candidate(idx, candidate_name, keys.name, 'list', 'list-candidate',
+                     district_id=district_id, district=(district_name, VIRTUAL_GOVERNORATE_ID, 'list'),
+                     party=party_row(party_name, alliance_description(party_name)), label=district_name,
+                     user_fields={'party_id': party_id}, deputy_fields={'party_id': party_id})
+
+
+def _resolve_senate(idx, row, dry_run, keys):
+    full_name = row.name
+    governorate_name = row.governorate
+    party_name = row.party
+
+    governorate_id = get_governorate_id(governorate_name, key=keys.governorate)
+    if not governorate_id:
+        return None
+
+    # A party that cannot be created leaves the member without one
+    party_id = get_party_id(party_name, create=not dry_run, key=keys.party) if party_name else None
+
+    candidate_type = 'individual' if row.membership == 'فردي' else 'list'
+    return Candidate(idx, full_name, keys.name, candidate_type, 'senator',
+                     governorate_id=governorate_id, council_id=SENATE_COUNCIL_ID,
+                     party=party_row(party_name) if party_name else None, email_type='senate',
+                     label=governorate_name, user_fields={'party_id': party_id},
+                     deputy_fields={'council_id': SENATE_COUNCIL_ID, 'deputy_status': 'current',
+                                    'is_current_member': True})
+
+
+# Source format name -> row resolver
+RESOLVERS = {
+    INDIVIDUAL.name: _resolve_individual,
+    LIST.name: _resolve_list,
+    SENATE.name: _resolve_senate,
+}
+
+# Source format name -> the RowKeys of a row
+NORMALIZERS = {
+    INDIVIDUAL.name: lambda row: RowKeys(normalize_arabic(row.name), normalize_arabic(row.governorate),
+                                         normalize_arabic(row.district), None),
+    LIST.name: lambda row: RowKeys(normalize_arabic(row.name), None, normalize_arabic(row.district),
+                                   normalize_arabic(normalize_party_name(row.list_name))),
+    SENATE.name: lambda row: RowKeys(normalize_arabic(row.name), normalize_arabic(row.governorate), None,
+                                     normalize_arabic(row.party)),
+}
+
+# Source format name -> what a row's lookups may create, from its RowKeys; the
+# first row of each key in a batch resolves concurrently, rows sharing a key
+# hit the cache after
+LOOKUP_KEYS = {
+    INDIVIDUAL.name: lambda keys: (keys.governorate, keys.district),
+    # Parties are inserted, not upserted: one list's rows never race
+    LIST.name: lambda keys: keys.party,
+    SENATE.name: lambda keys: keys.party,
+}
+
+
+def resolve_candidate(fmt, idx, row, dry_run=False, keys=None):
+    """
+    Resolve a source row into a Candidate with its identity, or None.
+
+    With dry_run nothing is created: a district or party that does not exist
+    yet is left as None (candidate.district and candidate.party say what
+    would be created). keys are the row's RowKeys if already normalized.
+    """
+    candidate = RESOLVERS[fmt.name](idx, row, dry_run, keys or NORMALIZERS[fmt.name](row))
+    if candidate is not None:
+        candidate.identity = candidate_identity(candidate.name, candidate.governorate_id, candidate.district_id,
+                                                candidate.council_id, name_key=candidate.name_key)
+    return candidate
+
+
+def candidate_email(candidate):
+    """Temporary email of a resolved candidate (see identity_email())"""
+    return identity_email(candidate.name, candidate.email_type or candidate.candidate_type, candidate.identity)
+
+
+def _import_rows(rows, total, fmt, dry_run, check_existing, chunk_size,
+                 workers, auth_rate, metrics, resume, journal, database_url=None):
+    if database_url:
+        return _copy_rows(rows, total, fmt, dry_run, check_existing, workers, auth_rate,
+                          metrics, journal or fmt.name, database_url)
+    warm_up()
+    load_identity_index()
+
+    stats = ImportStats(total)
+    run_name = journal or fmt.name
+    journal = None if dry_run else ImportJournal(run_name, resume=resume)
+    row_keys = {}
+
+    def checkpoint(table, row_indexes):
+        if table == 'deputy_profiles':
+            journal.record_many([(row_keys[i], i) for i in row_indexes], STATUS_DONE)
+
+    writer = ProfileWriter(chunk_size=chunk_size, on_written=checkpoint, auto_flush=False)
+    limiter = TokenBucket(auth_rate)
+    workers = max(1, int(workers))
+    rows = iter(rows)
+    queued_rows = set()
+    seen_identities = set()
+    done = 0
+    auth_loaded = False
+    index_ready = False
+
+    def advance():
+        nonlocal done
+        done += 1
+        stats.progress(telemetry, done)
+
+    def queue_profiles(candidate, user_id):
+        slug = candidate.slug or identity_slug(candidate.slug_prefix, candidate.identity)
+        writer.add_user_profile(candidate.index, user_id, candidate.name,
+                                candidate.governorate_id, **candidate.user_fields)
+        writer.add_deputy_profile(candidate.index, user_id, slug,
+                                  candidate.district_id, candidate.candidate_type,
+                                  **candidate.deputy_fields)
+        queued_rows.add(candidate.index)
+        stats.queued += 1
+
+    async def read(read_q):
+        while True:
+            with task_stage('read'):
+                batch = await asyncio.to_thread(lambda: list(islice(rows, READ_BATCH)))
+            if not batch:
+                break
+            await read_q.put(batch)
+        await read_q.put(_DONE)
+
+    async def normalize(read_q, lookup_q):
+        while (batch := await read_q.get()) is not _DONE:
+            keyed = []
+            for idx, row in batch:
+                key = row_key(fmt.name, idx, fmt.cells(row))
+                if journal and journal.is_done(key):
+                    stats.skipped += 1
+                    advance()
+                    continue
+                keyed.append((idx, row, key, NORMALIZERS[fmt.name](row)))
+            if keyed:
+                await lookup_q.put(keyed)
+        await lookup_q.put(_DONE)
+
+    def lookup_row(idx, row, key, keys):
+        try:
+            candidate = resolve_candidate(fmt, idx, row, dry_run, keys)
+            existing = candidate and find_identity(candidate.identity)
+            return idx, row, key, candidate, existing, None
+        except Exception as e:
+            return idx, row, key, None, None, e
+
+    async def lookup(batch):
+        # Lookups block on the upsert of a new district or party, so they run on threads
+        firsts = {}
+        for position, (_, _, _, keys) in enumerate(batch):
+            firsts.setdefault(LOOKUP_KEYS[fmt.name](keys), position)
+        firsts = list(firsts.values())
+        resolved = dict(zip(firsts, await asyncio.gather(
+            *(asyncio.to_thread(lookup_row, *batch[position]) for position in firsts))))
+        rest = [position for position in range(len(batch)) if position not in resolved]
+        resolved.update(zip(rest, await asyncio.to_thread(
+            lambda: [lookup_row(*batch[position]) for position in rest])))
+        return [resolved[position] for position in range(len(batch))]
+
+    async def resolve(lookup_q, auth_q, write_q):
+        while (batch := await lookup_q.get()) is not _DONE:
+            with task_stage('lookup'):
+                resolved = await lookup(batch)
+            for idx, row, key, candidate, existing, error in resolved:
+                if error is not None:
+                    print(f"   ❌ {row.name or 'Unknown'}: {str(error)[:100]}")
+                    stats.errors += 1
+                elif candidate is None:
+                    stats.errors += 1
+                elif candidate.identity in seen_identities:
+                    # Same candidate twice in the source
+                    stats.skipped += 1
+                else:
+                    seen_identities.add(candidate.identity)
+                    if existing:
+                        candidate.user_id, candidate.slug = existing
+                    if dry_run:
+                        action = 'update' if existing else 'create'
+                        print(f"   [DRY RUN] Would {action}: {candidate.name} ({candidate.label})")
+                        stats.success += 1
+                    else:
+                        candidate.key = row_keys[idx] = key
+                        candidate.user_id = candidate.user_id or journal.user_id(key)
+                        if candidate.user_id:
+                            # Known candidate or half-done row: only the profiles are (re)written
+                            await write_q.put((candidate, candidate.user_id, False))
+                        else:
+                            await auth_q.put(candidate)
+                advance()
+        for _ in range(workers):
+            await auth_q.put(_DONE)
+        await write_q.put(_DONE)
+
+    async def find_auth_user(email, index_lock):
+        nonlocal auth_loaded, index_ready
+        if not auth_loaded:
+            async with index_lock:
+                if not auth_loaded:
+                    index_ready = await asyncio.to_thread(load_auth_users)
+                    auth_loaded = True
+        user_id = known_auth_user(email)
+        if user_id or index_ready:
+            return user_id
+        # The index could not be loaded: ask auth about this email
+        return await lookup_auth_user_async(get_engine(), email)
+
+    async def create_users(auth_q, write_q, index_lock):
+        while (candidate := await auth_q.get()) is not _DONE:
+            email = candidate_email(candidate)
+            user_id = await find_auth_user(email, index_lock) if check_existing else None
+            if not user_id:
+                with task_stage('auth_create'):
+                    user_id = await create_auth_user_async(get_engine(), email, generate_temp_password(),
+                                                           candidate.name, limiter)
+            await write_q.put((candidate, user_id, True))
+        await write_q.put(_DONE)
+
+    def record_created(created):
+        for candidate, user_id in created:
+            journal.record(candidate.key, candidate.index, STATUS_AUTH, user_id=user_id)
+
+    async def write(write_q, group):
+        flushing = set()
+        finished = 0
+        # The resolver and every auth worker send _DONE
+        while finished < workers + 1:
+            try:
+                items = [await asyncio.wait_for(write_q.get(), writer.wait_time())]
+            except TimeoutError:
+                # Nothing new for a while: the buffered rows are due
+                items = []
+            while not write_q.empty():
+                items.append(write_q.get_nowait())
+            ready = []
+            for item in items:
+                if item is _DONE:
+                    finished += 1
+                elif not item[1]:
+                    stats.errors += 1
+                else:
+                    ready.append(item)
+            created = [(candidate, user_id) for candidate, user_id, new in ready if new]
+            if created:
+                # Checkpoint new users before their profiles can be marked done
+                await asyncio.to_thread(record_created, created)
+            for candidate, user_id, _ in ready:
+                queue_profiles(candidate, user_id)
+            if writer.full() or writer.due():
+                # The next buffer fills while up to writer.concurrency are written
+                if len(flushing) >= writer.concurrency:
+                    await asyncio.wait(flushing, return_when=asyncio.FIRST_COMPLETED)
+                flush = group.create_task(writer.flush_async())
+                flushing.add(flush)
+                flush.add_done_callback(flushing.discard)
+        if flushing:
+            await asyncio.wait(flushing)
+        await writer.flush_async()
+
+    async def pipeline():
+        read_q = asyncio.Queue(QUEUE_BATCHES)
+        lookup_q = asyncio.Queue(QUEUE_BATCHES)
+        auth_q = asyncio.Queue(workers)
+        write_q = asyncio.Queue(max(workers, chunk_size))
+        index_lock = asyncio.Lock()
+        async with asyncio.TaskGroup() as group:
+            group.create_task(read(read_q))
+            group.create_task(normalize(read_q, lookup_q))
+            group.create_task(resolve(lookup_q, auth_q, write_q))
+            for _ in range(workers):
+                group.create_task(create_users(auth_q, write_q, index_lock))
+            group.create_task(write(write_q, group))
+
+    telemetry = Telemetry(run_name, total, metrics).start()
+    try:
+        if dry_run:
+            # Nothing is created or written, so the engine is not needed
+            asyncio.run(pipeline())
+        else:
+            get_engine().run(pipeline())
+        failed = len(writer.failed_rows & queued_rows)
+        stats.queued = 0
+        stats.success += len(queued_rows) - failed
+        stats.errors += failed
+        stats.progress(telemetry, telemetry.done)
+    finally:
+        telemetry.close()
+
+    if journal:
+        journal.close()
+    writer.print_failures()
+    stats.print_summary()
+    return stats
+
+
+def _plan_new_rows(candidate, parties, districts):
+    """
+    Give a candidate resolved with dry_run the planned ids (see
+    pgload.planned_id()) of its party and district if they do not exist yet,
+    collecting the rows to merge into parties / districts by lookup key.
+    """
+    if candidate.party and not candidate.user_fields.get('party_id'):
+        key = party_key(candidate.party)
+        if key:
+            party = parties.setdefault(key, {'id': planned_id('parties', key), **candidate.party})
+            for fields in (candidate.user_fields, candidate.deputy_fields):
+                if 'party_id' in fields:
+                    fields['party_id'] = party['id']
+    if not candidate.district_id and candidate.district:
+        district = dict(zip(('name', 'governorate_id', 'district_type'), candidate.district))
+        key = district_key(district)
+        district = districts.setdefault(key, {'id': planned_id('electoral_districts', key), **district})
+        candidate.district_id = district['id']
+
+
+def _check_planned(table, merged, planned):
+    """Fail the transaction if a planned row was merged under another id"""
+    for key, row in planned.items():
+        if merged.get(key) != row['id']:
+            # Identities and auth emails were made from the planned id
+            raise RuntimeError(f"{table} {key} was created by another session during the load; run it again")
+
+
+def _copy_rows(rows, total, fmt, dry_run, check_existing, workers, auth_rate, metrics, run_name, database_url):
+    """
+    Import over a direct Postgres connection, all or nothing.
+
+    Every row is resolved without creating anything: a party or district
+    that does not exist yet gets its planned id, so every identity is known
+    up front. The existing candidates are read from Postgres and the missing
+    auth users are created through the admin API before a transaction is
+    opened; then one transaction merges the new parties and districts and
+    both profile tables with COPY. The journal is not used: auth users
+    created before a failure stay, and a rerun plans the same ids and finds
+    them by their deterministic email. A dry run writes nothing.
+    """
+    warm_up()
+
+    stats = ImportStats(total)
+    telemetry = Telemetry(run_name, total, metrics).start()
+    try:
+        with PostgresLoader(database_url) as db:
+            resolved = []
+            parties = {}
+            districts = {}
+            with stage('lookup'):
+                for done, (idx, row) in enumerate(rows, 1):
+                    try:
+                        candidate = resolve_candidate(fmt, idx, row, dry_run=True)
+                    except Exception as e:
+                        print(f"   ❌ {row.name or 'Unknown'}: {str(e)[:100]}")
+                        candidate = None
+                    if candidate is None:
+                        stats.errors += 1
+                    else:
+                        _plan_new_rows(candidate, parties, districts)
+                        resolved.append(candidate)
+                    stats.progress(telemetry, done)
+                index_profiles(*db.fetch_profiles())
+
+            candidates = []
+            seen_identities = set()
+            for candidate in resolved:
+                candidate.identity = candidate_identity(candidate.name, candidate.governorate_id,
+                                                        candidate.district_id, candidate.council_id,
+                                                        name_key=candidate.name_key)
+                if candidate.identity in seen_identities:
+                    # Same candidate twice in the source
+                    stats.skipped += 1
+                    continue
+                seen_identities.add(candidate.identity)
+                existing = find_identity(candidate.identity)
+                if existing:
+                    candidate.user_id, candidate.slug = existing
+                candidates.append(candidate)
+
+            if dry_run:
+                for candidate in candidates:
+                    action = 'update' if candidate.user_id else 'create'
+                    print(f"   [DRY RUN] Would {action}: {candidate.name} ({candidate.label})")
+                print(f"   [DRY RUN] Would create {len(parties)} parties and {len(districts)} districts")
+                stats.success = len(candidates)
+            else:
+                new = [c for c in candidates if not c.user_id]
+                requests = [(candidate_email(c), generate_temp_password(), c.name) for c in new]
+                with stage('auth_create'):
+                    user_ids = create_auth_users(requests, check_existing=check_existing,
+                                                 workers=workers, limiter=TokenBucket(auth_rate))
+                for candidate, user_id in zip(new, user_ids):
+                    candidate.user_id = user_id
+                ready = [c for c in candidates if c.user_id]
+                stats.errors += len(candidates) - len(ready)
+
+                with stage('profile_write'), db.transaction():
+                    _check_planned('parties', db.merge_parties(parties.values()), parties)
+                    _check_planned('electoral_districts', db.merge_districts(districts.values()), districts)
+                    db.upsert('user_profiles', [
+                        user_profile_row(c.user_id, c.name, c.governorate_id, **c.user_fields)
+                        for c in ready], CONFLICT_KEYS['user_profiles'])
+                    db.upsert('deputy_profiles', [
+                        deputy_profile_row(c.user_id, c.slug or identity_slug(c.slug_prefix, c.identity),
+                                           c.district_id, c.candidate_type, **c.deputy_fields)
+                        for c in ready], CONFLICT_KEYS['deputy_profiles'])
+                stats.success = len(ready)
+        stats.progress(telemetry, telemetry.done)
+    finally:
+        telemetry.close()
+
+    stats.print_summary()
+    return stats
+
+
+def import_individual_candidates(source, dry_run=False, check_existing=True, chunk_size=DEFAULT_CHUNK_SIZE,
+                                 workers=DEFAULT_WORKERS, auth_rate=DEFAULT_RATE, metrics=None,
+                                 resume=False, journal=None, start=0, stop=None, database_url=None):
+    """
+    Import individual candidates from a sheet in the جميعالمرشحين layout.
+
+    source is a spreadsheet path or a DataFrame; start / stop select rows.
+    metrics is the JSONL metrics file (default: one per run in .cache/metrics).
+    database_url loads through Postgres directly (see _copy_rows()).
+    """
+    return _import_rows(read_rows(source, INDIVIDUAL, start, stop),
+                        count_rows(source, INDIVIDUAL, start, stop),
+                        INDIVIDUAL, dry_run, check_existing, chunk_size, workers, auth_rate,
+                        metrics, resume, journal, database_url)
+
+
+def import_list_candidates(source, dry_run=False, check_existing=True, chunk_size=DEFAULT_CHUNK_SIZE,
+                           workers=DEFAULT_WORKERS, auth_rate=DEFAULT_RATE, metrics=None,
+                           resume=False, journal=None, start=0, stop=None, database_url=None):
+    """
+    Import list candidates from a sheet in the جميعمرشحيالقوائم layout.
+
+    source is a spreadsheet path or a DataFrame; start / stop select rows.
+    metrics is the JSONL metrics file (default: one per run in .cache/metrics).
+    database_url loads through Postgres directly (see _copy_rows()).
+    """
+    return _import_rows(read_rows(source, LIST, start, stop),
+                        count_rows(source, LIST, start, stop),
+                        LIST, dry_run, check_existing, chunk_size, workers, auth_rate,
+                        metrics, resume, journal, database_url)
+
+
+def import_senate_members(source, dry_run=False, check_existing=True, chunk_size=DEFAULT_CHUNK_SIZE,
+                          workers=DEFAULT_WORKERS, auth_rate=DEFAULT_RATE, metrics=None,
+                          resume=False, journal=None, start=0, stop=None, database_url=None):
+    """
+    Import Senate members, as current members, from a sheet in the
+    senate_members layout.
+
+    source is a spreadsheet path or a DataFrame; start / stop select rows.
+    metrics is the JSONL metrics file (default: one per run in .cache/metrics).
+    database_url loads through Postgres directly (see _copy_rows()).
+    """
+    return _import_rows(read_rows(source, SENATE, start, stop),
+                        count_rows(source, SENATE, start, stop),
+                        SENATE, dry_run, check_existing, chunk_size, workers, auth_rate,
+                        metrics, resume, journal, database_url)
+
+
+def import_records(fmt, rows, dry_run=False, check_existing=True, chunk_size=DEFAULT_CHUNK_SIZE,
+                   workers=DEFAULT_WORKERS, auth_rate=DEFAULT_RATE, metrics=None,
+                   resume=False, journal=None, database_url=None):
+    """
+    Import already read (row_index, record) pairs of a source format.
+
+    Used to execute a reconciliation plan: only the rows the plan selected
+    are resolved and written.
+    """
+    rows = list(rows)
+    return _import_rows(rows, len(rows), fmt, dry_run, check_existing, chunk_size, workers,
+                        auth_rate, metrics, resume, journal, database_url)
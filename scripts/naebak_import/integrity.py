@@ -0,0 +1,137 @@
+"""
+Referential integrity scan across auth users, user_profiles and
+deputy_profiles.
+
+The three id sets are streamed (keyset pages, auth pages) on parallel
+threads into sorted NumPy byte-string arrays, 36 bytes per id, and every
+orphan class is computed from them with sorted lookups
+(``np.searchsorted``), so the scan is complete and stays fast and compact
+however many users there are. ``repair()`` hands the orphans to
+``CascadeDeleter`` in chunks.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .db import stream_rows
+from .accounts import stream_auth_users
+from .deletion import CascadeDeleter
+
+# Orphan class -> description shown in reports
+ORPHAN_CLASSES = {
+    'auth_without_profile': 'Auth user بلا user_profiles',
+    'profile_without_auth': 'user_profiles بلا Auth user',
+    'deputy_without_profile': 'deputy_profiles بلا user_profiles',
+    'deputy_user_without_deputy_profile': 'مستخدم بدور deputy بلا deputy_profiles',
+}
+
+
+def _sorted_ids(ids):
+    """Sorted unique array of ids"""
+    return np.unique(np.array(list(ids), dtype='S36'))
+
+
+def missing_from(ids, reference):
+    """Elements of the sorted array ids that are not in the sorted array reference"""
+    if not len(reference):
+        return ids
+    positions = np.searchsorted(reference, ids)
+    positions[positions == len(reference)] = 0
+    return ids[reference[positions] != ids]
+
+
+def _decode(ids):
+    return [value.decode('ascii') for value in ids]
+
+
+@dataclass
+class IntegrityReport:
+    """Ids of each orphan class, plus the size of each table scanned"""
+    auth_users: int = 0
+    user_profiles: int = 0
+    deputy_profiles: int = 0
+    # orphan class -> list of ids (auth / user_profiles ids, deputy_profiles user_id)
+    orphans: dict = field(default_factory=dict)
+
+    def count(self, orphan_class):
+        return len(self.orphans.get(orphan_class, ()))
+
+    @property
+    def total(self):
+        return sum(len(ids) for ids in self.orphans.values())
+
+    def print_summary(self):
+        print(f"   • Auth users: {self.auth_users}")
+        print(f"   • user_profiles: {self.user_profiles}")
+        print(f"   • deputy_profiles: {self.deputy_profiles}")
+        for orphan_class, label in ORPHAN_CLASSES.items():
+            print(f"   {'⚠️ ' if self.count(orphan_class) else '✅'} {label}: {self.count(orphan_class)}")
+
+
+def _auth_ids(prefetch):
+    return _sorted_ids(user.id for user in stream_auth_users(prefetch=prefetch))
+
+
+def _profile_ids(prefetch):
+    ids = []
+    deputies = []
+    for row in stream_rows('user_profiles', 'id, role', prefetch=prefetch):
+        ids.append(row['id'])
+        if row.get('role') == 'deputy':
+            deputies.append(row['id'])
+    return _sorted_ids(ids), _sorted_ids(deputies)
+
+
+def _deputy_user_ids(prefetch):
+    return _sorted_ids(row['user_id'] for row in stream_rows('deputy_profiles', 'id, user_id', prefetch=prefetch)
+                       if row.get('user_id'))
+
+
+def scan_integrity(prefetch=True):
+    """Stream the three identity tables and return an IntegrityReport"""
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        auth_future = pool.submit(_auth_ids, prefetch)
+        profiles_future = pool.submit(_profile_ids, prefetch)
+        deputies_future = pool.submit(_deputy_user_ids, prefetch)
+        auth_ids = auth_future.result()
+        profile_ids, deputy_role_ids = profiles_future.result()
+        deputy_user_ids = deputies_future.result()
+
+    return IntegrityReport(
+        auth_users=len(auth_ids),
+        user_profiles=len(profile_ids),
+        deputy_profiles=len(deputy_user_ids),
+        orphans={
+            'auth_without_profile': _decode(missing_from(auth_ids, profile_ids)),
+            'profile_without_auth': _decode(missing_from(profile_ids, auth_ids)),
+            'deputy_without_profile': _decode(missing_from(deputy_user_ids, profile_ids)),
+            'deputy_user_without_deputy_profile': _decode(missing_from(deputy_role_ids, deputy_user_ids)),
+        },
+    )
+
+
+def repair(report, profiles=False, **options):
+    """
+    Delete orphans in chunks: auth users without a profile always, and with
+    profiles=True also profile rows whose user is gone. Deputy users without
+    a deputy profile are left to fix_missing_deputy_profiles.py.
+
+    options are CascadeDeleter options. Returns {'auth_without_profile' /
+    'dangling_profiles': DeletionStats}.
+    """
+    results = {}
+    # On resume the deleter also finishes what an interrupted run left
+    resume = options.get('resume', False)
+    if report.orphans.get('auth_without_profile') or resume:
+        deleter = CascadeDeleter('cleanup_orphaned_users', profiles=False, **options)
+        results['auth_without_profile'] = deleter.run(report.orphans['auth_without_profile'])
+
+    if profiles:
+        # Profile rows whose user no longer exists: no auth user to delete
+        dangling = report.orphans.get('profile_without_auth', []) + report.orphans.get('deputy_without_profile', [])
+        if dangling or resume:
+            deleter = CascadeDeleter('cleanup_orphaned_profiles', auth=False, **options)
+            results['dangling_profiles'] = deleter.run(dangling)
+    return results
@@ -0,0 +1,98 @@
+"""
+Append-only checkpoint journal for the importers and bulk deletions.
+
+Every source row is keyed by a hash of its Excel row number and contents.
+The journal records the auth user created for a row (``auth``) and the
+moment its profiles were written (``done``), one JSON object per line,
+flushed and fsynced as it is written. ``--resume`` replays the journal:
+done rows are skipped and rows that only got as far as ``auth`` reuse their
+user instead of creating a second one. Bulk deletions key their entries by
+user id instead (see ``deletion.py``).
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from .config import STATE_DIR
+
+JOURNAL_DIR = os.path.join(STATE_DIR, 'journals')
+
+STATUS_AUTH = 'auth'
+STATUS_DONE = 'done'
+
+
+def journal_path(name):
+    """Return the path of the journal file for an import name"""
+    return os.path.join(JOURNAL_DIR, f"{name}.jsonl")
+
+
+def row_key(kind, index, cells):
+    """Stable key of a source row: import kind, row number and header -> value cells"""
+    values = {str(column): (None if value is None or value != value else str(value))
+              for column, value in cells.items()}
+    payload = json.dumps([kind, int(index), values], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class ImportJournal:
+    """Row checkpoints for one import, persisted as JSON lines"""
+
+    def __init__(self, name, resume=False):
+        self.path = journal_path(name)
+        # row key -> merged journal entry
+        self.entries = {}
+        self._lock = threading.Lock()
+        os.makedirs(JOURNAL_DIR, exist_ok=True)
+        if resume:
+            self._load()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            print(f"   📒 لا يوجد سجل سابق في {self.path}")
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A crash can leave the last line half written
+                    continue
+                self.entries.setdefault(record['key'], {}).update(record)
+        done = sum(1 for entry in self.entries.values() if entry.get('status') == STATUS_DONE)
+        print(f"   📒 السجل: {done} مكتمل، {len(self.entries) - done} غير مكتمل")
+
+    def is_done(self, key):
+        return self.entries.get(key, {}).get('status') == STATUS_DONE
+
+    def user_id(self, key):
+        """Auth user already created for a row, if any"""
+        return self.entries.get(key, {}).get('user_id')
+
+    def record(self, key, row_index, status, **fields):
+        self.record_many([(key, row_index)], status, **fields)
+
+    def with_status(self, status):
+        """Keys whose latest status is status"""
+        return [key for key, entry in self.entries.items() if entry.get('status') == status]
+
+    def record_many(self, rows, status, **fields):
+        """Append one record per (key, row_index) and sync them to disk"""
+        if not rows:
+            return
+        now = time.strftime('%Y-%m-%dT%H:%M:%S')
+        with self._lock:
+            for key, row_index in rows:
+                record = {'key': key, 'status': status, 'at': now, **fields}
+                if row_index is not None:
+                    record['row'] = int(row_index)
+                self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+                self.entries.setdefault(key, {}).update(record)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
@@ -0,0 +1,116 @@
+"""
+Per-endpoint request latencies.
+
+Every Supabase call the library makes runs inside ``timed(endpoint)``
+(``select:user_profiles``, ``upsert:deputy_profiles``,
+``auth:create_user``, ...). The most recent samples of each endpoint are
+kept in ``scripts/.cache/latencies.json`` when the process exits, so the
+planner (``planning.py``) can estimate a run's duration from what the same
+requests actually took before.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from .config import STATE_DIR
+from .telemetry import request_finished
+
+LATENCY_FILE = os.path.join(STATE_DIR, '.cache', 'latencies.json')
+
+# Samples kept per endpoint
+MAX_SAMPLES = 500
+
+# Seconds per request assumed until an endpoint has been measured
+DEFAULT_LATENCY = {
+    'select': 0.3,
+    'rpc': 0.5,
+    'upsert': 0.4,
+    'insert': 0.3,
+    'delete': 0.3,
+    # Direct Postgres backend (pgload.py): one statement for a whole table
+    'copy': 0.5,
+    'merge': 0.5,
+    'query': 0.3,
+    'commit': 0.05,
+    'auth:list_users': 0.6,
+    'auth:find_user': 0.3,
+    'auth:create_user': 0.35,
+    'auth:delete_user': 0.25,
+}
+
+# endpoint -> durations recorded by this process
+_samples = defaultdict(list)
+_lock = threading.Lock()
+_registered = False
+
+
+def record(endpoint, seconds):
+    """Record one request's duration"""
+    global _registered
+    request_finished(endpoint, seconds)
+    with _lock:
+        _samples[endpoint].append(seconds)
+        if not _registered:
+            atexit.register(save)
+            _registered = True
+
+
+@contextmanager
+def timed(endpoint):
+    """Time the enclosed request and record it under endpoint"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(endpoint, time.perf_counter() - start)
+
+
+def _load_file():
+    try:
+        with open(LATENCY_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save():
+    """Merge this process's samples into the latency file"""
+    with _lock:
+        if not _samples:
+            return
+        stored = _load_file()
+        for endpoint, durations in _samples.items():
+            stored[endpoint] = (stored.get(endpoint, []) + durations)[-MAX_SAMPLES:]
+        _samples.clear()
+    try:
+        os.makedirs(os.path.dirname(LATENCY_FILE), exist_ok=True)
+        partial = f"{LATENCY_FILE}.partial"
+        with open(partial, 'w', encoding='utf-8') as f:
+            json.dump(stored, f)
+        os.replace(partial, LATENCY_FILE)
+    except OSError as e:
+        print(f"   ⚠️  تعذر حفظ أزمنة الطلبات: {e}")
+
+
+def samples(endpoint):
+    """Recorded durations of an endpoint (earlier runs and this one)"""
+    with _lock:
+        current = list(_samples.get(endpoint, ()))
+    return _load_file().get(endpoint, []) + current
+
+
+def estimate(endpoint):
+    """
+    Return (seconds per request, number of samples) for an endpoint: the
+    median of its recorded durations, or a default when it was never measured.
+    """
+    durations = sorted(samples(endpoint))
+    if durations:
+        return durations[len(durations) // 2], len(durations)
+    kind = endpoint.split(':')[0]
+    return DEFAULT_LATENCY.get(endpoint, DEFAULT_LATENCY.get(kind, 0.3)), 0
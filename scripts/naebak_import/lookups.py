@@ -0,0 +1,140 @@
+"""
+Governorate, electoral district and party lookups shared by the importers.
+
+``warm_up()`` reads the three lookup tables once (one paged read each) into
+in-memory indexes keyed by normalized name. After that, lookups never hit the
+network; only genuinely new districts and parties are inserted. Misses are
+cached too, so a bad governorate name costs one warning, not one query per row.
+Inserts are retried on 429 / 5xx like every engine request, and one that
+still fails is not cached: the next row asks again.
+"""
+
+import json
+import os
+
+from slugify import slugify
+
+from .arabic import normalize_arabic
+from .aio import run_request
+from .config import SCRIPTS_DIR
+from .db import fetch_all
+
+# normalized name -> id (None marks a known miss)
+governorate_index = {}
+# (normalized name, governorate_id, district_type) -> id
+district_index = {}
+# normalized name_ar -> id
+party_index = {}
+
+# Spreadsheet spellings that are not just normalization variants (مرسى مطروح -> مطروح)
+GOVERNORATE_ALIASES_FILE = os.path.join(SCRIPTS_DIR, 'governorate_mapping.json')
+governorate_aliases = {}
+
+_loaded = False
+
+
+def _load_aliases():
+    if not os.path.exists(GOVERNORATE_ALIASES_FILE):
+        return
+    with open(GOVERNORATE_ALIASES_FILE, 'r', encoding='utf-8') as f:
+        mapping = json.load(f)
+    for source, target in mapping.items():
+        governorate_aliases[normalize_arabic(source)] = normalize_arabic(target)
+
+
+def warm_up(force=False):
+    """Load governorates, electoral districts and parties into the indexes"""
+    global _loaded
+    if _loaded and not force:
+        return
+
+    governorate_index.clear()
+    district_index.clear()
+    party_index.clear()
+    governorate_aliases.clear()
+    _load_aliases()
+
+    for governorate in fetch_all('governorates', 'id, name_ar'):
+        governorate_index[normalize_arabic(governorate['name_ar'])] = governorate['id']
+
+    for district in fetch_all('electoral_districts', 'id, name, governorate_id, district_type'):
+        key = (normalize_arabic(district['name']), district['governorate_id'], district['district_type'])
+        district_index[key] = district['id']
+
+    for party in fetch_all('parties', 'id, name_ar'):
+        party_index[normalize_arabic(party['name_ar'])] = party['id']
+
+    _loaded = True
+    print(f"   📚 تم تحميل {len(governorate_index)} محافظة و {len(district_index)} دائرة و {len(party_index)} حزب")
+
+
+def get_governorate_id(governorate_name, key=None):
+    """Get governorate ID by name (key: the name already normalized)"""
+    warm_up()
+    key = key if key is not None else normalize_arabic(governorate_name)
+    key = governorate_aliases.get(key, key)
+    if key in governorate_index:
+        return governorate_index[key]
+
+    print(f"   ⚠️  Governorate not found: {governorate_name}")
+    governorate_index[key] = None
+    return None
+
+
+def create_or_get_electoral_district(name, governorate_id, district_type, create=True, key=None):
+    """
+    Create or get electoral district (create=False only looks it up; key:
+    the name already normalized)
+    """
+    warm_up()
+    key = (key if key is not None else normalize_arabic(name), governorate_id, district_type)
+    if key in district_index:
+        return district_index[key]
+    if not create:
+        # Not cached: a later import may still create it
+        return None
+
+    try:
+        result = run_request('upsert:electoral_districts', lambda client: client.table('electoral_districts').upsert({
+            'name': name,
+            'governorate_id': governorate_id,
+            'district_type': district_type
+        }, on_conflict='name,governorate_id,district_type').execute())
+    except Exception as e:
+        print(f"   ❌ Error with district {name}: {e}")
+        return None
+
+    district_index[key] = district_id = result.data[0]['id']
+    return district_id
+
+
+def party_row(party_name, description=None):
+    """The parties row a new party is inserted as"""
+    return {'name_ar': str(party_name).strip(), 'name_en': slugify(str(party_name)), 'description': description}
+
+
+def get_party_id(party_name, create=True, description=None, key=None):
+    """
+    Get party ID by name, creating the party if it does not exist (key: the
+    name already normalized)
+    """
+    warm_up()
+    key = key if key is not None else normalize_arabic(party_name)
+    if not key:
+        return None
+    if key in party_index:
+        return party_index[key]
+    if not create:
+        # Not cached: a later import may still create it
+        return None
+
+    party = party_row(party_name, description)
+    try:
+        result = run_request('insert:parties', lambda client: client.table('parties').insert(party).execute())
+    except Exception as e:
+        print(f"   ❌ خطأ في جلب/إضافة الحزب '{party_name}': {e}")
+        return None
+
+    party_index[key] = party_id = result.data[0]['id']
+    print(f"   ✅ تم إضافة حزب جديد: {party['name_ar']}")
+    return party_id
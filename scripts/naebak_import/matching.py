@@ -0,0 +1,170 @@
+"""
+Fuzzy candidate name matching.
+
+``NameIndex`` holds normalized names for O(1) exact lookups and a token
+index for blocking: a query is only compared with names that share one of
+its tokens (common first names only among its two rarest tokens), so
+matching stays close to linear in the number of names instead of comparing
+every pair. The names sharing the most tokens are ranked by
+character-trigram overlap and the best few are scored word by word with
+an edit distance (0..1).
+
+Names are canonicalized before indexing: the usual Arabic normalization plus
+joining the ``عبد`` / ``ابو`` prefixes to the next word, so "عبد الله" and
+"عبدالله" are the same token.
+"""
+
+import re
+from collections import Counter, defaultdict
+
+from .arabic import normalize_arabic
+
+# Scores at or above this are treated as the same person
+DEFAULT_MIN_SCORE = 0.88
+
+# Tokens shared by more names than this are too common to block on
+MAX_BLOCK_SIZE = 500
+
+# Blocked candidates (most shared tokens first) ranked by trigram overlap
+MAX_CANDIDATES = 50
+
+# Trigram-ranked candidates that get the (slower) edit-distance score
+SCORED_CANDIDATES = 5
+
+_JOINED_PREFIXES = re.compile(r'(^| )(عبد|ابو) ')
+
+
+def canonical_name(name):
+    """Normalized name with compound prefixes joined to the following word"""
+    text = normalize_arabic(name)
+    previous = None
+    while previous != text:
+        previous = text
+        text = _JOINED_PREFIXES.sub(r'\1\2', text)
+    return text
+
+
+def _trigrams(text):
+    padded = f"  {text.replace(' ', '')} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b):
+    """Levenshtein distance between two strings"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def _token_allowance(token):
+    # One typo in short names, two in long ones
+    return 1 if len(token) <= 5 else 2
+
+
+def name_score(a, b):
+    """
+    Similarity of two canonical names, 0..1 (1 - edit distance / length).
+
+    Names must have the same number of words and each word may differ by at
+    most a typo or two; otherwise relatives such as two siblings (same
+    father and grandfather, different first name) would look alike.
+    """
+    if a == b:
+        return 1.0
+    tokens_a, tokens_b = a.split(), b.split()
+    if len(tokens_a) != len(tokens_b):
+        return 0.0
+    distance = 0
+    for token_a, token_b in zip(tokens_a, tokens_b):
+        if token_a == token_b:
+            continue
+        token_distance = edit_distance(token_a, token_b)
+        if token_distance > _token_allowance(min(token_a, token_b, key=len)):
+            return 0.0
+        distance += token_distance
+    return 1.0 - distance / max(len(a), len(b))
+
+
+class NameIndex:
+    """Exact and fuzzy lookup of names to caller-supplied values"""
+
+    def __init__(self, min_score=DEFAULT_MIN_SCORE):
+        self.min_score = min_score
+        # canonical name -> [values]
+        self.exact = defaultdict(list)
+        # Compact form (no spaces) catches the remaining spacing variants
+        self.compact = defaultdict(list)
+        self.names = []
+        self.grams = []
+        # token -> [entry numbers]
+        self.blocks = defaultdict(list)
+
+    def add(self, name, value):
+        canonical = canonical_name(name)
+        if not canonical:
+            return
+        if canonical not in self.exact:
+            entry = len(self.names)
+            self.names.append(canonical)
+            self.grams.append(_trigrams(canonical))
+            for token in set(canonical.split()):
+                self.blocks[token].append(entry)
+            self.compact[canonical.replace(' ', '')].append(canonical)
+        self.exact[canonical].append(value)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _candidates(self, canonical):
+        """Entries sharing the most tokens with the query (blocking)"""
+        tokens = sorted(set(canonical.split()), key=lambda t: len(self.blocks.get(t, ())))
+        shared = Counter()
+        used = 0
+        for token in tokens:
+            block = self.blocks.get(token)
+            if not block:
+                continue
+            if len(block) > MAX_BLOCK_SIZE and used >= 2:
+                # Common first names would pull in most of the index
+                break
+            shared.update(block)
+            used += 1
+        if not shared:
+            return []
+        return [entry for entry, _ in shared.most_common(MAX_CANDIDATES)]
+
+    def match(self, name):
+        """
+        Return (canonical name, values, score) of the best match, or None.
+
+        Exact and spacing-only matches score 1.0; fuzzy matches need at
+        least min_score.
+        """
+        canonical = canonical_name(name)
+        if not canonical:
+            return None
+        if canonical in self.exact:
+            return canonical, self.exact[canonical], 1.0
+        same_letters = self.compact.get(canonical.replace(' ', ''))
+        if same_letters:
+            return same_letters[0], self.exact[same_letters[0]], 1.0
+
+        grams = _trigrams(canonical)
+        ranked = sorted(
+            ((len(grams & self.grams[entry]) / (len(grams) + len(self.grams[entry])), entry)
+             for entry in self._candidates(canonical)),
+            reverse=True)[:SCORED_CANDIDATES]
+
+        best = None
+        for _, entry in ranked:
+            score = name_score(canonical, self.names[entry])
+            if score >= self.min_score and (best is None or score > best[2]):
+                best = (self.names[entry], self.exact[self.names[entry]], score)
+        return best
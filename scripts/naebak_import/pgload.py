@@ -0,0 +1,185 @@
+"""
+Direct Postgres backend for trusted server-side bulk loads.
+
+PostgREST takes every chunk as a JSON request and upserts it on its own, so a
+national load costs thousands of round trips. A ``PostgresLoader`` holds one
+connection (the project's connection string, ``SUPABASE_DB_URL``): rows are
+streamed into temp tables with ``COPY`` and merged into ``parties``,
+``electoral_districts``, ``user_profiles`` and ``deputy_profiles`` with one
+``INSERT ... SELECT`` each, inside ``transaction()``. Nothing is visible to
+other sessions until the block ends; an error rolls everything back.
+
+Outside ``transaction()`` statements commit on their own, so the connection
+never idles in an open transaction while the importer creates the auth users
+through the admin API (they are not in reach of SQL, see ``importer.py``).
+
+Parties and districts are matched on their normalized name, like the
+``lookups.py`` indexes. New ones get ids derived from that key
+(``planned_id()``), so the identities of their candidates, and the auth
+emails made from them, are known before anything is written and stay the
+same when a failed load is run again.
+
+psycopg 3 (``pip install "psycopg[binary]"``) is only needed for this
+backend and is imported when a loader is opened.
+"""
+
+import uuid
+from contextlib import contextmanager
+
+from .arabic import normalize_arabic
+from .config import ensure_online
+from .latency import timed
+
+# Namespace of the ids planned_id() gives new parties and districts
+PLANNED_ID_NAMESPACE = uuid.UUID('5d1c7b0e-3f4a-4e55-9a6e-7c2b1f0d8e31')
+
+
+def planned_id(table, key):
+    """The id a new row of table gets for its lookup key (a str or tuple)"""
+    key = key if isinstance(key, tuple) else (key,)
+    return str(uuid.uuid5(PLANNED_ID_NAMESPACE, '/'.join([table, *map(str, key)])))
+
+
+def district_key(district):
+    """(normalized name, governorate_id, district_type), as in lookups.district_index"""
+    return normalize_arabic(district['name']), district['governorate_id'], district['district_type']
+
+
+def party_key(party):
+    """Normalized name_ar, as in lookups.party_index"""
+    return normalize_arabic(party['name_ar'])
+
+
+class PostgresLoader:
+    """One connection to COPY and merge rows through"""
+
+    def __init__(self, database_url):
+        self.database_url = database_url
+        self.connection = None
+
+    def __enter__(self):
+        ensure_online()
+        try:
+            import psycopg
+        except ImportError:
+            raise RuntimeError('The direct Postgres backend needs psycopg: pip install "psycopg[binary]"') from None
+        self.connection = psycopg.connect(self.database_url, autocommit=True)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.connection.close()
+
+    @contextmanager
+    def transaction(self):
+        """Run the block in one transaction: committed at its end, rolled back if it raises"""
+        self.connection.autocommit = False
+        try:
+            yield self
+            with timed('commit'):
+                self.connection.commit()
+        finally:
+            # A no-op after the commit
+            self.connection.rollback()
+            self.connection.autocommit = True
+
+    def merge_parties(self, parties):
+        """
+        Insert the parties (dicts with id, name_ar, name_en and description)
+        that no party matches by normalized name yet, and return normalized
+        name -> id for every party.
+        """
+        return self._merge('parties', parties, ('name_ar',), party_key)
+
+    def merge_districts(self, districts):
+        """
+        Insert the districts (dicts with id, name, governorate_id and
+        district_type) that no district matches by normalized name yet, and
+        return district_key() -> id for every district.
+        """
+        return self._merge('electoral_districts', districts, ('name', 'governorate_id', 'district_type'),
+                           district_key)
+
+    def fetch_profiles(self):
+        """(users, deputies) as identity.index_profiles() takes them"""
+        from psycopg.rows import dict_row
+        with self.connection.cursor(row_factory=dict_row) as cursor:
+            with timed('query:user_profiles'):
+                cursor.execute("""
+                    SELECT id::text AS id, full_name, governorate_id::text AS governorate_id
+                    FROM user_profiles WHERE role = 'deputy'
+                """)
+                users = cursor.fetchall()
+            with timed('query:deputy_profiles'):
+                cursor.execute("""
+                    SELECT user_id::text AS user_id, slug,
+                           electoral_district_id::text AS electoral_district_id, council_id::text AS council_id
+                    FROM deputy_profiles
+                """)
+                deputies = cursor.fetchall()
+        return users, deputies
+
+    def upsert(self, table, rows, on_conflict):
+        """
+        COPY rows (dicts) into a temp table and merge them into table on the
+        on_conflict column. Rows are grouped by column set, like the PostgREST
+        writer, so a column a row does not carry is left as it is.
+        """
+        groups = {}
+        for row in rows:
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+        with self.connection.cursor() as cursor:
+            for columns, group in groups.items():
+                temp = self._stage(cursor, table, columns, ([row[column] for column in columns] for row in group))
+                names = ', '.join(columns)
+                updates = ', '.join(f"{column} = EXCLUDED.{column}" for column in columns if column != on_conflict)
+                with timed(f'merge:{table}'):
+                    cursor.execute(f"""
+                        INSERT INTO {table} ({names}) SELECT {names} FROM {temp}
+                        ON CONFLICT ({on_conflict}) DO {f'UPDATE SET {updates}' if updates else 'NOTHING'}
+                    """)
+                cursor.execute(f"DROP TABLE {temp}")
+        return len(rows)
+
+    def _merge(self, table, rows, key_columns, key):
+        """
+        Insert the rows whose key() matches no row of table and return
+        key -> id for the whole table. The unique constraints compare raw
+        names, so spelling variants of an existing name are caught here.
+        """
+        with self.connection.cursor() as cursor:
+            merged = self._keyed(cursor, table, key_columns, key)
+            missing = {}
+            for row in rows:
+                if key(row) not in merged:
+                    missing.setdefault(key(row), row)
+            if missing:
+                columns = tuple(sorted(next(iter(missing.values()))))
+                temp = self._stage(cursor, table, columns,
+                                   ([row[column] for column in columns] for row in missing.values()))
+                names = ', '.join(columns)
+                with timed(f'merge:{table}'):
+                    # Raced in by another session since the read: theirs is kept
+                    cursor.execute(f"INSERT INTO {table} ({names}) SELECT {names} FROM {temp} ON CONFLICT DO NOTHING")
+                cursor.execute(f"DROP TABLE {temp}")
+                merged = self._keyed(cursor, table, key_columns, key)
+        return merged
+
+    def _keyed(self, cursor, table, key_columns, key):
+        """key -> id for every row of table"""
+        names = ', '.join(key_columns)
+        with timed(f'query:{table}'):
+            cursor.execute(f"SELECT id::text, {names} FROM {table}")
+            return {key(dict(zip(key_columns, [str(value) for value in values]))): row_id
+                    for row_id, *values in cursor.fetchall()}
+
+    def _stage(self, cursor, table, columns, rows):
+        """COPY rows into a temp table with table's column types; returns its name"""
+        temp = f"import_{table}"
+        names = ', '.join(columns)
+        # No constraints or defaults: the merge into table checks them
+        cursor.execute(f"CREATE TEMP TABLE {temp} AS SELECT {names} FROM {table} WITH NO DATA")
+        with timed(f'copy:{table}'):
+            with cursor.copy(f"COPY {temp} ({names}) FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row(row)
+        return temp
@@ -0,0 +1,281 @@
+"""
+Planning mode: what a bulk script would do, and how long it would take,
+without sending a single request.
+
+``load_snapshot()`` reads the tables the importers and deletions look at,
+plus the auth users, once and keeps them gzipped in
+``scripts/.cache/snapshot.json.gz`` (``refresh=True`` reads them again).
+Inside ``offline(snapshot)`` the library's reads are answered from that
+snapshot and ``get_client()`` raises, so nothing can be written. The change
+set is computed by the same code the real run uses (``reconcile()``,
+``DatabaseState``, ``scan_integrity()``) and ``CostEstimate`` prices it
+from the per-endpoint latencies recorded in ``latency.py``.
+"""
+
+import gzip
+import json
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from . import accounts, identity, lookups
+from .config import STATE_DIR, set_offline
+from .arabic import normalize_arabic
+from .db import PAGE_SIZE, fetch_all, serve_snapshot
+from .accounts import AUTH_PAGE_SIZE, AUTH_USERS, stream_auth_users
+from .reconcile import DatabaseState, reconcile
+from .concurrency import DEFAULT_WORKERS, DEFAULT_RATE
+from .writer import DEFAULT_CHUNK_SIZE, DEFAULT_WRITE_CONCURRENCY
+from .deletion import DEFAULT_DELETE_CHUNK
+from .latency import estimate
+
+SNAPSHOT_FILE = os.path.join(STATE_DIR, '.cache', 'snapshot.json.gz')
+
+# table -> columns kept in the snapshot (every column a plan reads)
+SNAPSHOT_TABLES = {
+    'governorates': 'id, name_ar',
+    'electoral_districts': 'id, name, governorate_id, district_type',
+    'parties': 'id, name_ar',
+    'user_profiles': 'id, full_name, governorate_id, party_id, role',
+    'deputy_profiles': 'id, user_id, slug, electoral_district_id, candidate_type, council_id, '
+                       'created_at, rating_average',
+}
+
+
+def _auth_users():
+    return [{'id': user.id, 'email': user.email} for user in stream_auth_users()]
+
+
+def _table(table, columns):
+    # Every row carries every column, so the snapshot answers any projection of them
+    names = [column.strip() for column in columns.split(',')]
+    return [{name: row.get(name) for name in names} for row in fetch_all(table, columns)]
+
+
+def capture_snapshot(path=SNAPSHOT_FILE):
+    """Read every snapshot table and the auth users (in parallel) and save them"""
+    with ThreadPoolExecutor(max_workers=len(SNAPSHOT_TABLES) + 1) as pool:
+        tables = {table: pool.submit(_table, table, columns) for table, columns in SNAPSHOT_TABLES.items()}
+        auth_users = pool.submit(_auth_users)
+        snapshot = {
+            'captured_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'tables': {table: future.result() for table, future in tables.items()},
+            'auth_users': auth_users.result(),
+        }
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = f"{path}.partial"
+    with gzip.open(partial, 'wt', encoding='utf-8') as f:
+        json.dump(snapshot, f, ensure_ascii=False)
+    os.replace(partial, path)
+    return snapshot
+
+
+def load_snapshot(refresh=False, path=SNAPSHOT_FILE):
+    """Return the saved snapshot, capturing it first when missing or refresh is set"""
+    if refresh or not os.path.exists(path):
+        print("📸 قراءة لقطة من قاعدة البيانات (قراءة فقط)...")
+        snapshot = capture_snapshot(path)
+    else:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            snapshot = json.load(f)
+    tables = snapshot['tables']
+    print(f"📦 لقطة {snapshot['captured_at']}: {len(tables['deputy_profiles'])} deputy_profiles، "
+          f"{len(tables['user_profiles'])} user_profiles، {len(snapshot['auth_users'])} Auth users")
+    return snapshot
+
+
+def _forget_caches():
+    # Lookups and indexes filled from the snapshot must not outlive it
+    lookups._loaded = False
+    identity._identity_loaded = False
+    accounts._auth_loaded = False
+    accounts._index_failed = False
+
+
+@contextmanager
+def offline(snapshot):
+    """Serve reads from snapshot and refuse every request while inside"""
+    serve_snapshot(dict(snapshot['tables'], **{AUTH_USERS: snapshot['auth_users']}))
+    set_offline(True)
+    _forget_caches()
+    try:
+        yield snapshot
+    finally:
+        set_offline(False)
+        serve_snapshot(None)
+        _forget_caches()
+
+
+def snapshot_count(snapshot, table, **filters):
+    """Rows of a snapshot table matching eq filters"""
+    rows = snapshot['auth_users'] if table == AUTH_USERS else snapshot['tables'][table]
+    return sum(1 for row in rows if all(row.get(column) == value for column, value in filters.items()))
+
+
+def format_duration(seconds):
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    if minutes < 60:
+        return f"{minutes}m {seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m"
+
+
+@dataclass
+class RequestGroup:
+    """count requests to one endpoint, sent by workers threads at up to rate per second"""
+    endpoint: str
+    count: int
+    workers: int = 1
+    rate: float = None
+
+    @property
+    def seconds(self):
+        latency, _ = estimate(self.endpoint)
+        seconds = self.count * latency / max(1, self.workers)
+        if self.rate:
+            seconds = max(seconds, self.count / self.rate)
+        return seconds
+
+
+@dataclass
+class CostEstimate:
+    """Requests a run would send, priced with the recorded latencies"""
+    groups: list = field(default_factory=list)
+
+    def add(self, endpoint, count, workers=1, rate=None):
+        if not count:
+            return
+        for group in self.groups:
+            if (group.endpoint, group.workers, group.rate) == (endpoint, workers, rate):
+                group.count += count
+                return
+        self.groups.append(RequestGroup(endpoint, count, workers, rate))
+
+    def read(self, snapshot, table, **filters):
+        """Keyset pages needed to stream a table (the last page is always short)"""
+        if table == AUTH_USERS:
+            self.add('auth:list_users', snapshot_count(snapshot, table) // AUTH_PAGE_SIZE + 1)
+        else:
+            self.add(f'select:{table}', snapshot_count(snapshot, table, **filters) // PAGE_SIZE + 1)
+
+    @property
+    def requests(self):
+        return sum(group.count for group in self.groups)
+
+    @property
+    def seconds(self):
+        # The stages of a run happen one after the other
+        return sum(group.seconds for group in self.groups)
+
+    def print_summary(self):
+        print(f"   {'الطلب':<34}{'العدد':>8}{'زمن الطلب':>12}{'المدة':>10}")
+        unmeasured = False
+        for group in self.groups:
+            latency, samples = estimate(group.endpoint)
+            unmeasured = unmeasured or not samples
+            name = group.endpoint + (f" ×{group.workers}" if group.workers > 1 else '')
+            print(f"   {name:<34}{group.count:>8}{latency:>11.2f}s{'' if samples else '*':<1}"
+                  f"{format_duration(group.seconds):>9}")
+        print(f"   الإجمالي: {self.requests} طلب، حوالي {format_duration(self.seconds)}")
+        if unmeasured:
+            print("   * لم يُقَس بعد: زمن افتراضي حتى أول تشغيل فعلي")
+
+
+def new_lookups(plans):
+    """Districts and parties the import would have to create: (districts, parties)"""
+    districts = set()
+    parties = set()
+    for plan in plans:
+        for item in plan.inserts + plan.updates:
+            candidate = item.candidate
+            if candidate.district is not None and candidate.district_id is None:
+                name, governorate_id, district_type = candidate.district
+                districts.add((district_type, governorate_id, normalize_arabic(name)))
+            if candidate.party is not None and candidate.user_fields.get('party_id') is None:
+                parties.add(normalize_arabic(candidate.party['name_ar']))
+    return districts, parties
+
+
+def estimate_import(snapshot, plans, rewrite_matched=True, chunk_size=DEFAULT_CHUNK_SIZE,
+                    workers=DEFAULT_WORKERS, auth_rate=DEFAULT_RATE, resume=False, metrics=None,
+                    database_url=None, cost=None):
+    """
+    Cost of importing reconciled plans (one per source). rewrite_matched
+    counts the profile upserts the importers also send for rows already in
+    the database; apply_plan() only writes inserts and updates. Takes the
+    same keyword arguments as the importers (resume and metrics do not change
+    the cost); with database_url parties, districts and profiles are one COPY
+    and one merge per table.
+    """
+    cost = cost or CostEstimate()
+    # What the importer reads before its first write
+    for table in ('governorates', 'electoral_districts', 'parties', 'deputy_profiles'):
+        cost.read(snapshot, table)
+    cost.read(snapshot, 'user_profiles', role='deputy')
+    creates = sum(len(plan.inserts) for plan in plans)
+    if creates:
+        cost.read(snapshot, AUTH_USERS)
+
+    districts, parties = new_lookups(plans)
+    if database_url:
+        cost.add('auth:create_user', creates, workers=workers, rate=auth_rate)
+        for table in ('parties', 'electoral_districts', 'user_profiles', 'deputy_profiles'):
+            cost.add(f'copy:{table}', len(plans))
+            cost.add(f'merge:{table}', len(plans))
+        return cost
+    cost.add('insert:parties', len(parties))
+    cost.add('upsert:electoral_districts', len(districts))
+    cost.add('auth:create_user', creates, workers=workers, rate=auth_rate)
+    for plan in plans:
+        rows = len(plan.inserts) + len(plan.updates) + (plan.unchanged if rewrite_matched else 0)
+        chunks = math.ceil(rows / max(1, chunk_size))
+        cost.add('upsert:user_profiles', chunks, workers=DEFAULT_WRITE_CONCURRENCY)
+        cost.add('upsert:deputy_profiles', chunks, workers=DEFAULT_WRITE_CONCURRENCY)
+    return cost
+
+
+def estimate_deletion(users, chunk_size=DEFAULT_DELETE_CHUNK, workers=DEFAULT_WORKERS,
+                      auth_rate=DEFAULT_RATE, resume=False, profiles=True, auth=True, metrics=None, cost=None):
+    """Cost of CascadeDeleter removing users (a count); takes CascadeDeleter's keyword arguments"""
+    cost = cost or CostEstimate()
+    if profiles:
+        chunks = math.ceil(users / max(1, chunk_size))
+        cost.add('delete:deputy_profiles', chunks)
+        cost.add('delete:user_profiles', chunks)
+    if auth:
+        cost.add('auth:delete_user', users, workers=workers, rate=auth_rate)
+    return cost
+
+
+def plan_import(sources, refresh=False, rewrite_matched=True, start=0, stop=None, partial=False, **options):
+    """
+    Reconcile each (label, fmt, path) source against the snapshot, print the
+    change set and what importing it would cost. Returns (plans, cost).
+    start / stop / partial are passed to reconcile() for every source.
+    """
+    snapshot = load_snapshot(refresh)
+    with offline(snapshot):
+        state = DatabaseState.load()
+        plans = []
+        for label, fmt, source in sources:
+            print(f"\n{label}:")
+            plan = reconcile(source, fmt, state=state, start=start, stop=stop, partial=partial)
+            plan.print_summary()
+            plans.append(plan)
+        cost = estimate_import(snapshot, plans, rewrite_matched=rewrite_matched, **options)
+
+    written = sum(len(plan.inserts) + len(plan.updates) + (plan.unchanged if rewrite_matched else 0)
+                  for plan in plans)
+    print("\n⏱️  تقدير التنفيذ:")
+    print("-" * 80)
+    print(f"   • Auth users جديدة: {sum(len(plan.inserts) for plan in plans)}")
+    print(f"   • ملفات شخصية تُكتب: {written}")
+    print(f"   • صفوف لن تُستورد (تعارض): {sum(len(plan.conflicts) for plan in plans)}")
+    cost.print_summary()
+    return plans, cost
@@ -0,0 +1,37 @@
+"""
+Row builders for user_profiles and deputy_profiles
+"""
+
+from .config import COUNCIL_ID, DEFAULT_AVATAR_URL
+
+# Column each table is upserted on
+CONFLICT_KEYS = {
+    'user_profiles': 'id',
+    'deputy_profiles': 'user_id',
+}
+
+
+def user_profile_row(user_id, full_name, governorate_id, **fields):
+    """Build a user_profiles row for an imported candidate"""
+    return {
+        'id': user_id,
+        'full_name': full_name,
+        'governorate_id': governorate_id,
+        'role': 'deputy',
+        'avatar_url': DEFAULT_AVATAR_URL,
+        **fields
+    }
+
+
+def deputy_profile_row(user_id, slug, district_id, candidate_type, council_id=COUNCIL_ID,
+                       deputy_status='candidate', **fields):
+    """Build a deputy_profiles row for an imported candidate"""
+    return {
+        'user_id': user_id,
+        'slug': slug,
+        'electoral_district_id': district_id,
+        'candidate_type': candidate_type,
+        'deputy_status': deputy_status,
+        'council_id': council_id,
+        **fields
+    }
@@ -0,0 +1,105 @@
+"""
+Bulk seeding of deputy ratings.
+
+Ratings are generated as NumPy arrays in one call and written through the
+``set_deputy_ratings`` SQL function (see supabase/migrations), one request
+per chunk of deputies instead of one ``update().eq('id', ...)`` per
+deputy, with ``concurrency`` chunks in flight through the asyncio engine.
+``rating_stats()`` reads the averages from the ``deputy_rating_stats``
+function, so checking the result does not fetch every row again.
+
+User ratings are kept as running sums per deputy by statement-level
+triggers (``20251108000000_incremental_deputy_ratings.sql``).
+``rating_drift()`` lists deputies whose stored sums disagree with
+``deputy_ratings`` and ``recompute_all_ratings()`` repairs them with one
+grouped aggregate.
+"""
+
+import numpy as np
+
+from .aio import run_async
+from .config import get_client
+from .db import stream_rows, fetch_rpc
+from .latency import timed
+
+# Same ranges the per-row script used
+RATING_RANGE = (2.1, 3.8)
+RATING_COUNT_RANGE = (1000, 5000)
+
+DEFAULT_RATING_CHUNK = 1000
+
+# set_deputy_ratings calls in flight at once
+DEFAULT_RATING_CONCURRENCY = 4
+
+
+def unrated_deputies():
+    """Ids of deputy profiles with no rating yet"""
+    return [deputy['id'] for deputy in stream_rows('deputy_profiles', 'id, rating_average')
+            if not deputy.get('rating_average')]
+
+
+def generate_ratings(size, seed=None):
+    """Return (averages, counts) arrays: one-decimal ratings and integer counts"""
+    rng = np.random.default_rng(seed)
+    averages = np.round(rng.uniform(*RATING_RANGE, size), 1)
+    counts = rng.integers(RATING_COUNT_RANGE[0], RATING_COUNT_RANGE[1] + 1, size)
+    return averages, counts
+
+
+def set_ratings(ids, averages, counts, chunk_size=DEFAULT_RATING_CHUNK, only_unrated=True, on_chunk=None,
+                concurrency=DEFAULT_RATING_CONCURRENCY):
+    """
+    Write ratings for ids, one set_deputy_ratings call per chunk.
+
+    Returns the number of profiles updated. on_chunk(done, total) is called
+    as each chunk finishes; the first failed chunk is raised once the
+    others are done.
+    """
+    chunks = [[{'id': deputy_id, 'rating_average': float(average), 'rating_count': int(count)}
+               for deputy_id, average, count in zip(ids[start:start + chunk_size],
+                                                     averages[start:start + chunk_size],
+                                                     counts[start:start + chunk_size])]
+              for start in range(0, len(ids), chunk_size)]
+    done = 0
+
+    async def write(engine, ratings):
+        nonlocal done
+        updated = await engine.rpc('set_deputy_ratings', {
+            'ratings_param': ratings,
+            'only_unrated_param': only_unrated,
+        })
+        done += len(ratings)
+        if on_chunk:
+            on_chunk(done, len(ids))
+        return updated or 0
+
+    results = run_async(write, chunks, concurrency)
+    errors = [error for _, error in results if error is not None]
+    if errors:
+        raise errors[0]
+    return sum(updated for updated, _ in results)
+
+
+def rating_stats():
+    """Deputy count, unrated count and rating averages computed by the database"""
+    with timed('rpc:deputy_rating_stats'):
+        result = get_client().rpc('deputy_rating_stats', {}).execute()
+    return result.data[0] if result.data else {}
+
+
+def rating_drift():
+    """Deputies whose running rating sum / count differ from deputy_ratings"""
+    return fetch_rpc('deputy_rating_drift')
+
+
+def recompute_all_ratings():
+    """Rebuild every deputy's rating totals from one grouped aggregate; returns rows fixed"""
+    with timed('rpc:recompute_all_deputy_ratings'):
+        result = get_client().rpc('recompute_all_deputy_ratings', {}).execute()
+    return result.data or 0
+
+
+def recompute_rating(deputy_id):
+    """Rebuild one deputy's totals and rating from its deputy_ratings rows"""
+    with timed('rpc:calculate_deputy_rating'):
+        get_client().rpc('calculate_deputy_rating', {'deputy_id_param': deputy_id}).execute()
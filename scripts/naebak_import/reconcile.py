@@ -0,0 +1,302 @@
+"""
+Source spreadsheet <-> database reconciliation.
+
+``DatabaseState.load()`` reads the deputy user and deputy profiles once
+(one paged scan per table) and keys every candidate by identity (see
+``identity.py``). ``reconcile()`` then hash-joins the parsed source against
+that snapshot and returns a ``ReconcilePlan``:
+
+- inserts: source rows with no candidate in the database
+- updates: matched candidates whose stored fields differ from the source
+- deletes: extra copies of a candidate (the oldest is kept) and candidates
+  no longer in the source (unless the source is only part of the list)
+- conflicts: rows that need a person to look at them (unresolved
+  governorate, the same candidate twice in the source, or a database name
+  that is only a near match in the same district)
+
+``apply_plan()`` hands the inserts and updates to the importer and, when
+asked to, the deletes to ``CascadeDeleter``; conflicts are only reported.
+The snapshot also fills the importer's identity index, so executing a plan
+does not scan the profiles a second time.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from .config import COUNCIL_ID, SENATE_COUNCIL_ID
+from .arabic import normalize_arabic
+from .db import fetch_all
+from .lookups import warm_up
+from .identity import candidate_identity, identity_slug, index_profiles
+from .matching import DEFAULT_MIN_SCORE, NameIndex
+from .sources import SENATE, read_rows
+from .importer import RESOLVERS, Candidate, resolve_candidate, import_records
+from .concurrency import DEFAULT_WORKERS, DEFAULT_RATE
+from .writer import DEFAULT_CHUNK_SIZE
+from .deletion import CascadeDeleter
+
+INSERT = 'insert'
+UPDATE = 'update'
+DELETE = 'delete'
+CONFLICT = 'conflict'
+
+# Why a row is in the plan
+REASON_MISSING = 'missing'
+REASON_CHANGED = 'changed'
+REASON_DUPLICATE = 'duplicate'
+REASON_NOT_IN_SOURCE = 'not_in_source'
+REASON_UNRESOLVED = 'unresolved'
+REASON_SOURCE_DUPLICATE = 'source_duplicate'
+REASON_SIMILAR_NAME = 'similar_name'
+
+
+@dataclass
+class DbCandidate:
+    """A deputy profile joined with its user profile"""
+    deputy_id: str
+    user_id: str
+    full_name: str
+    governorate_id: str = None
+    district_id: str = None
+    candidate_type: str = None
+    council_id: str = None
+    slug: str = None
+    party_id: str = None
+    created_at: str = ''
+    identity: tuple = None
+
+
+@dataclass
+class PlanItem:
+    """One action of a plan; row_index / record point back to the source row"""
+    action: str
+    reason: str
+    row_index: int = None
+    record: tuple = None
+    candidate: Candidate = None
+    existing: DbCandidate = None
+    # column -> (database value, source value) for updates
+    changes: dict = field(default_factory=dict)
+    score: float = None
+
+
+@dataclass
+class ReconcilePlan:
+    """Everything needed to bring the database in line with one source"""
+    fmt: object
+    source_rows: int = 0
+    db_rows: int = 0
+    unchanged: int = 0
+    inserts: list = field(default_factory=list)
+    updates: list = field(default_factory=list)
+    deletes: list = field(default_factory=list)
+    conflicts: list = field(default_factory=list)
+
+    def add(self, item):
+        {INSERT: self.inserts, UPDATE: self.updates,
+         DELETE: self.deletes, CONFLICT: self.conflicts}[item.action].append(item)
+
+    def by_reason(self, items, reason):
+        return [item for item in items if item.reason == reason]
+
+    @property
+    def matched(self):
+        """Source rows already in the database (as they are or needing an update)"""
+        return self.unchanged + len(self.updates)
+
+    def print_summary(self):
+        print(f"   • صفوف المصدر: {self.source_rows}")
+        print(f"   • مرشحين في قاعدة البيانات: {self.db_rows}")
+        print(f"   • مطابق بدون تغيير: {self.unchanged}")
+        print(f"   ➕ إضافة: {len(self.inserts)}")
+        print(f"   ✏️  تحديث: {len(self.updates)}")
+        print(f"   🗑️  حذف: {len(self.deletes)} "
+              f"(مكرر: {len(self.by_reason(self.deletes, REASON_DUPLICATE))}، "
+              f"غير موجود في المصدر: {len(self.by_reason(self.deletes, REASON_NOT_IN_SOURCE))})")
+        print(f"   ⚠️  تعارض: {len(self.conflicts)}")
+
+
+class DatabaseState:
+    """Snapshot of the deputy profiles in the database, keyed by identity"""
+
+    def __init__(self, candidates):
+        self.candidates = candidates
+        # identity -> [DbCandidate], oldest first
+        self.by_identity = defaultdict(list)
+        for candidate in candidates:
+            self.by_identity[candidate.identity].append(candidate)
+
+    @classmethod
+    def load(cls):
+        """Read user_profiles and deputy_profiles once and join them"""
+        users = fetch_all('user_profiles', 'id, full_name, governorate_id, party_id', role='deputy')
+        deputies = fetch_all('deputy_profiles',
+                             'id, user_id, slug, electoral_district_id, candidate_type, council_id, created_at')
+        # Oldest first, so the copy that is kept is the one indexed
+        deputies.sort(key=lambda deputy: deputy.get('created_at') or '')
+        index_profiles(users, deputies)
+
+        users = {user['id']: user for user in users}
+        candidates = []
+        for deputy in deputies:
+            user = users.get(deputy['user_id'])
+            if not user or not user.get('full_name'):
+                continue
+            candidates.append(DbCandidate(
+                deputy_id=deputy['id'],
+                user_id=deputy['user_id'],
+                full_name=user['full_name'],
+                governorate_id=user.get('governorate_id'),
+                district_id=deputy.get('electoral_district_id'),
+                candidate_type=deputy.get('candidate_type'),
+                council_id=deputy.get('council_id'),
+                slug=deputy.get('slug'),
+                party_id=user.get('party_id'),
+                created_at=deputy.get('created_at') or '',
+                identity=candidate_identity(user['full_name'], user.get('governorate_id'),
+                                            deputy.get('electoral_district_id'), deputy.get('council_id')),
+            ))
+        return cls(candidates)
+
+    def of_type(self, candidate_type, council_id=COUNCIL_ID):
+        return [c for c in self.candidates
+                if c.candidate_type == candidate_type and c.council_id == council_id]
+
+    def duplicates(self, candidate_type, council_id=COUNCIL_ID, name_only=False):
+        """
+        Groups of candidates sharing an identity (oldest first), largest
+        first. name_only groups by normalized name alone, like
+        find_duplicate_candidates does.
+        """
+        copies_of = defaultdict(list)
+        for candidate in self.of_type(candidate_type, council_id):
+            key = normalize_arabic(candidate.full_name) if name_only else candidate.identity
+            copies_of[key].append(candidate)
+        groups = [copies for copies in copies_of.values() if len(copies) > 1]
+        return sorted(groups, key=len, reverse=True)
+
+
+def _changes(candidate, existing):
+    """Stored fields that differ from what the importer would write"""
+    changes = {}
+    if existing.full_name != candidate.name:
+        changes['full_name'] = (existing.full_name, candidate.name)
+    if existing.candidate_type != candidate.candidate_type:
+        changes['candidate_type'] = (existing.candidate_type, candidate.candidate_type)
+    party_id = candidate.user_fields.get('party_id', existing.party_id)
+    if existing.party_id != party_id:
+        changes['party_id'] = (existing.party_id, party_id)
+    if not existing.slug:
+        changes['slug'] = (existing.slug, identity_slug(candidate.slug_prefix, candidate.identity))
+    return changes
+
+
+def _existing(state, fmt):
+    """Database candidates a source of fmt is reconciled against"""
+    if fmt.name == SENATE.name:
+        # Senate members are stored with their membership type, not the format name
+        return [c for c in state.candidates if c.council_id == SENATE_COUNCIL_ID]
+    # The importers store rows of each format with the format's name as type
+    return state.of_type(fmt.name)
+
+
+def reconcile(source, fmt, state=None, min_score=DEFAULT_MIN_SCORE, start=0, stop=None, partial=False):
+    """
+    Diff a source spreadsheet (path or DataFrame) against the database.
+
+    state is a DatabaseState to reuse; it is loaded when not given. Nothing
+    is written: districts and parties that do not exist yet stay unresolved
+    and their rows become inserts. start / stop select source rows as the
+    importers do; with a slice, or partial=True for a sheet that only holds
+    some of the candidates, database candidates missing from the source are
+    not deleted.
+    """
+    if fmt.name not in RESOLVERS:
+        raise ValueError(f"No reconciler for {fmt.name} rows")
+    warm_up()
+    state = state or DatabaseState.load()
+    existing_rows = _existing(state, fmt)
+    partial = partial or start > 0 or stop is not None
+    plan = ReconcilePlan(fmt, db_rows=len(existing_rows))
+
+    claimed = set()
+    unmatched = []
+    seen = set()
+    for idx, row in read_rows(source, fmt, start, stop):
+        plan.source_rows += 1
+        candidate = resolve_candidate(fmt, idx, row, dry_run=True)
+        if candidate is None:
+            plan.add(PlanItem(CONFLICT, REASON_UNRESOLVED, idx, row))
+            continue
+        if candidate.identity in seen:
+            plan.add(PlanItem(CONFLICT, REASON_SOURCE_DUPLICATE, idx, row, candidate))
+            continue
+        seen.add(candidate.identity)
+
+        copies = state.by_identity.get(candidate.identity)
+        if not copies:
+            unmatched.append(PlanItem(INSERT, REASON_MISSING, idx, row, candidate))
+            continue
+        existing = copies[0]
+        claimed.add(existing.deputy_id)
+        candidate.user_id, candidate.slug = existing.user_id, existing.slug
+        changes = _changes(candidate, existing)
+        if changes:
+            plan.add(PlanItem(UPDATE, REASON_CHANGED, idx, row, candidate, existing, changes))
+        else:
+            plan.unchanged += 1
+        for extra in copies[1:]:
+            claimed.add(extra.deputy_id)
+            plan.add(PlanItem(DELETE, REASON_DUPLICATE, existing=extra))
+
+    # Near matches are only looked for among unclaimed candidates of the same district
+    leftovers = [c for c in existing_rows if c.deputy_id not in claimed]
+    districts = defaultdict(lambda: NameIndex(min_score=min_score))
+    for existing in leftovers:
+        districts[existing.district_id].add(existing.full_name, existing)
+
+    for item in unmatched:
+        match = None
+        if item.candidate.district_id in districts:
+            match = districts[item.candidate.district_id].match(item.candidate.name)
+        if match is None:
+            plan.add(item)
+            continue
+        _, values, score = match
+        existing = values[0]
+        claimed.update(value.deputy_id for value in values)
+        plan.add(PlanItem(CONFLICT, REASON_SIMILAR_NAME, item.row_index, item.record, item.candidate,
+                          existing, changes={'full_name': (existing.full_name, item.candidate.name)},
+                          score=score))
+
+    if partial:
+        # The rest of the list may hold them
+        return plan
+    for existing in leftovers:
+        if existing.deputy_id not in claimed:
+            claimed.add(existing.deputy_id)
+            plan.add(PlanItem(DELETE, REASON_NOT_IN_SOURCE, existing=existing))
+    return plan
+
+
+def apply_plan(plan, delete=False, dry_run=False, chunk_size=DEFAULT_CHUNK_SIZE,
+               workers=DEFAULT_WORKERS, auth_rate=DEFAULT_RATE, resume=False, metrics=None, database_url=None):
+    """
+    Execute a plan: inserts and updates through the importer, deletes (only
+    with delete=True) through CascadeDeleter. Conflicts are left alone.
+
+    Returns (import stats or None, deletion stats or None).
+    """
+    rows = sorted((item.row_index, item.record) for item in plan.inserts + plan.updates)
+    import_stats = None
+    if rows:
+        import_stats = import_records(plan.fmt, rows, dry_run=dry_run, chunk_size=chunk_size,
+                                      workers=workers, auth_rate=auth_rate, resume=resume, metrics=metrics,
+                                      database_url=database_url)
+
+    delete_stats = None
+    if delete and plan.deletes and not dry_run:
+        deleter = CascadeDeleter(f"reconcile_{plan.fmt.name}", workers=workers,
+                                 auth_rate=auth_rate, resume=resume, metrics=metrics)
+        delete_stats = deleter.run([item.existing.user_id for item in plan.deletes])
+    return import_stats, delete_stats
@@ -0,0 +1,173 @@
+"""
+Streaming row sources for the candidate spreadsheets.
+
+Each file layout is declared once as a ``SourceFormat``: the record fields
+and the Arabic header each one is read from. ``read_rows()`` yields
+``(row_index, record)`` pairs lazily from an ``.xlsx`` (openpyxl read-only
+mode), an ``.xls`` (xlrd; told apart by content, not extension) or an
+already loaded DataFrame (``itertuples``), so memory stays flat and no row
+is boxed into a pandas Series. Row indexes are 0-based data rows, the same
+numbers ``pd.read_excel`` would give: a blank row is skipped but still
+counted, so indexes, ``start`` / ``stop`` and ``count_rows()`` all refer to
+the rows as they sit in the sheet.
+"""
+
+import os
+from collections import namedtuple
+
+
+class SourceFormat:
+    """Column layout of one kind of candidate spreadsheet"""
+
+    def __init__(self, name, columns):
+        self.name = name
+        # record field -> spreadsheet header
+        self.columns = columns
+        self.record = namedtuple(f"{name.title()}Row", list(columns))
+
+    def headers(self):
+        return list(self.columns.values())
+
+    def cells(self, record):
+        """Header -> value mapping of a record (what the journal hashes)"""
+        return dict(zip(self.columns.values(), record))
+
+
+INDIVIDUAL = SourceFormat('individual', {
+    'stage': 'المرحلة',
+    'governorate': 'المحافظة',
+    'district': 'دائرة فردي',
+    'serial': 'مسلسل',
+    'name': 'اسم المرشح',
+    'nickname': 'اسم الشهرة',
+    'party': 'الانتماء الحزبي',
+    'symbol': 'اسم الرمز',
+})
+
+LIST = SourceFormat('list', {
+    'stage': 'المرحلة',
+    'district': 'دائرة القوائم',
+    'list_name': 'اسم القائمة',
+    'position': 'أساسي/ إحتياطي',
+    'rank': 'الترتيب في القائمة',
+    'name': 'الاسم الكامل',
+    'capacity': 'صفة المرشح',
+})
+
+SENATE = SourceFormat('senate', {
+    'name': 'الاسم الكامل',
+    'governorate': 'المحافظة',
+    'membership': 'نوع العضوية',
+    'party': 'الحزب',
+})
+
+
+# First bytes of an .xls (an .xlsx is a zip archive)
+_OLE2_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+
+
+def _cell(value):
+    """Strip text, turn blanks and NaN into None and whole floats into ints"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    if isinstance(value, float):
+        if value != value:
+            return None
+        if value.is_integer():
+            return int(value)
+        return value
+    if hasattr(value, 'item'):
+        # numpy scalar
+        return _cell(value.item())
+    return value
+
+
+def _positions(header, fmt, origin):
+    header = [str(h).strip() if h is not None else '' for h in header]
+    missing = [h for h in fmt.headers() if h not in header]
+    if missing:
+        raise ValueError(f"أعمدة مفقودة في {origin}: {', '.join(missing)}")
+    return [header.index(h) for h in fmt.headers()]
+
+
+def _records(rows, fmt, origin, start=0, stop=None):
+    """Turn raw value rows (header first) into (index, record) pairs for data rows start..stop"""
+    rows = iter(rows)
+    positions = _positions(next(rows, []), fmt, origin)
+    make = fmt.record._make
+    for index, values in enumerate(rows):
+        if stop is not None and index >= stop:
+            return
+        if index < start:
+            continue
+        cells = [_cell(values[p]) if p < len(values) else None for p in positions]
+        if not any(cells):
+            # Blank separator or trailing rows in exported sheets
+            continue
+        yield index, make(cells)
+
+
+def is_xls(path):
+    """True for a legacy BIFF workbook (an OLE2 file), whatever its extension says"""
+    with open(path, 'rb') as f:
+        return f.read(8) == _OLE2_MAGIC
+
+
+def _xlsx_rows(path):
+    from openpyxl import load_workbook
+    # Opened as a file so openpyxl does not insist on an .xlsx extension
+    with open(path, 'rb') as f:
+        workbook = load_workbook(f, read_only=True, data_only=True)
+        try:
+            yield from workbook.worksheets[0].iter_rows(values_only=True)
+        finally:
+            workbook.close()
+
+
+def _xls_rows(path):
+    import xlrd
+    workbook = xlrd.open_workbook(path, on_demand=True)
+    try:
+        sheet = workbook.sheet_by_index(0)
+        for row in range(sheet.nrows):
+            yield sheet.row_values(row)
+    finally:
+        workbook.release_resources()
+
+
+def _frame_rows(df, fmt):
+    positions = _positions(list(df.columns), fmt, 'DataFrame')
+    make = fmt.record._make
+    for values in df.itertuples(index=True, name=None):
+        # values[0] is the index
+        cells = [_cell(values[p + 1]) for p in positions]
+        if any(cells):
+            yield values[0], make(cells)
+
+
+def _sheet_rows(path):
+    return _xls_rows(path) if is_xls(path) else _xlsx_rows(path)
+
+
+def read_rows(source, fmt, start=0, stop=None):
+    """
+    Yield (row_index, record) pairs from a spreadsheet path or a DataFrame.
+
+    start / stop select data rows the same way ``df.iloc[start:stop]`` does;
+    blank rows among them are skipped.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        path = os.fspath(source)
+        return _records(_sheet_rows(path), fmt, path, start, stop)
+    return _frame_rows(source.iloc[start:stop], fmt)
+
+
+def count_rows(source, fmt, start=0, stop=None):
+    """
+    Number of rows read_rows(source, fmt, start, stop) will yield. A sheet
+    is read through once to skip its blank rows the same way.
+    """
+    return sum(1 for _ in read_rows(source, fmt, start, stop))
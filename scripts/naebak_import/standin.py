@@ -0,0 +1,802 @@
+"""
+Local stand-in for the Supabase endpoints the scripts use.
+
+``LocalSupabase`` is a small HTTP server backed by SQLite that answers the
+subset of PostgREST and the GoTrue admin API the import and maintenance
+scripts send, in the same wire format, so the real supabase-py client (and
+every script, unchanged) can be pointed at it with ``SUPABASE_URL``:
+
+- ``/rest/v1/<table>``: select with eq / neq / gt / gte / lt / lte / like /
+  ilike / is / in filters, ``or=(...)`` / ``and=(...)`` trees, order, limit
+  / offset and ``Prefer: count=exact``; insert, upsert (``on_conflict``,
+  merge or ignore duplicates), update and delete with ``return=representation``
+- ``/rest/v1/rpc/<function>``: the SQL functions in ``RPC_FUNCTIONS``
+- ``/auth/v1/admin/users``: list (paged, ``filter`` by email), create and delete users
+
+The schema keeps the columns, unique constraints and cascades of the
+production tables the scripts touch; creating an auth user inserts its
+``user_profiles`` row like the ``on_auth_user_created`` trigger does.
+
+``Faults`` injects latency (per request and per row) and 429 answers, at
+random or above an auth request rate, so the scripts' batching, retries and
+rate limiting can be measured offline (see ``scripts/benchmark.py``). Every
+request is counted per endpoint, with the same names ``latency.timed()``
+uses.
+"""
+
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from .config import SCRIPTS_DIR, VIRTUAL_GOVERNORATE_ID
+from .arabic import normalize_arabic
+
+# Any non-empty key is accepted
+SERVICE_KEY = 'local-standin-service-key'
+
+SCHEMA = """
+CREATE TABLE governorates (
+    id TEXT PRIMARY KEY,
+    name_ar TEXT NOT NULL,
+    name_en TEXT,
+    code TEXT,
+    is_visible INTEGER NOT NULL DEFAULT 1,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+CREATE TABLE electoral_districts (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    name_en TEXT,
+    governorate_id TEXT NOT NULL REFERENCES governorates(id) ON DELETE CASCADE,
+    district_type TEXT NOT NULL CHECK (district_type IN ('individual', 'list')),
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    UNIQUE (name, governorate_id, district_type)
+);
+
+CREATE TABLE parties (
+    id TEXT PRIMARY KEY,
+    name_ar TEXT NOT NULL UNIQUE,
+    name_en TEXT,
+    description TEXT,
+    logo_url TEXT,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+CREATE TABLE auth_users (
+    id TEXT PRIMARY KEY,
+    email TEXT UNIQUE COLLATE NOCASE,
+    phone TEXT,
+    user_metadata TEXT NOT NULL DEFAULT '{}',
+    app_metadata TEXT NOT NULL DEFAULT '{}',
+    email_confirmed_at TEXT,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+CREATE TABLE user_profiles (
+    id TEXT PRIMARY KEY REFERENCES auth_users(id) ON DELETE CASCADE,
+    full_name TEXT,
+    avatar_url TEXT,
+    email TEXT,
+    phone TEXT,
+    role TEXT,
+    governorate_id TEXT,
+    party_id TEXT,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+CREATE TABLE deputy_profiles (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL UNIQUE REFERENCES user_profiles(id) ON DELETE CASCADE,
+    deputy_status TEXT NOT NULL DEFAULT 'candidate',
+    slug TEXT UNIQUE,
+    display_name TEXT,
+    candidate_type TEXT CHECK (candidate_type IN ('individual', 'list', 'both')),
+    electoral_district_id TEXT REFERENCES electoral_districts(id) ON DELETE SET NULL,
+    council_id TEXT,
+    party_id TEXT,
+    is_current_member INTEGER,
+    electoral_symbol TEXT,
+    electoral_number TEXT,
+    bio TEXT,
+    banner_image TEXT,
+    rating_average REAL DEFAULT 0,
+    rating_count INTEGER DEFAULT 0,
+    initial_rating_average REAL DEFAULT 0,
+    initial_rating_count INTEGER DEFAULT 0,
+    user_rating_sum INTEGER NOT NULL DEFAULT 0,
+    user_rating_count INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')),
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+
+CREATE INDEX idx_deputy_profiles_type ON deputy_profiles (candidate_type);
+CREATE INDEX idx_deputy_profiles_created ON deputy_profiles (created_at, id);
+CREATE INDEX idx_user_profiles_role ON user_profiles (role);
+
+CREATE TRIGGER on_auth_user_created AFTER INSERT ON auth_users
+BEGIN
+    INSERT INTO user_profiles (id) VALUES (NEW.id);
+END;
+"""
+
+# Tables served under /rest/v1 (auth_users is only reachable through the admin API)
+REST_TABLES = ('governorates', 'electoral_districts', 'parties', 'user_profiles', 'deputy_profiles')
+
+# Tables whose id defaults to gen_random_uuid() (user_profiles.id is the auth user's)
+GENERATED_IDS = ('governorates', 'electoral_districts', 'parties', 'deputy_profiles')
+
+# Filter operator -> SQL comparison
+_OPERATORS = {
+    'eq': '=',
+    'neq': '<>',
+    'gt': '>',
+    'gte': '>=',
+    'lt': '<',
+    'lte': '<=',
+    'like': 'LIKE',
+    'ilike': 'LIKE',
+}
+
+_LOGIC = re.compile(r'^(not\.)?(and|or)\((.*)\)$', re.S)
+
+
+@dataclass
+class Faults:
+    """Latency and throttling injected into every answer"""
+    # Seconds added to each REST / auth request (auth_latency defaults to latency)
+    latency: float = 0.0
+    auth_latency: float = None
+    # Seconds added per row a REST request writes or returns
+    row_latency: float = 0.0
+    # Each delay is scaled by a uniform factor in [1 - jitter, 1 + jitter]
+    jitter: float = 0.0
+    # Probability that a request is answered 429 instead of being executed
+    rest_429: float = 0.0
+    auth_429: float = 0.0
+    # Auth requests per second above which every auth request gets a 429
+    auth_rate_limit: float = None
+
+
+class _RequestError(Exception):
+    """An error answer: HTTP status and JSON body"""
+
+    def __init__(self, status, body):
+        super().__init__(body)
+        self.status = status
+        self.body = body
+
+
+def _rest_error(status, code, message, details=None, hint=None):
+    return _RequestError(status, {'code': code, 'message': message, 'details': details, 'hint': hint})
+
+
+def _auth_error(status, error_code, message):
+    return _RequestError(status, {'code': status, 'error_code': error_code, 'msg': message})
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _split(text, separator=','):
+    """Split on separator outside double quotes and parentheses"""
+    parts, depth, quoted, start = [], 0, False, 0
+    for i, char in enumerate(text):
+        if char == '"':
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _unquote(value):
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1].replace('\\"', '"')
+    return value
+
+
+def _prefer(headers):
+    """Prefer header as a dict (return=representation -> {'return': 'representation'})"""
+    prefer = {}
+    for item in (headers.get('Prefer') or '').split(','):
+        name, _, value = item.strip().partition('=')
+        if name:
+            prefer[name] = value
+    return prefer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _dispatch(self):
+        url = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        status, headers, payload = self.server.standin.handle(
+            self.command, unquote(url.path), parse_qsl(url.query, keep_blank_values=True), self.headers, body)
+        data = b'' if payload is None else json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(data)
+
+    do_GET = do_HEAD = do_POST = do_PATCH = do_DELETE = _dispatch
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # socketserver's default backlog of 5 drops bursts of new connections
+    request_queue_size = 1024
+
+
+class LocalSupabase:
+    """SQLite-backed PostgREST / GoTrue admin stand-in on a local port"""
+
+    def __init__(self, path=':memory:', faults=None, seed=None):
+        self.path = path
+        self.faults = faults or Faults()
+        self.requests = Counter()
+        self.throttled = Counter()
+        self._random = random.Random(seed)
+        self._auth_times = deque()
+        self._lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+        fresh = path == ':memory:' or not os.path.exists(path)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute('PRAGMA foreign_keys = ON')
+        self.db.execute('PRAGMA journal_mode = WAL')
+        # A scratch database: skip the fsync per commit that would cap the request rate
+        self.db.execute('PRAGMA synchronous = OFF')
+        self.db.create_function('normalize_arabic_name', 1, normalize_arabic, deterministic=True)
+        if fresh:
+            self.db.executescript(SCHEMA)
+        self.columns = {table: [row['name'] for row in self.db.execute(f'PRAGMA table_info({table})')]
+                        for table in REST_TABLES}
+
+    # Server lifecycle
+
+    def start(self, host='127.0.0.1', port=0):
+        """Serve on host:port (0 picks a free port) from a background thread"""
+        self._server = _Server((host, port), _Handler)
+        self._server.standin = self
+        self._thread = threading.Thread(target=self._server.serve_forever, name='local-supabase', daemon=True)
+        self._thread.start()
+        return self
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self):
+        """Environment variables that point the scripts at this server"""
+        return {'SUPABASE_URL': self.url, 'SUPABASE_SERVICE_KEY': SERVICE_KEY}
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+        self.db.close()
+
+    def __enter__(self):
+        return self.start() if self._server is None else self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # Direct access (not counted, no faults)
+
+    def query(self, sql, params=()):
+        """Run SQL against the backing database and return the rows as dicts"""
+        with self._lock, self.db:
+            return [dict(row) for row in self.db.execute(sql, params)]
+
+    def executemany(self, sql, rows):
+        with self._lock, self.db:
+            self.db.executemany(sql, rows)
+
+    def table_counts(self):
+        """Row count of every table, auth users included"""
+        counts = {table: self.query(f'SELECT COUNT(*) AS n FROM {table}')[0]['n'] for table in REST_TABLES}
+        counts['auth.users'] = self.query('SELECT COUNT(*) AS n FROM auth_users')[0]['n']
+        return counts
+
+    def seed_reference(self):
+        """
+        Insert the governorates named in electoral_districts.json, under the
+        names governorate_mapping.json gives them, and the virtual governorate
+        the list districts hang off. Returns their number.
+        """
+        with open(os.path.join(SCRIPTS_DIR, 'electoral_districts.json'), encoding='utf-8') as f:
+            districts = json.load(f)['individual_districts']
+        with open(os.path.join(SCRIPTS_DIR, 'governorate_mapping.json'), encoding='utf-8') as f:
+            mapping = json.load(f)
+        names = sorted({mapping.get(district['governorate'], district['governorate']) for district in districts})
+        rows = [(str(uuid.uuid4()), name) for name in names]
+        rows.append((VIRTUAL_GOVERNORATE_ID, 'دوائر القوائم'))
+        self.executemany('INSERT OR IGNORE INTO governorates (id, name_ar) VALUES (?, ?)', rows)
+        return len(rows)
+
+    def create_user(self, email, user_metadata=None):
+        """Create an auth user (and its user_profiles row); returns the user JSON"""
+        with self._lock, self.db:
+            return self._insert_user({'email': email, 'user_metadata': user_metadata or {},
+                                      'email_confirm': True})
+
+    def reset_counters(self):
+        with self._counter_lock:
+            self.requests.clear()
+            self.throttled.clear()
+
+    # Request handling
+
+    def handle(self, method, path, params, headers, body):
+        """Answer one HTTP request: returns (status, headers, JSON payload or None)"""
+        try:
+            payload = json.loads(body) if body else None
+        except ValueError:
+            return 400, {}, {'code': 'PGRST102', 'message': 'Empty or invalid json',
+                             'details': None, 'hint': None}
+        try:
+            if path.startswith('/rest/v1/'):
+                route = self._rest_route(method, path[len('/rest/v1/'):], headers)
+                kind = 'rest'
+            elif path.startswith('/auth/v1/admin/users'):
+                route = self._auth_route(method, path[len('/auth/v1/admin/users'):], params)
+                kind = 'auth'
+            else:
+                raise _rest_error(404, 'PGRST125', f'Invalid path specified in request URL: {path}')
+        except _RequestError as e:
+            return e.status, {}, e.body
+
+        endpoint, handler = route
+        self._count(self.requests, endpoint)
+        if self._throttle(kind):
+            self._count(self.throttled, endpoint)
+            self._delay(kind, 0)
+            if kind == 'auth':
+                body = {'code': 429, 'error_code': 'over_request_rate_limit', 'msg': 'Request rate limit reached'}
+            else:
+                # The API gateway answers, not PostgREST: no SQLSTATE, only the HTTP status
+                body = {'message': 'API rate limit exceeded'}
+            return 429, {'Retry-After': '1'}, body
+
+        try:
+            with self._lock:
+                try:
+                    with self.db:
+                        status, out_headers, result, rows = handler(params, headers, payload)
+                except sqlite3.IntegrityError as e:
+                    raise self._integrity_error(e)
+                except sqlite3.OperationalError as e:
+                    raise _rest_error(400, '42P10' if 'ON CONFLICT' in str(e) else '42601', str(e))
+        except _RequestError as e:
+            self._delay(kind, 0)
+            return e.status, {}, e.body
+        self._delay(kind, rows)
+        return status, out_headers, result
+
+    def _count(self, counter, endpoint):
+        with self._counter_lock:
+            counter[endpoint] += 1
+
+    def _throttle(self, kind):
+        faults = self.faults
+        if kind == 'auth' and faults.auth_rate_limit:
+            with self._counter_lock:
+                now = time.monotonic()
+                while self._auth_times and now - self._auth_times[0] > 1.0:
+                    self._auth_times.popleft()
+                if len(self._auth_times) >= faults.auth_rate_limit:
+                    return True
+                self._auth_times.append(now)
+        probability = faults.auth_429 if kind == 'auth' else faults.rest_429
+        return probability > 0 and self._random.random() < probability
+
+    def _delay(self, kind, rows):
+        faults = self.faults
+        latency = faults.latency
+        if kind == 'auth' and faults.auth_latency is not None:
+            latency = faults.auth_latency
+        seconds = latency + (faults.row_latency * rows if kind == 'rest' else 0)
+        if faults.jitter:
+            seconds *= self._random.uniform(1 - faults.jitter, 1 + faults.jitter)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    @staticmethod
+    def _integrity_error(error):
+        message = str(error)
+        if 'UNIQUE' in message:
+            return _rest_error(409, '23505', f'duplicate key value violates unique constraint ({message})')
+        if 'FOREIGN KEY' in message:
+            return _rest_error(409, '23503', 'insert or update violates foreign key constraint')
+        if 'NOT NULL' in message:
+            return _rest_error(400, '23502', f'null value violates not-null constraint ({message})')
+        return _rest_error(400, '23514', f'new row violates check constraint ({message})')
+
+    # PostgREST
+
+    def _rest_route(self, method, name, headers):
+        if name.startswith('rpc/'):
+            function = name[len('rpc/'):]
+            if function not in RPC_FUNCTIONS:
+                raise _rest_error(404, 'PGRST202',
+                                  f'Could not find the function public.{function} in the schema cache')
+            return f'rpc:{function}', lambda params, headers, payload: self._rpc(function, params, payload)
+        if name not in REST_TABLES:
+            raise _rest_error(404, '42P01', f'relation "public.{name}" does not exist')
+        if method in ('GET', 'HEAD'):
+            return f'select:{name}', lambda params, headers, payload: self._select(name, params, headers)
+        if method == 'POST':
+            resolution = _prefer(headers).get('resolution')
+            action = 'upsert' if resolution else 'insert'
+            return f'{action}:{name}', lambda params, headers, payload: self._insert(name, params, headers, payload)
+        if method == 'PATCH':
+            return f'update:{name}', lambda params, headers, payload: self._update(name, params, headers, payload)
+        if method == 'DELETE':
+            return f'delete:{name}', lambda params, headers, payload: self._delete(name, params, headers)
+        raise _rest_error(405, 'PGRST117', f'Unsupported HTTP method: {method}')
+
+    def _column(self, table, column):
+        if column not in self.columns[table]:
+            raise _rest_error(400, '42703', f'column {table}.{column} does not exist')
+        return f'"{column}"'
+
+    def _condition(self, table, column, expression, quoted=False):
+        """
+        SQL for column=op.value. Values inside or() / and() trees may be
+        double-quoted (quoted=True strips the quotes).
+        """
+        negate = expression.startswith('not.')
+        if negate:
+            expression = expression[len('not.'):]
+        operator, _, value = expression.partition('.')
+        if quoted and operator != 'in':
+            value = _unquote(value)
+        sql_column = self._column(table, column)
+        if operator in _OPERATORS:
+            if operator in ('like', 'ilike'):
+                value = value.replace('*', '%')
+            sql, params = f'{sql_column} {_OPERATORS[operator]} ?', [value]
+        elif operator == 'is':
+            literal = {'null': 'NULL', 'true': '1', 'false': '0'}.get(value.lower())
+            if literal is None:
+                raise _rest_error(400, 'PGRST100', f'failed to parse filter (is.{value})')
+            sql, params = (f'{sql_column} IS {literal}' if literal == 'NULL' else f'{sql_column} = {literal}'), []
+        elif operator == 'in':
+            if not (value.startswith('(') and value.endswith(')')):
+                raise _rest_error(400, 'PGRST100', f'failed to parse filter (in.{value})')
+            values = [_unquote(item) for item in _split(value[1:-1])]
+            if not values:
+                sql, params = '0', []
+            else:
+                sql, params = f"{sql_column} IN ({', '.join('?' * len(values))})", values
+        else:
+            raise _rest_error(400, 'PGRST100', f'failed to parse filter ({operator}.{value})')
+        return (f'NOT ({sql})', params) if negate else (sql, params)
+
+    def _tree(self, table, operator, items, negate=False):
+        """SQL for or=(...) / and=(...) and their nested and() / or()"""
+        parts, params = [], []
+        for item in _split(items):
+            nested = _LOGIC.match(item)
+            if nested:
+                sql, values = self._tree(table, nested.group(2), nested.group(3), bool(nested.group(1)))
+            else:
+                column, _, expression = item.partition('.')
+                sql, values = self._condition(table, column, expression, quoted=True)
+            parts.append(f'({sql})')
+            params.extend(values)
+        sql = f" {operator.upper()} ".join(parts) or '1'
+        return (f'NOT ({sql})' if negate else sql), params
+
+    def _where(self, table, params):
+        """WHERE clause for the filters in the query parameters"""
+        parts, values = [], []
+        for name, value in params:
+            if name in ('select', 'order', 'limit', 'offset', 'on_conflict', 'columns'):
+                continue
+            if name in ('or', 'and', 'not.or', 'not.and'):
+                negate = name.startswith('not.')
+                if not (value.startswith('(') and value.endswith(')')):
+                    raise _rest_error(400, 'PGRST100', f'failed to parse logic tree ({value})')
+                sql, params_ = self._tree(table, name.split('.')[-1], value[1:-1], negate)
+            else:
+                sql, params_ = self._condition(table, name, value)
+            parts.append(f'({sql})')
+            values.extend(params_)
+        return (' WHERE ' + ' AND '.join(parts) if parts else ''), values
+
+    def _projection(self, table, params):
+        select = dict(params).get('select', '*')
+        columns = []
+        for item in _split(select):
+            if item == '*':
+                columns.extend(f'"{column}"' for column in self.columns[table])
+                continue
+            if '(' in item:
+                raise _rest_error(400, 'PGRST200', f'resource embedding ({item}) is not supported by the local stand-in')
+            alias, _, column = item.rpartition(':')
+            column = column.split('::')[0].strip()
+            sql = self._column(table, column)
+            columns.append(f'{sql} AS "{alias.strip()}"' if alias else sql)
+        return ', '.join(columns) or '*'
+
+    def _order(self, table, params):
+        order = dict(params).get('order')
+        if not order:
+            return ''
+        terms = []
+        for item in _split(order):
+            column, *modifiers = item.split('.')
+            term = self._column(table, column)
+            if 'desc' in modifiers:
+                term += ' DESC'
+            if 'nullsfirst' in modifiers:
+                term += ' NULLS FIRST'
+            elif 'nullslast' in modifiers:
+                term += ' NULLS LAST'
+            terms.append(term)
+        return ' ORDER BY ' + ', '.join(terms)
+
+    @staticmethod
+    def _page(params):
+        params = dict(params)
+        limit = int(params['limit']) if params.get('limit') else None
+        offset = int(params['offset']) if params.get('offset') else 0
+        return limit, offset
+
+    @staticmethod
+    def _content_range(offset, returned, total):
+        first = f'{offset}-{offset + returned - 1}' if returned else '*'
+        return {'Content-Range': f"{first}/{'*' if total is None else total}"}
+
+    def _select(self, table, params, headers):
+        where, values = self._where(table, params)
+        limit, offset = self._page(params)
+        sql = f'SELECT {self._projection(table, params)} FROM {table}{where}{self._order(table, params)}'
+        sql += f' LIMIT {-1 if limit is None else limit} OFFSET {offset}'
+        rows = [dict(row) for row in self.db.execute(sql, values)]
+        total = None
+        if _prefer(headers).get('count') in ('exact', 'planned', 'estimated'):
+            total = self.db.execute(f'SELECT COUNT(*) FROM {table}{where}', values).fetchone()[0]
+        return 200, self._content_range(offset, len(rows), total), rows, len(rows)
+
+    def _insert(self, table, params, headers, payload):
+        rows = payload if isinstance(payload, list) else [payload]
+        if not all(isinstance(row, dict) for row in rows):
+            raise _rest_error(400, 'PGRST102', 'All object keys must match')
+        prefer = _prefer(headers)
+        params = dict(params)
+        if params.get('columns'):
+            columns = [_unquote(column.strip()) for column in params['columns'].split(',')]
+        else:
+            columns = sorted({column for row in rows for column in row})
+        conflict = params.get('on_conflict')
+        conflict = conflict.split(',') if conflict else ['id']
+        resolution = prefer.get('resolution')
+        missing_default = prefer.get('missing') == 'default'
+        written = []
+        for row in rows:
+            row = {column: row.get(column) for column in columns if column in row or not missing_default}
+            # Defaults only apply to the insert; like PostgREST, every column sent is set
+            # again on conflict, so the row comes back even when only the key was sent
+            defaulted = set()
+            if table in GENERATED_IDS and row.get('id') is None:
+                row['id'] = str(uuid.uuid4())
+                defaulted.add('id')
+            names = [self._column(table, column) for column in row]
+            sql = f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(row))})"
+            if resolution:
+                target = ', '.join(self._column(table, column) for column in conflict)
+                updates = [f'{name} = excluded.{name}' for column, name in zip(row, names)
+                           if column not in defaulted]
+                if resolution == 'merge-duplicates' and updates:
+                    sql += f" ON CONFLICT ({target}) DO UPDATE SET {', '.join(updates)}"
+                else:
+                    sql += f' ON CONFLICT ({target}) DO NOTHING'
+            values = [json.dumps(value) if isinstance(value, (dict, list)) else value for value in row.values()]
+            written.extend(dict(result) for result in self.db.execute(sql + ' RETURNING *', values))
+        body = written if prefer.get('return') == 'representation' else None
+        return 201, {}, body, len(rows)
+
+    def _update(self, table, params, headers, payload):
+        if not isinstance(payload, dict) or not payload:
+            raise _rest_error(400, 'PGRST102', 'Empty or invalid json')
+        where, values = self._where(table, params)
+        assignments = ', '.join(f'{self._column(table, column)} = ?' for column in payload)
+        sql = f'UPDATE {table} SET {assignments}{where} RETURNING *'
+        rows = [dict(row) for row in self.db.execute(sql, list(payload.values()) + values)]
+        body = rows if _prefer(headers).get('return') == 'representation' else None
+        return 200, {}, body, len(rows)
+
+    def _delete(self, table, params, headers):
+        where, values = self._where(table, params)
+        rows = [dict(row) for row in self.db.execute(f'DELETE FROM {table}{where} RETURNING *', values)]
+        body = rows if _prefer(headers).get('return') == 'representation' else None
+        return 200, {}, body, len(rows)
+
+    def _rpc(self, function, params, payload):
+        arguments = payload or {}
+        func, signature = RPC_FUNCTIONS[function]
+        unknown = set(arguments) - set(signature)
+        if unknown:
+            raise _rest_error(404, 'PGRST202', f'Could not find the function public.{function}'
+                                               f"({', '.join(sorted(arguments))}) in the schema cache")
+        result = func(self.db, {**signature, **arguments})
+        if isinstance(result, list):
+            limit, offset = self._page(params)
+            result = result[offset:None if limit is None else offset + limit]
+            return 200, self._content_range(offset, len(result), None), result, len(result)
+        return 200, {}, result, 1
+
+    # GoTrue admin API
+
+    def _auth_route(self, method, rest, params):
+        user_id = rest.strip('/')
+        if not user_id:
+            if method == 'GET':
+                endpoint = 'auth:find_user' if dict(params).get('filter') else 'auth:list_users'
+                return endpoint, lambda params, headers, payload: self._list_users(params)
+            if method == 'POST':
+                return 'auth:create_user', lambda params, headers, payload: (200, {}, self._insert_user(payload), 1)
+        elif method == 'DELETE':
+            return 'auth:delete_user', lambda params, headers, payload: self._delete_user(user_id)
+        raise _auth_error(405, 'method_not_allowed', f'{method} is not supported by the local stand-in')
+
+    @staticmethod
+    def _user_json(row):
+        return {
+            'id': row['id'],
+            'aud': 'authenticated',
+            'role': 'authenticated',
+            'email': row['email'],
+            'phone': row['phone'] or '',
+            'email_confirmed_at': row['email_confirmed_at'],
+            'confirmed_at': row['email_confirmed_at'],
+            'app_metadata': json.loads(row['app_metadata']),
+            'user_metadata': json.loads(row['user_metadata']),
+            'identities': [],
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at'],
+            'is_anonymous': False,
+        }
+
+    def _list_users(self, params):
+        params = dict(params)
+        page = max(1, int(params.get('page') or 1))
+        per_page = max(1, int(params.get('per_page') or 50))
+        # GoTrue's filter: a case-insensitive substring of the email
+        where, arguments = ('WHERE instr(lower(email), lower(?)) > 0', (params['filter'],)) \
+            if params.get('filter') else ('', ())
+        rows = self.db.execute(f'SELECT * FROM auth_users {where} ORDER BY created_at, id LIMIT ? OFFSET ?',
+                               (*arguments, per_page, (page - 1) * per_page)).fetchall()
+        total = self.db.execute(f'SELECT COUNT(*) FROM auth_users {where}', arguments).fetchone()[0]
+        users = [self._user_json(row) for row in rows]
+        return 200, {'X-Total-Count': str(total)}, {'users': users, 'aud': 'authenticated'}, len(users)
+
+    def _insert_user(self, attributes):
+        attributes = attributes or {}
+        email = (attributes.get('email') or '').strip() or None
+        if not email and not attributes.get('phone'):
+            raise _auth_error(400, 'validation_failed', 'Unable to validate email address: invalid format')
+        if email and self.db.execute('SELECT 1 FROM auth_users WHERE email = ?', (email,)).fetchone():
+            raise _auth_error(422, 'email_exists', 'A user with this email address has already been registered')
+        app_metadata = {'provider': 'email', 'providers': ['email'], **(attributes.get('app_metadata') or {})}
+        confirmed = _now() if attributes.get('email_confirm') else None
+        row = self.db.execute(
+            'INSERT INTO auth_users (id, email, phone, user_metadata, app_metadata, email_confirmed_at) '
+            'VALUES (?, ?, ?, ?, ?, ?) RETURNING *',
+            (str(uuid.uuid4()), email, attributes.get('phone'),
+             json.dumps(attributes.get('user_metadata') or {}, ensure_ascii=False),
+             json.dumps(app_metadata, ensure_ascii=False), confirmed)).fetchone()
+        return self._user_json(row)
+
+    def _delete_user(self, user_id):
+        row = self.db.execute('DELETE FROM auth_users WHERE id = ? RETURNING *', (user_id,)).fetchone()
+        if row is None:
+            raise _auth_error(404, 'user_not_found', 'User not found')
+        return 200, {}, self._user_json(row), 1
+
+
+# RPC functions: the SQL of supabase/migrations, written for SQLite
+
+def _find_duplicate_candidates(db, args):
+    rows = db.execute("""
+        WITH ranked AS (
+          SELECT
+            dp.id AS deputy_id,
+            dp.user_id,
+            up.full_name,
+            dp.created_at,
+            ROW_NUMBER() OVER oldest_first AS copy_number,
+            FIRST_VALUE(dp.id) OVER oldest_first AS keep_deputy_id,
+            FIRST_VALUE(dp.created_at) OVER oldest_first AS keep_created_at,
+            COUNT(*) OVER same_candidate AS copies
+          FROM deputy_profiles dp
+          JOIN user_profiles up ON up.id = dp.user_id
+          WHERE dp.candidate_type = :candidate_type
+          WINDOW
+            same_candidate AS (
+              PARTITION BY
+                normalize_arabic_name(up.full_name),
+                CASE WHEN :name_only THEN NULL ELSE dp.electoral_district_id END,
+                CASE WHEN :name_only THEN NULL ELSE dp.council_id END
+            ),
+            oldest_first AS (same_candidate ORDER BY dp.created_at, dp.id)
+        )
+        SELECT deputy_id, user_id, full_name, created_at, keep_deputy_id, keep_created_at, copies
+        FROM ranked
+        WHERE copy_number > 1
+        ORDER BY keep_deputy_id, created_at, deputy_id
+    """, {'candidate_type': args['candidate_type_param'], 'name_only': bool(args['name_only_param'])})
+    return [dict(row) for row in rows]
+
+
+def _set_deputy_ratings(db, args):
+    only_unrated = bool(args['only_unrated_param'])
+    cursor = db.executemany(
+        'UPDATE deputy_profiles SET rating_average = ?, rating_count = ? '
+        'WHERE id = ? AND (NOT ? OR COALESCE(rating_average, 0) = 0)',
+        [(rating['rating_average'], rating['rating_count'], rating['id'], only_unrated)
+         for rating in args['ratings_param'] or []])
+    return cursor.rowcount
+
+
+def _deputy_rating_stats(db, args):
+    row = db.execute("""
+        SELECT
+          COUNT(*) AS deputies,
+          COUNT(*) FILTER (WHERE COALESCE(rating_average, 0) = 0) AS unrated,
+          ROUND(AVG(COALESCE(rating_average, 0)), 2) AS average_rating,
+          ROUND(AVG(COALESCE(rating_count, 0)), 0) AS average_count,
+          MIN(rating_average) AS min_rating,
+          MAX(rating_average) AS max_rating
+        FROM deputy_profiles
+    """).fetchone()
+    return [dict(row)]
+
+
+# function name -> (implementation, parameter defaults)
+RPC_FUNCTIONS = {
+    'find_duplicate_candidates': (_find_duplicate_candidates,
+                                  {'candidate_type_param': 'individual', 'name_only_param': False}),
+    'set_deputy_ratings': (_set_deputy_ratings, {'ratings_param': None, 'only_unrated_param': True}),
+    'deputy_rating_stats': (_deputy_rating_stats, {}),
+}
@@ -0,0 +1,358 @@
+"""
+Synthetic candidate spreadsheets at any scale.
+
+``CandidateGenerator`` yields rows in the layout of each ``SourceFormat``
+(individual, list, senate) built from the real vocabulary: governorates
+and districts from ``electoral_districts.json``, the spellings the source
+sheets use for governorates from ``governorate_mapping.json``, and the
+parties, symbols, list seats and candidate capacities of the real sheets.
+Names are four-part Egyptian names drawn from fixed name lists.
+
+Real sheets are messy, so the generator is too:
+
+- ``variant_rate`` of the names and place names are written with a
+  spelling variant: hamza / taa marbuta / alef maqsura swaps, tatweel,
+  doubled spaces, ``عبد`` / ``ابو`` joined or split, and the old
+  governorate spellings ``lookups`` maps through its aliases
+- ``duplicate_rate`` of the rows repeat an earlier candidate, exactly, with
+  a spelling variant of the name, or moved to another district
+
+Each row comes with the number of the candidate it belongs to and its kind
+(``original``, ``exact``, ``variant`` or ``moved``), so dedupe and matching
+results can be checked against what was injected. ``write_workbook()``
+streams the rows into an ``.xlsx`` (openpyxl write-only mode), so 250k rows
+never sit in memory at once.
+"""
+
+import csv
+import json
+import os
+import random
+from collections import Counter, defaultdict, namedtuple
+
+from .config import SCRIPTS_DIR
+from .arabic import normalize_arabic
+from .sources import INDIVIDUAL, LIST, SENATE
+
+DEFAULT_DUPLICATE_RATE = 0.05
+DEFAULT_VARIANT_RATE = 0.1
+
+# How a duplicate differs from the candidate it repeats
+DUPLICATE_KINDS = {'exact': 0.5, 'variant': 0.4, 'moved': 0.1}
+
+MALE_NAMES = (
+    'محمد', 'احمد', 'محمود', 'مصطفى', 'علي', 'حسن', 'حسين', 'ابراهيم', 'اسماعيل', 'يوسف',
+    'خالد', 'عمرو', 'طارق', 'هشام', 'اشرف', 'ايمن', 'عادل', 'سامي', 'سعيد', 'جمال',
+    'كمال', 'صلاح', 'فتحي', 'رضا', 'مجدي', 'حمدي', 'شريف', 'وليد', 'ياسر', 'عماد',
+    'عبد الله', 'عبد الرحمن', 'عبد العزيز', 'عبد الحميد', 'عبد الفتاح', 'عبد الغني',
+    'عبد القادر', 'عبد المنعم', 'عبد الرحيم', 'عبد الباسط', 'ابو بكر', 'ابو الفتوح',
+    'سيد', 'عثمان', 'عمر', 'زكريا', 'رمضان', 'شعبان', 'منصور', 'ناصر', 'نبيل', 'هاني',
+    'انور', 'ايهاب', 'اسامة', 'حازم', 'رامي', 'عصام', 'فاروق', 'مدحت', 'ممدوح', 'مرسى',
+    'عيسى', 'موسى', 'يحيى', 'زكي', 'توفيق', 'بهاء', 'علاء', 'ضياء', 'جابر', 'راغب',
+)
+
+FEMALE_NAMES = (
+    'فاطمة', 'عائشة', 'مريم', 'زينب', 'نادية', 'هدى', 'منى', 'سعاد', 'امل', 'ايمان',
+    'رشا', 'دعاء', 'هالة', 'نجلاء', 'سماح', 'اسماء', 'سلمى', 'نورا', 'هبة', 'ياسمين',
+    'رانيا', 'مها', 'ولاء', 'شيماء', 'آمال', 'سهير', 'عزة', 'نهى', 'ليلى', 'سوزان',
+)
+
+FAMILY_NAMES = (
+    'الادفوي', 'الشقطي', 'حسيب', 'عبد الباسط', 'الابنودي', 'صبور', 'المنزلاوي', 'مطاوع',
+    'عطية', 'عمارة', 'سليمان', 'عبد المولى', 'يحيى', 'الشافعي', 'المصري', 'الصعيدي',
+    'البحيري', 'الدمياطي', 'السيوفي', 'الجمال', 'النجار', 'الحداد', 'العطار', 'الخولي',
+    'ابو العلا', 'ابو زيد', 'ابو سريع', 'ابو حطب', 'عبد الجواد', 'عبد العظيم', 'الفقي',
+    'الشرقاوي', 'الغمراوي', 'الزيات', 'القاضي', 'الطوخي', 'البنا', 'السباعي', 'مرعي',
+    'فرج', 'غنيم', 'هيكل', 'شلبي', 'سرحان', 'بدوي', 'خليفة', 'رزق', 'زهران', 'شحاتة',
+    'درويش', 'عويس', 'قنديل', 'ابو الخير', 'الهواري', 'عبد الغفار', 'الضيفي', 'حمودة',
+)
+
+# Party -> share of individual candidates (the real sheet's distribution)
+PARTIES = {
+    'مستقل': 0.785,
+    'حزب مستقبل وطن': 0.048,
+    'حزب حماة الوطن': 0.027,
+    'حزب الجبهة الوطنية': 0.017,
+    'حزب الوفد المصري': 0.016,
+    'حزب العدل': 0.015,
+    'حزب المؤتمر': 0.015,
+    'الحزب المصرى الديمقراطى الإجتماعى': 0.012,
+    'حزب الإصلاح والنهضة': 0.007,
+    'حزب المحافظين': 0.005,
+    'حزب الدستور': 0.005,
+    'حزب النور': 0.005,
+    'حزب الجيل الديمقراطى': 0.004,
+    'حزب الشعب الجمهورى': 0.004,
+    'حزب مصر الحديثة': 0.004,
+    'حزب المصريين الأحرار': 0.004,
+    'حزب التجمع الوطنى التقدمى': 0.003,
+    'حزب الغد': 0.003,
+    'حزب الكرامة': 0.003,
+    'حزب نداء مصر': 0.003,
+    'حزب الريادة': 0.003,
+}
+
+SYMBOLS = (
+    'أسد', 'صقر', 'كف', 'مدفع', 'تمساح', 'سفينة', 'قلم', 'ساعة يد', 'حوت', 'بندقية صيد',
+    'شمعة', 'طائرة هليكوبتر', 'غزال', 'السد العالى', 'تاج', 'عقرب', 'أوتوبيس', 'فيل',
+    'عنقود عنب', 'سهم', 'ديك', 'قلم حبر', 'سيارة', 'حصان', 'نخلة', 'غصن زيتون', 'هدهد',
+    'تليفون محمول', 'سيف', 'كتاب', 'كاميرا',
+)
+
+# Alliances running lists; each is written as "X", "القائمة X" or with اجل / أجل
+LIST_NAMES = (
+    'الوطنية من أجل مصر', 'نداء مصر', 'صوت مصر', 'أبناء مصر', 'المستقلين الجدد', 'الأمل',
+)
+
+# Seats per list in each list district (main and reserve lists are the same size)
+LIST_SEATS = {
+    'دائرة قطاع القاهرة وجنوب ووسط الدلتا': 102,
+    'دائرة قطاع شرق الدلتا': 40,
+    'دائرة قطاع شمال ووسط وجنوب الصعيد': 102,
+    'دائرة قطاع غرب الدلتا': 40,
+}
+
+LIST_POSITIONS = ('أساسي', 'إحتياطي')
+
+# Candidate capacity on a list -> share (the real sheet's distribution)
+CAPACITIES = {
+    'شخصية عامة': 0.42,
+    'مرأة': 0.30,
+    'شاب': 0.08,
+    'مسيحي': 0.07,
+    'عامل/فلاح': 0.05,
+    'مصري بالخارج': 0.04,
+    'ذوي الإعاقة': 0.04,
+}
+
+SENATE_MEMBERSHIPS = {'فردي': 0.8, 'قائمة': 0.2}
+SENATE_LIST_PARTY = 'تحالف الوطنية من أجل مصر'
+
+# Character swaps that normalize_arabic() undoes
+_SPELLING_SWAPS = (('أ', 'ا'), ('ا', 'أ'), ('إ', 'ا'), ('ة', 'ه'), ('ه', 'ة'), ('ى', 'ي'), ('ي', 'ى'))
+
+# One generated row: the candidate it belongs to, how it was made and the record
+GeneratedRow = namedtuple('GeneratedRow', 'candidate kind record')
+
+
+class Vocabulary:
+    """Governorates, districts and governorate spellings of the real sheets"""
+
+    def __init__(self, districts, list_districts, spellings):
+        # governorate -> its individual districts
+        self.districts = districts
+        self.governorates = sorted(districts)
+        self.list_districts = list_districts
+        # governorate -> other spellings used for it in source sheets
+        self.spellings = spellings
+
+    @classmethod
+    def load(cls):
+        with open(os.path.join(SCRIPTS_DIR, 'electoral_districts.json'), encoding='utf-8') as f:
+            data = json.load(f)
+        with open(os.path.join(SCRIPTS_DIR, 'governorate_mapping.json'), encoding='utf-8') as f:
+            mapping = json.load(f)
+        districts = defaultdict(list)
+        for item in data['individual_districts']:
+            districts[item['governorate']].append(item['district'])
+        by_key = {normalize_arabic(name): name for name in districts}
+        spellings = defaultdict(list)
+        for source, target in mapping.items():
+            governorate = by_key.get(normalize_arabic(target))
+            if governorate:
+                spellings[governorate].append(source)
+        return cls(dict(districts), data['list_districts'], dict(spellings))
+
+
+def spelling_variant(text, rng):
+    """text with one of the spelling slips that normalize_arabic() undoes"""
+    choice = rng.random()
+    if choice < 0.7:
+        swaps = [(old, new) for old, new in _SPELLING_SWAPS if old in text]
+        if swaps:
+            old, new = rng.choice(swaps)
+            positions = [i for i, char in enumerate(text) if char == old]
+            i = rng.choice(positions)
+            return text[:i] + new + text[i + 1:]
+    if choice < 0.85 and ' ' in text:
+        return text.replace(' ', '  ', 1)
+    # Tatweel inside the first word
+    i = min(2, len(text) - 1)
+    return text[:i] + 'ـ' + text[i:] if i > 0 else text
+
+
+def name_variant(name, rng):
+    """name as another clerk might have typed it"""
+    if rng.random() < 0.3:
+        if 'عبد ' in name or 'ابو ' in name:
+            return name.replace('عبد ', 'عبد', 1).replace('ابو ', 'ابو', 1)
+        if 'عبد' in name:
+            return name.replace('عبد', 'عبد ', 1)
+    return spelling_variant(name, rng)
+
+
+def _weighted(rng, weights):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+class CandidateGenerator:
+    """Reproducible (for a seed) stream of synthetic candidate rows"""
+
+    def __init__(self, seed=None, duplicate_rate=DEFAULT_DUPLICATE_RATE,
+                 variant_rate=DEFAULT_VARIANT_RATE, vocabulary=None):
+        self.rng = random.Random(seed)
+        self.duplicate_rate = duplicate_rate
+        self.variant_rate = variant_rate
+        self.vocabulary = vocabulary or Vocabulary.load()
+        # Real sheets hold each governorate in one election stage
+        self.stages = {governorate: self.rng.choice((1, 2)) for governorate in self.vocabulary.governorates}
+
+    def _name_parts(self, female=False):
+        rng = self.rng
+        parts = [rng.choice(FEMALE_NAMES if female else MALE_NAMES), rng.choice(MALE_NAMES), rng.choice(MALE_NAMES)]
+        parts.append(rng.choice(FAMILY_NAMES) if rng.random() < 0.7 else rng.choice(MALE_NAMES))
+        return parts
+
+    def _name(self, female=False):
+        return self._spelled(' '.join(self._name_parts(female)))
+
+    def _spelled(self, text):
+        return spelling_variant(text, self.rng) if self.rng.random() < self.variant_rate else text
+
+    def _governorate(self, governorate):
+        spellings = self.vocabulary.spellings.get(governorate)
+        if spellings and self.rng.random() < self.variant_rate:
+            return self.rng.choice(spellings)
+        return self._spelled(governorate)
+
+    def _duplicate_kind(self):
+        return _weighted(self.rng, DUPLICATE_KINDS)
+
+    def individual(self, rows):
+        """Rows in the جميعالمرشحين layout"""
+        rng = self.rng
+        vocabulary = self.vocabulary
+        seats = [(governorate, district) for governorate in vocabulary.governorates
+                 for district in vocabulary.districts[governorate]]
+        serials = Counter()
+        # candidate number -> (name, governorate, district, nickname, party, symbol)
+        originals = []
+        for _ in range(rows):
+            if originals and rng.random() < self.duplicate_rate:
+                candidate = rng.randrange(len(originals))
+                name, governorate, district, nickname, party, symbol = originals[candidate]
+                kind = self._duplicate_kind()
+                if kind == 'variant':
+                    name = name_variant(name, rng)
+                elif kind == 'moved':
+                    others = [d for d in vocabulary.districts[governorate] if d != district]
+                    if others:
+                        district = rng.choice(others)
+                    else:
+                        kind = 'exact'
+            else:
+                governorate, district = rng.choice(seats)
+                parts = self._name_parts(female=rng.random() < 0.1)
+                name = self._spelled(' '.join(parts))
+                nickname = f"{parts[0]} {parts[-1]}" if rng.random() < 0.6 else None
+                party = _weighted(rng, PARTIES)
+                symbol = rng.choice(SYMBOLS)
+                candidate, kind = len(originals), 'original'
+                originals.append((name, governorate, district, nickname, party, symbol))
+            serials[(governorate, district)] += 1
+            yield GeneratedRow(candidate, kind, INDIVIDUAL.record(
+                self.stages[governorate], self._governorate(governorate), self._spelled(district),
+                serials[(governorate, district)], name, nickname, party, symbol))
+
+    def lists(self, rows):
+        """Rows in the جميعمرشحيالقوائم layout: whole lists, main then reserve"""
+        rng = self.rng
+        districts = self.vocabulary.list_districts
+        originals = []
+        made = 0
+        block = 0
+        while made < rows:
+            district = districts[block % len(districts)]
+            alliance = LIST_NAMES[(block // len(districts)) % len(LIST_NAMES)]
+            block += 1
+            for position in LIST_POSITIONS:
+                for rank in range(1, LIST_SEATS.get(district, 40) + 1):
+                    if made >= rows:
+                        return
+                    made += 1
+                    if originals and rng.random() < self.duplicate_rate:
+                        candidate = rng.randrange(len(originals))
+                        name, capacity = originals[candidate]
+                        kind = self._duplicate_kind()
+                        if kind == 'variant':
+                            name = name_variant(name, rng)
+                        # A list candidate cannot move district without moving list: repeat it here
+                        kind = 'exact' if kind == 'moved' else kind
+                    else:
+                        capacity = _weighted(rng, CAPACITIES)
+                        name = self._name(female=capacity == 'مرأة')
+                        candidate, kind = len(originals), 'original'
+                        originals.append((name, capacity))
+                    yield GeneratedRow(candidate, kind, LIST.record(
+                        2, district, self._list_name(alliance), position, rank, name, capacity))
+
+    def _list_name(self, alliance):
+        rng = self.rng
+        name = f"القائمة {alliance}" if rng.random() < 0.6 else alliance
+        return name.replace('أجل', 'اجل') if rng.random() < 0.5 else name
+
+    def senate(self, rows):
+        """Rows in the senate_members layout"""
+        rng = self.rng
+        originals = []
+        for _ in range(rows):
+            if originals and rng.random() < self.duplicate_rate:
+                candidate = rng.randrange(len(originals))
+                name, governorate, membership = originals[candidate]
+                kind = self._duplicate_kind()
+                if kind == 'variant':
+                    name = name_variant(name, rng)
+                elif kind == 'moved':
+                    governorate = rng.choice(self.vocabulary.governorates)
+            else:
+                governorate = rng.choice(self.vocabulary.governorates)
+                membership = _weighted(rng, SENATE_MEMBERSHIPS)
+                name = self._name(female=rng.random() < 0.15)
+                candidate, kind = len(originals), 'original'
+                originals.append((name, governorate, membership))
+            party = SENATE_LIST_PARTY if membership == 'قائمة' else 'مستقل'
+            yield GeneratedRow(candidate, kind, SENATE.record(name, self._governorate(governorate),
+                                                               membership, party))
+
+    def rows(self, fmt, rows):
+        """Generated rows of a source format"""
+        return {INDIVIDUAL.name: self.individual, LIST.name: self.lists, SENATE.name: self.senate}[fmt.name](rows)
+
+
+def write_workbook(path, fmt, rows, truth_path=None):
+    """
+    Write GeneratedRows to an .xlsx with fmt's headers; truth_path, when set,
+    gets a CSV of row, candidate and kind. Returns the count of each kind.
+    """
+    from openpyxl import Workbook
+
+    kinds = Counter()
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(fmt.headers())
+    truth = open(truth_path, 'w', newline='', encoding='utf-8') if truth_path else None
+    try:
+        writer = csv.writer(truth) if truth else None
+        if writer:
+            writer.writerow(['row', 'candidate', 'kind'])
+        for index, row in enumerate(rows):
+            sheet.append(list(row.record))
+            if writer:
+                writer.writerow([index, row.candidate, row.kind])
+            kinds[row.kind] += 1
+    finally:
+        if truth:
+            truth.close()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    workbook.save(path)
+    return kinds
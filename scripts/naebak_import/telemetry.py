@@ -0,0 +1,387 @@
+"""
+Progress and throughput telemetry for long-running scripts.
+
+A ``Telemetry`` session is opened around a run (the import loop, a bulk
+deletion). While it is open:
+
+- every Supabase request the library makes (``latency.timed()``) is counted
+  with its duration, so p50 / p95 latency per endpoint is known (from a
+  uniform sample of ``LATENCY_SAMPLES`` durations, so a long run's memory
+  and status redraws stay flat; count, total and max are exact)
+- retries of the worker pool are counted by HTTP status
+- ``stage(name)`` blocks (lookup, auth create, profile write, ...) add to
+  per-stage timers; nested stages are exclusive, so a profile write that
+  happens inside an auth batch is not counted twice; ``task_stage(name)``
+  times blocks that run concurrently on the event loop, which cannot nest
+- rows done, rows/sec (overall and over the last ``RATE_WINDOW`` seconds)
+  and an ETA are kept from ``progress()``
+
+On a terminal a single status line is redrawn in place; otherwise (output
+redirected to a log file) the same line is printed every ``LOG_INTERVAL``
+seconds. A JSON record with every number is appended to a metrics file
+(``scripts/.cache/metrics/<run>-<time>.jsonl`` unless a path is given) every
+``METRICS_INTERVAL`` seconds and once more, marked final, at the end.
+"""
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from .config import STATE_DIR
+
+METRICS_DIR = os.path.join(STATE_DIR, '.cache', 'metrics')
+
+# Seconds between status line redraws (terminal), log lines (redirected) and metrics records
+STATUS_INTERVAL = 1.0
+LOG_INTERVAL = 30.0
+METRICS_INTERVAL = 5.0
+
+# Seconds of history used for the current rows/sec and the ETA
+RATE_WINDOW = 30.0
+
+# Durations kept per endpoint for the percentiles
+LATENCY_SAMPLES = 1024
+
+# Telemetry sessions currently open
+_sessions = []
+_sessions_lock = threading.Lock()
+
+# Per thread: stack of [stage name, start, seconds spent in nested stages]
+_local = threading.local()
+
+
+def request_finished(endpoint, seconds):
+    """Count one request in every open session (called by latency.record)"""
+    for session in _sessions:
+        session.on_request(endpoint, seconds)
+
+
+def request_retried(reason):
+    """Count one retry (HTTP status or error name) in every open session"""
+    for session in _sessions:
+        session.on_retry(reason)
+
+
+@contextmanager
+def stage(name):
+    """Time the enclosed block as stage name in every open session"""
+    if not _sessions:
+        yield
+        return
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    frame = [name, time.perf_counter(), 0.0]
+    stack.append(frame)
+    try:
+        yield
+    finally:
+        stack.pop()
+        elapsed = time.perf_counter() - frame[1]
+        if stack:
+            stack[-1][2] += elapsed
+        for session in _sessions:
+            session.on_stage(name, elapsed - frame[2])
+
+
+@contextmanager
+def task_stage(name):
+    """Time the enclosed block as stage name; for coroutines, which stage() cannot nest"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        for session in _sessions:
+            session.on_stage(name, elapsed)
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def format_seconds(seconds):
+    if seconds is None:
+        return '--'
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+class _LatencyReservoir:
+    """Exact count / total / max of one endpoint's durations and a uniform sample of them"""
+
+    def __init__(self, size=LATENCY_SAMPLES):
+        self.size = size
+        self.count = 0
+        self.seconds = 0.0
+        self.max = 0.0
+        self.samples = []
+
+    def add(self, seconds):
+        self.count += 1
+        self.seconds += seconds
+        self.max = max(self.max, seconds)
+        if len(self.samples) < self.size:
+            self.samples.append(seconds)
+        else:
+            # Reservoir sampling: every duration so far is kept with the same probability
+            slot = random.randrange(self.count)
+            if slot < self.size:
+                self.samples[slot] = seconds
+
+
+class _StatusStream:
+    """stdout wrapper that clears the status line before anything else is printed"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.shown = False
+        self.lock = threading.Lock()
+
+    def show(self, line):
+        with self.lock:
+            self.stream.write('\r\033[K' + line)
+            self.stream.flush()
+            self.shown = True
+
+    def clear(self):
+        with self.lock:
+            if self.shown:
+                self.stream.write('\r\033[K')
+                self.shown = False
+
+    def write(self, text):
+        self.clear()
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+class Telemetry:
+    """Counters, timers and latency samples of one run, reported while it goes"""
+
+    def __init__(self, name, total=None, metrics_path=None, status=None):
+        self.name = name
+        self.total = total
+        if metrics_path is None:
+            stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+            metrics_path = os.path.join(METRICS_DIR, f"{name}-{stamp}.jsonl")
+        self.metrics_path = metrics_path
+        # Live status line only when stdout is a terminal
+        self.live = sys.stdout.isatty() if status is None else status
+        self.done = 0
+        self.counters = {}
+        self.stages = defaultdict(lambda: [0.0, 0])
+        self.latencies = defaultdict(_LatencyReservoir)
+        self.retries = defaultdict(int)
+        self.history = deque()
+        self.started = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._ticker = None
+        self._stream = None
+
+    # Recording
+
+    def on_request(self, endpoint, seconds):
+        with self._lock:
+            self.latencies[endpoint].add(seconds)
+
+    def on_retry(self, reason):
+        with self._lock:
+            self.retries[reason] += 1
+
+    def on_stage(self, name, seconds):
+        with self._lock:
+            self.stages[name][0] += seconds
+            self.stages[name][1] += 1
+
+    def progress(self, done, **counters):
+        """Rows handled so far, plus named counters (ok=, errors=, skipped=, ...)"""
+        now = time.monotonic()
+        with self._lock:
+            self.done = done
+            self.counters.update(counters)
+            self.history.append((now, done))
+            while len(self.history) > 2 and now - self.history[0][0] > RATE_WINDOW:
+                self.history.popleft()
+
+    # Derived numbers
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started if self.started else 0.0
+
+    def rates(self):
+        """(overall rows/sec, rows/sec over the recent window)"""
+        elapsed = self.elapsed
+        with self._lock:
+            overall = self.done / elapsed if elapsed > 0 else 0.0
+            recent = overall
+            if len(self.history) >= 2:
+                (first_time, first_done), (last_time, last_done) = self.history[0], self.history[-1]
+                if last_time > first_time:
+                    recent = (last_done - first_done) / (last_time - first_time)
+        return overall, recent
+
+    def eta(self):
+        _, recent = self.rates()
+        if not self.total or recent <= 0:
+            return None
+        return max(0, self.total - self.done) / recent
+
+    def endpoint_stats(self):
+        """endpoint -> {'count', 'p50', 'p95', 'max', 'seconds'}"""
+        with self._lock:
+            reservoirs = {endpoint: (reservoir.count, reservoir.seconds, reservoir.max, list(reservoir.samples))
+                          for endpoint, reservoir in self.latencies.items()}
+        stats = {}
+        for endpoint, (count, seconds, longest, values) in reservoirs.items():
+            values.sort()
+            stats[endpoint] = {
+                'count': count,
+                'p50': percentile(values, 0.50),
+                'p95': percentile(values, 0.95),
+                'max': longest,
+                'seconds': seconds,
+            }
+        return stats
+
+    def record(self, final=False):
+        """Everything measured so far as one JSON-serialisable dict"""
+        overall, recent = self.rates()
+        with self._lock:
+            stages = {name: {'seconds': round(seconds, 3), 'calls': calls}
+                      for name, (seconds, calls) in self.stages.items()}
+            retries = dict(self.retries)
+            counters = dict(self.counters)
+        endpoints = {endpoint: {key: round(value, 4) if isinstance(value, float) else value
+                                for key, value in stats.items()}
+                     for endpoint, stats in self.endpoint_stats().items()}
+        eta = self.eta()
+        return {
+            'time': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'run': self.name,
+            'final': final,
+            'elapsed': round(self.elapsed, 3),
+            'done': self.done,
+            'total': self.total,
+            **counters,
+            'rows_per_sec': round(overall, 2),
+            'recent_rows_per_sec': round(recent, 2),
+            'eta': None if eta is None else round(eta, 1),
+            'stages': stages,
+            'endpoints': endpoints,
+            'retries': retries,
+        }
+
+    def status_line(self):
+        overall, recent = self.rates()
+        # The run's threads update these while the ticker draws
+        with self._lock:
+            done = self.done
+            counters = dict(self.counters)
+            retries = sum(self.retries.values())
+        parts = [f"⏳ {done}/{self.total}" if self.total else f"⏳ {done}"]
+        if self.total:
+            parts[0] += f" ({100 * done / self.total:.0f}%)"
+        parts.append(f"{recent:.1f} صف/ث")
+        parts.append(f"ETA {format_seconds(self.eta())}")
+        counters = ' '.join(f"{key} {value}" for key, value in counters.items())
+        if counters:
+            parts.append(counters)
+        endpoints = self.endpoint_stats()
+        if endpoints:
+            # The endpoint the run spends most of its time waiting on
+            endpoint, stats = max(endpoints.items(), key=lambda item: item[1]['seconds'])
+            parts.append(f"{endpoint} p50 {stats['p50']:.2f}s p95 {stats['p95']:.2f}s")
+        if retries:
+            parts.append(f"🔁 {retries}")
+        return ' | '.join(parts)
+
+    # Reporting
+
+    def _write_record(self, final=False):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.metrics_path)), exist_ok=True)
+            with open(self.metrics_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(self.record(final), ensure_ascii=False) + '\n')
+        except OSError as e:
+            print(f"   ⚠️  تعذر كتابة المقاييس: {e}")
+
+    def _tick(self):
+        last_log = last_metrics = time.monotonic()
+        while not self._stop.wait(STATUS_INTERVAL):
+            now = time.monotonic()
+            if self.live:
+                self._stream.show(self.status_line())
+            elif now - last_log >= LOG_INTERVAL:
+                print(f"   {self.status_line()}")
+                last_log = now
+            if now - last_metrics >= METRICS_INTERVAL:
+                self._write_record()
+                last_metrics = now
+
+    def start(self):
+        self.started = time.monotonic()
+        self.history.append((self.started, 0))
+        if self.live:
+            self._stream = sys.stdout = _StatusStream(sys.stdout)
+        with _sessions_lock:
+            _sessions.append(self)
+        self._ticker = threading.Thread(target=self._tick, name=f"telemetry-{self.name}", daemon=True)
+        self._ticker.start()
+        return self
+
+    def close(self):
+        """Stop reporting, write the final record and print the breakdown"""
+        if self._ticker is None:
+            return
+        self._stop.set()
+        self._ticker.join()
+        self._ticker = None
+        with _sessions_lock:
+            _sessions.remove(self)
+        if self._stream is not None:
+            self._stream.clear()
+            sys.stdout = self._stream.stream
+            self._stream = None
+        self._write_record(final=True)
+        self.print_summary()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def print_summary(self):
+        overall, _ = self.rates()
+        with self._lock:
+            stages = {name: seconds for name, (seconds, _) in self.stages.items()}
+            retries = dict(self.retries)
+        print(f"\n   ⏱️  {self.done} صف في {format_seconds(self.elapsed)} ({overall:.1f} صف/ث)")
+        stage_total = sum(stages.values())
+        if stage_total:
+            print("   " + " | ".join(f"{name} {seconds:.1f}s ({100 * seconds / stage_total:.0f}%)"
+                                    for name, seconds in stages.items()))
+        for endpoint, stats in sorted(self.endpoint_stats().items(), key=lambda item: -item[1]['seconds']):
+            print(f"   🌐 {endpoint:<28}{stats['count']:>7}  p50 {stats['p50']:.2f}s  p95 {stats['p95']:.2f}s")
+        if retries:
+            print("   🔁 إعادة المحاولة: " + ", ".join(f"{reason}×{count}" for reason, count in retries.items()))
+        print(f"   📈 المقاييس: {self.metrics_path}")
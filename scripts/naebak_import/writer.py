@@ -0,0 +1,141 @@
+"""
+Bulk write stage for user_profiles and deputy_profiles.
+
+Rows are buffered and flushed as chunked array upserts (``on_conflict`` on the
+table's key), so a chunk of candidates costs one request per table instead of
+an existence check plus an insert/update per row. Up to ``concurrency``
+chunks of a table are sent at once through the asyncio engine (``aio.py``).
+Failures are reported per chunk with the source row indexes that were in it.
+
+``flush()`` blocks, so with ``auto_flush`` ``add_*()`` waits for a chunk per
+concurrent upsert before flushing. Code already on the engine's loop (the
+import pipeline) creates the writer with ``auto_flush=False`` and starts
+``flush_async()`` itself once a chunk is ``full()`` or the oldest buffered
+row has waited ``flush_interval`` seconds (``due()``), so a small or slow
+sheet is written and journaled as it goes. Either way a flush takes every
+buffer at once, so rows added while it runs go to the next flush and a
+deputy profile never lands before its user profile.
+"""
+
+import time
+
+from .aio import get_engine
+from .telemetry import task_stage
+from .profiles import CONFLICT_KEYS, user_profile_row, deputy_profile_row
+
+DEFAULT_CHUNK_SIZE = 500
+
+# Chunk upserts of one table in flight at once
+DEFAULT_WRITE_CONCURRENCY = 4
+
+# Seconds a buffered row may wait for its chunk to fill
+DEFAULT_FLUSH_INTERVAL = 2.0
+
+# user_profiles must land before deputy_profiles (foreign key)
+FLUSH_ORDER = ('user_profiles', 'deputy_profiles')
+
+
+class ProfileWriter:
+    """Accumulates profile rows and flushes them as chunked upserts"""
+
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE, on_written=None, concurrency=DEFAULT_WRITE_CONCURRENCY,
+                 auto_flush=True, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.chunk_size = max(1, int(chunk_size))
+        self.concurrency = max(1, int(concurrency))
+        self.auto_flush = auto_flush
+        self.flush_interval = flush_interval
+        # time.monotonic() of the oldest row not flushed yet
+        self.buffered_since = None
+        # Called as on_written(table, row_indexes) after each successful upsert
+        self.on_written = on_written
+        self.buffers = {table: [] for table in FLUSH_ORDER}
+        self.written = {table: 0 for table in FLUSH_ORDER}
+        # (table, [row indexes], error message)
+        self.failures = []
+        self.failed_rows = set()
+
+    def add_user_profile(self, row_index, user_id, full_name, governorate_id, **fields):
+        self._add('user_profiles', row_index, user_profile_row(user_id, full_name, governorate_id, **fields))
+
+    def add_deputy_profile(self, row_index, user_id, slug, district_id, candidate_type, **fields):
+        self._add('deputy_profiles', row_index,
+                  deputy_profile_row(user_id, slug, district_id, candidate_type, **fields))
+
+    def _add(self, table, row_index, row):
+        if self.buffered_since is None:
+            self.buffered_since = time.monotonic()
+        self.buffers[table].append((row_index, row))
+        if self.auto_flush and self.full(self.concurrency):
+            self.flush()
+
+    def full(self, chunks=1):
+        """True once a table has chunk_size * chunks rows buffered"""
+        return any(len(rows) >= self.chunk_size * chunks for rows in self.buffers.values())
+
+    def wait_time(self):
+        """Seconds until due(), or None with nothing buffered"""
+        if self.buffered_since is None:
+            return None
+        return max(0.0, self.buffered_since + self.flush_interval - time.monotonic())
+
+    def due(self):
+        """True once the oldest buffered row has waited flush_interval seconds"""
+        return self.wait_time() == 0.0
+
+    def flush(self):
+        """Write every buffered row"""
+        if any(self.buffers.values()):
+            get_engine().run(self.flush_async())
+
+    async def flush_async(self):
+        """Write every buffered row (on the engine's loop)"""
+        buffered, self.buffers = self.buffers, {table: [] for table in FLUSH_ORDER}
+        self.buffered_since = None
+        for table in FLUSH_ORDER:
+            await self._write_table(get_engine(), table, buffered[table])
+
+    async def _write_table(self, engine, table, buffered):
+        if table != FLUSH_ORDER[0]:
+            # A deputy profile cannot be written without its user profile
+            buffered = [(row_index, row) for row_index, row in buffered if row_index not in self.failed_rows]
+        batches = []
+        for start in range(0, len(buffered), self.chunk_size):
+            batches.extend(_batches(buffered[start:start + self.chunk_size]))
+
+        async def write(rows):
+            await engine.upsert(table, [row for _, row in rows], CONFLICT_KEYS[table])
+
+        with task_stage('profile_write'):
+            results = await engine.gather(write, batches, self.concurrency)
+        for rows, (_, error) in zip(batches, results):
+            row_indexes = [row_index for row_index, _ in rows]
+            if error is None:
+                self.written[table] += len(rows)
+                if self.on_written:
+                    self.on_written(table, row_indexes)
+            else:
+                self.failures.append((table, row_indexes, str(error)))
+                self.failed_rows.update(row_indexes)
+                print(f"   ❌ فشل حفظ {len(rows)} صف في {table} (الصفوف {_describe(row_indexes)}): {str(error)[:200]}")
+
+    def print_failures(self):
+        """Print a summary of the failed chunks"""
+        if not self.failures:
+            return
+        print(f"\n   ⚠️  دفعات فاشلة: {len(self.failures)}")
+        for table, row_indexes, error in self.failures:
+            print(f"      • {table}: الصفوف {_describe(row_indexes)} → {error[:120]}")
+
+
+def _batches(chunk):
+    """Split a chunk by column set: PostgREST bulk upserts need the same columns on every row"""
+    groups = {}
+    for row_index, row in chunk:
+        groups.setdefault(tuple(sorted(row)), []).append((row_index, row))
+    return list(groups.values())
+
+
+def _describe(row_indexes):
+    if len(row_indexes) <= 10:
+        return ', '.join(str(i) for i in row_indexes)
+    return f"{row_indexes[0]}..{row_indexes[-1]} ({len(row_indexes)} صف)"
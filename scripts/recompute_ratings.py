@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Check (and repair) the running rating totals kept on deputy_profiles
+
+New ratings are applied as deltas by triggers; this job compares the stored
+sums and counts with deputy_ratings in one grouped query and, with --fix,
+rebuilds the ones that drifted in one statement.
+"""
+
+import argparse
+
+from naebak_import import rating_drift, recompute_all_ratings, recompute_rating, rating_stats
+
+
+def main(fix=False, deputy_ids=None):
+    print("=" * 70)
+    print("فحص مجاميع تقييمات النواب")
+    print("=" * 70)
+
+    if deputy_ids:
+        print(f"\n🔄 إعادة حساب {len(deputy_ids)} نائب...")
+        for deputy_id in deputy_ids:
+            recompute_rating(deputy_id)
+            print(f"  ✓ {deputy_id}")
+
+    print("\n📊 مقارنة المجاميع المحفوظة بجدول deputy_ratings...")
+    drift = rating_drift()
+    print(f"  نواب مجاميعهم غير صحيحة: {len(drift)}")
+    for row in drift[:10]:
+        print(f"  - {row['deputy_id'][:8]}... | المجموع: {row['stored_sum']} → {row['actual_sum']}"
+              f" | العدد: {row['stored_count']} → {row['actual_count']}")
+    if len(drift) > 10:
+        print(f"  ... و {len(drift) - 10} آخرين")
+
+    if drift and fix:
+        print("\n🔄 إعادة حساب المجاميع بتجميع واحد...")
+        fixed = recompute_all_ratings()
+        print(f"✅ تم إصلاح {fixed} نائب")
+        remaining = rating_drift()
+        if remaining:
+            print(f"⚠️  ما زال {len(remaining)} نائب مختلفاً (تقييمات أضيفت أثناء الإصلاح؟)")
+    elif drift:
+        print("\nℹ️  استخدم --fix لإصلاحها")
+
+    stats = rating_stats()
+    print(f"\n  متوسط التقييم: {float(stats.get('average_rating') or 0):.2f}")
+    print(f"  متوسط عدد المقيمين: {float(stats.get('average_count') or 0):.0f}")
+
+    print("\n" + "=" * 70)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='فحص وإصلاح مجاميع تقييمات النواب')
+    parser.add_argument('--fix', action='store_true', help='rebuild totals that drifted from deputy_ratings')
+    parser.add_argument('--deputy', action='append', metavar='ID',
+                        help='recompute this deputy first (repeatable)')
+    args = parser.parse_args()
+    main(fix=args.fix, deputy_ids=args.deputy)
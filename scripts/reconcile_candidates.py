@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Compare a candidate spreadsheet with the database and (optionally) sync it.
+
+The database is read once; the plan lists what would be inserted, updated,
+deleted and what needs a person to look at it. --apply executes the inserts
+and updates, --delete also removes duplicates and candidates that are no
+longer in the spreadsheet.
+"""
+
+from naebak_import import (
+    DEFAULT_MIN_SCORE,
+    INDIVIDUAL,
+    LIST,
+    REASON_SIMILAR_NAME,
+    data_path,
+    build_parser,
+    import_options,
+    add_plan_options,
+    reconcile,
+    apply_plan,
+    load_snapshot,
+    offline,
+    estimate_import,
+    estimate_deletion,
+)
+
+SOURCES = {
+    'individual': (INDIVIDUAL, 'جميعالمرشحين.xlsx'),
+    'list': (LIST, 'جميعمرشحيالقوائم.xls'),
+}
+
+REASON_LABELS = {
+    'missing': 'غير موجود',
+    'changed': 'بيانات مختلفة',
+    'duplicate': 'نسخة مكررة',
+    'not_in_source': 'غير موجود في الملف',
+    'unresolved': 'محافظة غير معروفة',
+    'source_duplicate': 'مكرر في الملف',
+    'similar_name': 'اسم مشابه',
+}
+
+
+def print_items(title, items, limit=20):
+    if not items:
+        return
+    print(f"\n{title} ({len(items)}):")
+    print("-" * 80)
+    for item in items[:limit]:
+        if item.record is not None:
+            name = item.record.name
+            where = f"صف {item.row_index + 2}"
+        else:
+            name = item.existing.full_name
+            where = f"ID: {item.existing.deputy_id[:8]}..."
+        print(f"   • {name} | {where} | {REASON_LABELS[item.reason]}")
+        if item.reason == REASON_SIMILAR_NAME:
+            print(f"       ≈ {item.existing.full_name} ({item.score:.2f})")
+        for column, (stored, wanted) in item.changes.items():
+            if item.reason != REASON_SIMILAR_NAME:
+                print(f"       {column}: {stored} → {wanted}")
+    if len(items) > limit:
+        print(f"   ... و {len(items) - limit} آخرين")
+
+
+if __name__ == "__main__":
+    parser = build_parser('مقارنة ملف المرشحين بقاعدة البيانات')
+    parser.add_argument('--type', choices=sorted(SOURCES), default='individual',
+                        help='which spreadsheet to reconcile (default: individual)')
+    parser.add_argument('--file', help='spreadsheet to read instead of the default one in data/')
+    parser.add_argument('--min-score', type=float, default=DEFAULT_MIN_SCORE,
+                        help=f'fuzzy match score reported as a similar name (default: {DEFAULT_MIN_SCORE})')
+    parser.add_argument('--apply', action='store_true', help='execute the inserts and updates')
+    parser.add_argument('--delete', action='store_true',
+                        help='with --apply, also delete duplicates and candidates not in the file')
+    add_plan_options(parser)
+    args = parser.parse_args()
+
+    fmt, default_file = SOURCES[args.type]
+    source = args.file or data_path(default_file)
+
+    print("\n" + "="*80)
+    print("🔄 مقارنة الملف بقاعدة البيانات")
+    print("="*80 + "\n")
+    print(f"📖 {source}\n")
+
+    if args.plan:
+        snapshot = load_snapshot(refresh=args.refresh_snapshot)
+        with offline(snapshot):
+            plan = reconcile(source, fmt, min_score=args.min_score)
+    else:
+        plan = reconcile(source, fmt, min_score=args.min_score)
+
+    print("\n📋 الخطة:")
+    print("-" * 80)
+    plan.print_summary()
+    print_items("➕ إضافة", plan.inserts)
+    print_items("✏️  تحديث", plan.updates)
+    print_items("🗑️  حذف", plan.deletes)
+    print_items("⚠️  تعارضات (لن يتم تنفيذها)", plan.conflicts)
+
+    if args.plan:
+        print("\n⏱️  تقدير تنفيذ الخطة (--apply" + (" --delete" if args.delete else "") + "):")
+        print("-" * 80)
+        cost = estimate_import(snapshot, [plan], rewrite_matched=False, **import_options(args))
+        if args.delete:
+            estimate_deletion(len(plan.deletes), cost=cost, workers=args.workers, auth_rate=args.auth_rate)
+        cost.print_summary()
+    elif args.apply:
+        print("\n🚀 تنفيذ الخطة...\n")
+        import_stats, delete_stats = apply_plan(plan, delete=args.delete, **import_options(args))
+        if delete_stats:
+            print(f"\n   🗑️  تم حذف: {delete_stats.auth} | ❌ فشل: {delete_stats.errors}")
+    else:
+        print("\nℹ️  لم يتم تغيير أي شيء (استخدم --apply للتنفيذ)")
+
+    print("\n" + "="*80 + "\n")
@@ -3,87 +3,65 @@
 Remove duplicate candidates - keep oldest, delete newest
 """
 
-import os
-from supabase import create_client, Client
-from collections import defaultdict
-
-# Supabase configuration
-SUPABASE_URL = os.getenv('SUPABASE_URL')
-SUPABASE_SERVICE_KEY = os.getenv('SUPABASE_SERVICE_KEY')
-
-if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
-    print("❌ Error: SUPABASE_URL and SUPABASE_SERVICE_KEY must be set")
-    exit(1)
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+from naebak_import import (
+    PAGE_SIZE,
+    get_client,
+    find_duplicates,
+    group_duplicates,
+    build_delete_parser,
+    delete_options,
+    add_plan_options,
+    CascadeDeleter,
+    DatabaseState,
+    CostEstimate,
+    load_snapshot,
+    offline,
+    estimate_deletion,
+)
+
+parser = build_delete_parser('حذف المرشحين المكررين')
+parser.add_argument('--name-only', action='store_true',
+                    help='treat same-name candidates in different districts as duplicates too')
+add_plan_options(parser)
+args = parser.parse_args()
 
 print("\n" + "="*80)
 print("🗑️  حذف المرشحين المكررين")
 print("="*80 + "\n")
 
-# Get all deputy profiles in batches
-print("📖 جلب جميع السجلات من قاعدة البيانات...")
-all_deputies = []
-batch_size = 1000
-offset = 0
+if args.plan:
+    # The same grouping as find_duplicate_candidates, done on the snapshot
+    snapshot = load_snapshot(refresh=args.refresh_snapshot)
+    with offline(snapshot):
+        groups = DatabaseState.load().duplicates('individual', name_only=args.name_only)
+    extra_copies = sum(len(copies) - 1 for copies in groups)
+    print(f"\n   • أسماء مكررة: {len(groups)}")
+    print(f"   • سجلات سيتم حذفها: {extra_copies}\n")
+    cost = CostEstimate()
+    cost.add('rpc:find_duplicate_candidates', extra_copies // PAGE_SIZE + 1)
+    estimate_deletion(extra_copies, cost=cost, **delete_options(args))
+    cost.add('select:deputy_profiles', 1)
+    cost.print_summary()
+    print("\n" + "="*80 + "\n")
+    exit(0)
 
-# Get count first
-count_result = supabase.table('deputy_profiles')\
-    .select('id', count='exact')\
-    .eq('candidate_type', 'individual')\
-    .execute()
-total_count = count_result.count
-
-print(f"   • إجمالي السجلات: {total_count}\n")
-
-while offset < total_count:
-    result = supabase.table('deputy_profiles')\
-        .select('id, user_id, slug, created_at, user_profiles!inner(full_name)')\
-        .eq('candidate_type', 'individual')\
-        .order('created_at')\
-        .range(offset, offset + batch_size - 1)\
-        .execute()
-    
-    all_deputies.extend(result.data)
-    offset += batch_size
-    print(f"   • تم جلب {len(all_deputies)}/{total_count} سجل...")
-
-print(f"\n✅ تم جلب {len(all_deputies)} سجل\n")
-
-# Group by name
-print("🔍 تحليل المكررات...")
-name_groups = defaultdict(list)
-for deputy in all_deputies:
-    if deputy.get('user_profiles'):
-        name = deputy['user_profiles']['full_name']
-        name_groups[name].append(deputy)
-
-# Find duplicates
-duplicates_to_delete = []
-unique_names = 0
-duplicate_names = 0
-
-for name, records in name_groups.items():
-    if len(records) > 1:
-        duplicate_names += 1
-        # Sort by created_at (oldest first)
-        records.sort(key=lambda x: x['created_at'])
-        # Keep the oldest, mark the rest for deletion
-        for record in records[1:]:
-            duplicates_to_delete.append({
-                'id': record['id'],
-                'user_id': record['user_id'],
-                'name': name,
-                'created_at': record['created_at']
-            })
-    else:
-        unique_names += 1
-
-print(f"   • أسماء فريدة: {unique_names}")
-print(f"   • أسماء مكررة: {duplicate_names}")
+supabase = get_client()
+
+# The database groups by normalized name and returns only the extra copies
+print("🔍 البحث عن المكررات في قاعدة البيانات...")
+duplicates = find_duplicates('individual', name_only=args.name_only)
+
+duplicates_to_delete = [{
+    'id': record['deputy_id'],
+    'user_id': record['user_id'],
+    'name': record['full_name'],
+    'created_at': record['created_at']
+} for record in duplicates]
+
+print(f"   • أسماء مكررة: {len(group_duplicates(duplicates))}")
 print(f"   • سجلات سيتم حذفها: {len(duplicates_to_delete)}\n")
 
-if not duplicates_to_delete:
+if not duplicates_to_delete and not args.resume:
     print("✅ لا توجد مكررات للحذف!")
     print("\n" + "="*80 + "\n")
     exit(0)
@@ -105,37 +83,15 @@ print(f"\n⚠️  سيتم حذف {len(duplicates_to_delete)} سجل مكرر\n"
 # Confirm deletion
 print("🔄 بدء عملية الحذف...\n")
 
-deleted_count = 0
-error_count = 0
-
-for i, record in enumerate(duplicates_to_delete, 1):
-    try:
-        # Delete deputy_profile
-        supabase.table('deputy_profiles').delete().eq('id', record['id']).execute()
-        
-        # Delete user_profile
-        supabase.table('user_profiles').delete().eq('id', record['user_id']).execute()
-        
-        # Delete auth user
-        try:
-            supabase.auth.admin.delete_user(record['user_id'])
-        except:
-            pass  # User might not exist in auth
-        
-        deleted_count += 1
-        
-        if i % 50 == 0:
-            print(f"   ✅ تم حذف {deleted_count}/{len(duplicates_to_delete)} سجل...")
-        
-    except Exception as e:
-        error_count += 1
-        print(f"   ❌ خطأ في حذف {record['name']}: {e}")
+# Profiles go in chunked in_() deletes, auth users on a bounded pool
+deleter = CascadeDeleter('remove_duplicates', **delete_options(args))
+stats = deleter.run([record['user_id'] for record in duplicates_to_delete])
 
 print(f"\n✅ اكتملت عملية الحذف!")
 print("-" * 80)
-print(f"   • تم الحذف بنجاح: {deleted_count}")
-print(f"   • فشل الحذف: {error_count}")
-print(f"   • الإجمالي: {deleted_count + error_count}")
+print(f"   • تم الحذف بنجاح: {stats.auth}")
+print(f"   • فشل الحذف: {stats.errors}")
+print(f"   • الإجمالي: {stats.total}")
 
 # Verify final count
 print("\n🔍 التحقق من النتيجة النهائية...")
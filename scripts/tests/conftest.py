@@ -0,0 +1,50 @@
+"""
+Shared fixtures: the library is imported from scripts/, and ``standin``
+points it at a fresh local Supabase stand-in (see naebak_import/standin.py).
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from naebak_import import accounts, aio, config, identity, journal, lookups  # noqa: E402
+from naebak_import.standin import Faults, LocalSupabase  # noqa: E402
+
+
+@pytest.fixture
+def standin(monkeypatch, tmp_path):
+    """A stand-in without latency; the test may change server.faults (seeded, so they repeat)"""
+    server = LocalSupabase(str(tmp_path / 'supabase.sqlite'), Faults(), seed=0).start()
+    for name, value in server.env().items():
+        monkeypatch.setattr(config, name, value)
+    monkeypatch.setattr(config, 'STATE_DIR', str(tmp_path))
+    monkeypatch.setattr(journal, 'JOURNAL_DIR', str(tmp_path / 'journals'))
+    # The blocking client of an earlier test points at its stopped server
+    monkeypatch.setattr(config, '_client', None)
+    try:
+        yield server
+    finally:
+        server.stop()
+
+
+@pytest.fixture
+def fresh_process(standin, monkeypatch):
+    """Lookup indexes, auth user and identity indexes and engine as a new process starts with them"""
+    monkeypatch.setattr(lookups, '_loaded', False)
+    monkeypatch.setattr(accounts, 'auth_user_index', {})
+    monkeypatch.setattr(accounts, '_auth_loaded', False)
+    monkeypatch.setattr(accounts, '_index_failed', False)
+    monkeypatch.setattr(accounts, '_scanned_at', None)
+    monkeypatch.setattr(accounts, '_rescan', None)
+    monkeypatch.setattr(identity, 'identity_index', {})
+    monkeypatch.setattr(identity, '_identity_loaded', False)
+    # The shared engine of an earlier test points at its stopped server
+    monkeypatch.setattr(aio, '_engine', None)
+    try:
+        yield
+    finally:
+        if aio._engine is not None:
+            aio._engine.close()
@@ -0,0 +1,106 @@
+"""
+Auth user index: concurrent "already registered" answers share one rescan,
+and an index that cannot be loaded falls back to per-email lookups
+"""
+
+import time
+
+import pytest
+from supabase_auth.errors import AuthApiError
+
+from naebak_import import accounts
+from naebak_import.aio import AsyncEngine
+from naebak_import.importer import import_records
+from naebak_import.sources import LIST
+
+
+@pytest.fixture
+def engine(standin):
+    engine = AsyncEngine(max_in_flight=64)
+    try:
+        yield engine
+    finally:
+        engine.close()
+
+
+@pytest.fixture
+def empty_index(monkeypatch):
+    """An index loaded before the users below existed"""
+    monkeypatch.setattr(accounts, 'auth_user_index', {})
+    monkeypatch.setattr(accounts, '_auth_loaded', True)
+    monkeypatch.setattr(accounts, '_scanned_at', time.monotonic())
+    monkeypatch.setattr(accounts, '_rescan', None)
+
+
+@pytest.mark.parametrize('error, registered', [
+    (AuthApiError('A user with this email address has already been registered', 422, 'email_exists'), True),
+    (AuthApiError('User already registered', 422, 'user_already_exists'), True),
+    (AuthApiError('Password should be at least 6 characters', 422, 'weak_password'), False),
+    (AuthApiError('Token already used', 403, None), False),
+])
+def test_already_registered_matches_error_codes(error, registered):
+    assert accounts._already_registered(error) is registered
+
+
+def test_conflict_burst_rescans_once(standin, engine, empty_index):
+    emails = [f'candidate-{i}@temp.naebak.com' for i in range(50)]
+    created = engine.run(engine.gather(lambda email: engine.create_user(email, 'secret-password', email),
+                                       emails, 50))
+    standin.faults.auth_latency = 0.05
+
+    async def create(email):
+        return await accounts.create_auth_user_async(engine, email, 'secret-password', email)
+
+    results = engine.run(engine.gather(create, emails, 50))
+
+    assert [user_id for user_id, _ in results] == [user_id for user_id, _ in created]
+    assert standin.requests['auth:list_users'] == 1
+
+
+def test_users_created_during_a_scan_are_kept(standin, fresh_process, engine, empty_index, monkeypatch):
+    engine.run(engine.create_user('old@temp.naebak.com', 'secret-password', 'old'))
+    stream = accounts.stream_auth_users
+
+    def slow_stream():
+        # Another worker creates a user while the scan is reading pages
+        accounts.remember_auth_user('new@temp.naebak.com', 'new-id')
+        yield from stream()
+
+    monkeypatch.setattr(accounts, 'stream_auth_users', slow_stream)
+    accounts.reload_auth_users(time.monotonic())
+
+    assert accounts.known_auth_user('new@temp.naebak.com') == 'new-id'
+    assert accounts.known_auth_user('OLD@temp.naebak.com')
+
+
+def test_throttled_scan_pages_are_retried(standin, fresh_process):
+    emails = [f'candidate-{i}@temp.naebak.com' for i in range(6)]
+    for email in emails:
+        standin.create_user(email)
+    standin.faults.auth_429 = 0.3
+
+    users = list(accounts.stream_auth_users(per_page=2))
+
+    assert sorted(user.email for user in users) == emails
+    assert standin.throttled['auth:list_users'] > 0
+
+
+def test_import_looks_emails_up_when_the_index_fails(standin, fresh_process, monkeypatch):
+    standin.seed_reference()
+    rows = [(i, LIST.record('الأولى', 'قطاع شرق الدلتا', 'القائمة الوطنية من أجل مصر', 'أساسي',
+                            i + 1, f'مرشح رقم {i + 1}', '')) for i in range(3)]
+    import_records(LIST, rows)
+
+    def unavailable(*args, **kwargs):
+        raise RuntimeError('auth is down')
+        yield
+
+    # A new process whose index scan fails
+    monkeypatch.setattr(accounts, 'auth_user_index', {})
+    monkeypatch.setattr(accounts, '_auth_loaded', False)
+    monkeypatch.setattr(accounts, 'stream_auth_users', unavailable)
+    stats = import_records(LIST, rows)
+
+    assert stats.success == 3 and stats.errors == 0
+    assert standin.requests['auth:create_user'] == 3
+    assert standin.requests['auth:find_user'] == 3
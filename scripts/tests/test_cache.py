@@ -0,0 +1,97 @@
+"""Parsed sheets are cached by content: a hit skips parsing, an edit or a torn copy parses again"""
+
+import os
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+pytest.importorskip('openpyxl')
+
+from naebak_import import cache  # noqa: E402
+from naebak_import.cache import cache_path, read_sheet  # noqa: E402
+
+
+@pytest.fixture
+def parses(monkeypatch, tmp_path):
+    """Cache in tmp_path; returns the list of workbooks pd.read_excel parsed"""
+    monkeypatch.setattr(cache, 'CACHE_DIR', str(tmp_path / 'sheets'))
+    parsed = []
+    read_excel = pd.read_excel
+
+    def counted(path, *args, **kwargs):
+        parsed.append(path)
+        return read_excel(path, *args, **kwargs)
+
+    monkeypatch.setattr(cache.pd, 'read_excel', counted)
+    return parsed
+
+
+def write_sheet(path, names):
+    pd.DataFrame({'الاسم': names, 'الرقم': list(range(len(names)))}).to_excel(path, index=False)
+
+
+def test_second_read_is_a_cache_hit(parses, tmp_path):
+    path = str(tmp_path / 'sheet.xlsx')
+    write_sheet(path, ['أحمد', None, 'محمد'])
+
+    first = read_sheet(path)
+    second = read_sheet(path)
+
+    assert len(parses) == 1
+    assert os.path.exists(cache_path(path))
+    pd.testing.assert_frame_equal(first, second, check_dtype=False)
+    assert pd.isna(second['الاسم'][1])
+
+
+def test_editing_the_workbook_invalidates_the_cache(parses, tmp_path):
+    path = str(tmp_path / 'sheet.xlsx')
+    write_sheet(path, ['أحمد'])
+    old_copy = cache_path(path)
+    read_sheet(path)
+
+    write_sheet(path, ['أحمد', 'محمد'])
+    df = read_sheet(path)
+
+    assert len(parses) == 2
+    assert list(df['الاسم']) == ['أحمد', 'محمد']
+    assert not os.path.exists(old_copy)
+    assert os.listdir(cache.CACHE_DIR) == [os.path.basename(cache_path(path))]
+
+
+def test_npz_round_trip_keeps_values_and_gaps(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, 'CACHE_FORMAT', 'npz')
+    monkeypatch.setattr(cache, 'CACHE_DIR', str(tmp_path))
+    df = pd.DataFrame({'الاسم': ['أحمد', None, 'سارة'], 'الرقم': [1.0, None, 3.5], 'نشط': [True, False, True]})
+    target = str(tmp_path / 'sheet.npz')
+
+    cache._save(df, target)
+    loaded = cache._load(target)
+
+    assert list(loaded.columns) == list(df.columns)
+    assert loaded['الاسم'].tolist()[::2] == ['أحمد', 'سارة'] and pd.isna(loaded['الاسم'][1])
+    pd.testing.assert_series_equal(loaded['الرقم'], df['الرقم'])
+    assert loaded['نشط'].tolist() == [True, False, True]
+
+
+def test_an_unreadable_copy_is_parsed_again(parses, tmp_path):
+    path = str(tmp_path / 'sheet.xlsx')
+    write_sheet(path, ['أحمد'])
+    read_sheet(path)
+    with open(cache_path(path), 'wb') as f:
+        f.write(b'torn')
+
+    df = read_sheet(path)
+
+    assert len(parses) == 2
+    assert list(df['الاسم']) == ['أحمد']
+    assert len(read_sheet(path)) == 1 and len(parses) == 2
+
+
+def test_refresh_parses_again(parses, tmp_path):
+    path = str(tmp_path / 'sheet.xlsx')
+    write_sheet(path, ['أحمد'])
+    read_sheet(path)
+
+    read_sheet(path, refresh=True)
+
+    assert len(parses) == 2
@@ -0,0 +1,24 @@
+"""Keyset page reads survive throttling"""
+
+from naebak_import.db import fetch_all, stream_rows
+
+
+def test_throttled_pages_are_retried(standin, fresh_process):
+    count = standin.seed_reference()
+    standin.faults.rest_429 = 0.3
+
+    rows = list(stream_rows('governorates', 'id, name_ar', page_size=5))
+
+    assert len(rows) == count
+    assert len({row['id'] for row in rows}) == count
+    assert standin.throttled['select:governorates'] > 0
+
+
+def test_fetch_all_adds_the_key_column(standin, fresh_process):
+    count = standin.seed_reference()
+    standin.faults.rest_429 = 0.3
+
+    rows = fetch_all('governorates', 'name_ar', page_size=4)
+
+    assert len(rows) == count
+    assert all(set(row) == {'id', 'name_ar'} for row in rows)
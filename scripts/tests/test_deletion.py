@@ -0,0 +1,67 @@
+"""Cascade deletion removes whole candidate trios, and --resume finishes an interrupted one"""
+
+from naebak_import.deletion import STATUS_PROFILES_DELETED, CascadeDeleter
+from naebak_import.importer import import_records
+from naebak_import.journal import ImportJournal
+from naebak_import.sources import LIST
+
+
+def imported_users(standin, count):
+    standin.seed_reference()
+    rows = [(i, LIST.record('الأولى', 'قطاع شرق الدلتا', 'القائمة الوطنية من أجل مصر', 'أساسي',
+                            i + 1, f'مرشح رقم {i + 1}', '')) for i in range(count)]
+    import_records(LIST, rows)
+    return [row['user_id'] for row in standin.query('SELECT user_id FROM deputy_profiles')]
+
+
+def test_candidates_are_deleted_in_chunks(standin, fresh_process):
+    user_ids = imported_users(standin, 5)
+    standin.faults.auth_429 = 0.3
+
+    stats = CascadeDeleter('purge', chunk_size=2).run(user_ids)
+
+    assert (stats.profiles, stats.auth, stats.errors) == (5, 5, 0)
+    counts = standin.table_counts()
+    assert counts['deputy_profiles'] == counts['user_profiles'] == counts['auth.users'] == 0
+    assert standin.requests['delete:deputy_profiles'] == 3
+    assert standin.throttled['auth:delete_user'] > 0
+
+
+def test_a_user_already_gone_counts_as_deleted(standin, fresh_process):
+    stats = CascadeDeleter('purge').run(['6f1c8a52-0000-4000-8000-000000000000'])
+
+    assert stats.auth == 1 and stats.errors == 0
+
+
+def test_resume_finishes_users_whose_profiles_went(standin, fresh_process):
+    user_id = standin.create_user('leftover@temp.naebak.com')['id']
+    standin.executemany('DELETE FROM user_profiles WHERE id = ?', [(user_id,)])
+    journal = ImportJournal('purge')
+    journal.record(user_id, None, STATUS_PROFILES_DELETED)
+    journal.close()
+
+    stats = CascadeDeleter('purge', resume=True).run([])
+
+    assert stats.auth == 1 and stats.profiles == 0
+    assert standin.table_counts()['auth.users'] == 0
+
+
+def test_resume_skips_users_already_deleted(standin, fresh_process):
+    user_ids = imported_users(standin, 3)
+    CascadeDeleter('purge').run(user_ids)
+    standin.reset_counters()
+
+    stats = CascadeDeleter('purge', resume=True).run(user_ids)
+
+    assert stats.total == 0
+    assert not standin.requests
+
+
+def test_profiles_only(standin, fresh_process):
+    user_ids = imported_users(standin, 2)
+
+    stats = CascadeDeleter('purge', auth=False).run(user_ids)
+
+    assert stats.profiles == 2 and stats.auth == 0
+    assert standin.table_counts()['user_profiles'] == 0
+    assert standin.table_counts()['auth.users'] == 2
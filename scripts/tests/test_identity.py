@@ -0,0 +1,50 @@
+"""Candidate identity: spelling variants share one, and importing twice reaches the same rows"""
+
+from naebak_import import identity
+from naebak_import.identity import (candidate_identity, find_identity, identity_email, identity_slug,
+                                    index_profiles)
+from naebak_import.importer import import_records
+from naebak_import.sources import LIST
+
+
+def list_rows(count):
+    return [(i, LIST.record('الأولى', 'قطاع شرق الدلتا', 'القائمة الوطنية من أجل مصر', 'أساسي',
+                            i + 1, f'مرشح رقم {i + 1}', '')) for i in range(count)]
+
+
+def test_spelling_variants_share_an_identity():
+    first = candidate_identity('أحمد  إبراهيم', 'gov-1', 'district-1')
+    second = candidate_identity('احمد ابراهيم', 'gov-1', 'district-1')
+    elsewhere = candidate_identity('احمد ابراهيم', 'gov-1', 'district-2')
+
+    assert first == second != elsewhere
+    assert identity_email('أحمد إبراهيم', 'individual', first) == identity_email('احمد ابراهيم', 'individual', second)
+    assert identity_slug('individual', first) != identity_slug('individual', elsewhere)
+
+
+def test_index_keeps_the_first_profile_of_an_identity(monkeypatch):
+    monkeypatch.setattr(identity, 'identity_index', {})
+    users = [{'id': 'u1', 'full_name': 'فاطمة محمد علي', 'governorate_id': 'gov-1'},
+             {'id': 'u2', 'full_name': 'فاطمه محمد علي', 'governorate_id': 'gov-1'},
+             {'id': 'u3', 'full_name': None, 'governorate_id': 'gov-1'}]
+    deputies = [{'user_id': user_id, 'slug': f'list-{user_id}', 'electoral_district_id': 'district-1',
+                 'council_id': 'council-1'} for user_id in ('u1', 'u2', 'u3')]
+
+    index_profiles(users, deputies)
+
+    assert len(identity.identity_index) == 1
+    assert find_identity(candidate_identity('فاطمة محمد علي', 'gov-1', 'district-1', 'council-1')) == \
+        ('u1', 'list-u1')
+
+
+def test_importing_twice_creates_nothing_new(standin, fresh_process):
+    standin.seed_reference()
+    import_records(LIST, list_rows(3))
+    slugs = standin.query('SELECT slug FROM deputy_profiles ORDER BY slug')
+
+    stats = import_records(LIST, list_rows(3))
+
+    assert stats.success == 3
+    assert standin.requests['auth:create_user'] == 3
+    assert standin.table_counts()['deputy_profiles'] == 3
+    assert standin.query('SELECT slug FROM deputy_profiles ORDER BY slug') == slugs
@@ -0,0 +1,64 @@
+"""Orphan scan across auth users, user_profiles and deputy_profiles, and its repair"""
+
+import numpy as np
+
+from naebak_import.importer import import_records
+from naebak_import.integrity import missing_from, repair, scan_integrity
+from naebak_import.sources import LIST
+
+GONE_USER = '6f1c8a52-0000-4000-8000-000000000001'
+GONE_DEPUTY_USER = '6f1c8a52-0000-4000-8000-000000000002'
+
+
+def test_missing_from():
+    ids = np.array([b'a', b'c', b'e', b'z'], dtype='S36')
+
+    assert missing_from(ids, np.array([b'b', b'c', b'e'], dtype='S36')).tolist() == [b'a', b'z']
+    assert missing_from(ids, np.array([], dtype='S36')).tolist() == ids.tolist()
+
+
+def add_orphans(standin):
+    """One orphan of each class next to three complete candidates"""
+    standin.seed_reference()
+    rows = [(i, LIST.record('الأولى', 'قطاع شرق الدلتا', 'القائمة الوطنية من أجل مصر', 'أساسي',
+                            i + 1, f'مرشح رقم {i + 1}', '')) for i in range(3)]
+    import_records(LIST, rows)
+    bare = standin.create_user('bare@temp.naebak.com')['id']
+    standin.executemany('DELETE FROM user_profiles WHERE id = ?', [(bare,)])
+    deputy = standin.create_user('deputy@temp.naebak.com')['id']
+    standin.executemany("UPDATE user_profiles SET role = 'deputy' WHERE id = ?", [(deputy,)])
+    # Rows whose referenced user is gone, as a database without the foreign keys would hold them
+    standin.query('PRAGMA foreign_keys = OFF')
+    standin.executemany("INSERT INTO user_profiles (id, full_name, role) VALUES (?, 'بلا حساب', 'citizen')",
+                        [(GONE_USER,)])
+    standin.executemany("INSERT INTO deputy_profiles (id, user_id) VALUES ('gone-deputy', ?)", [(GONE_DEPUTY_USER,)])
+    standin.query('PRAGMA foreign_keys = ON')
+    return bare, deputy
+
+
+def test_every_orphan_class_is_found(standin, fresh_process):
+    bare, deputy = add_orphans(standin)
+
+    report = scan_integrity()
+
+    assert (report.auth_users, report.user_profiles, report.deputy_profiles) == (5, 5, 4)
+    assert report.orphans == {
+        'auth_without_profile': [bare],
+        'profile_without_auth': [GONE_USER],
+        'deputy_without_profile': [GONE_DEPUTY_USER],
+        'deputy_user_without_deputy_profile': [deputy],
+    }
+    assert report.total == 4
+
+
+def test_repair_leaves_deputies_without_a_profile(standin, fresh_process):
+    _, deputy = add_orphans(standin)
+
+    results = repair(scan_integrity(), profiles=True)
+    after = scan_integrity()
+
+    assert results['auth_without_profile'].auth == 1
+    assert results['dangling_profiles'].profiles == 2
+    assert after.orphans['deputy_user_without_deputy_profile'] == [deputy]
+    assert after.total == 1
+    assert standin.table_counts()['deputy_profiles'] == 3
@@ -0,0 +1,85 @@
+"""Row checkpoints survive a restart, and --resume picks an import up where it stopped"""
+
+import pytest
+
+from naebak_import import journal as journal_module
+from naebak_import.importer import import_records
+from naebak_import.journal import STATUS_AUTH, STATUS_DONE, ImportJournal, journal_path, row_key
+from naebak_import.sources import LIST
+
+
+@pytest.fixture
+def journals(monkeypatch, tmp_path):
+    monkeypatch.setattr(journal_module, 'JOURNAL_DIR', str(tmp_path))
+    return tmp_path
+
+
+def list_rows(count):
+    return [(i, LIST.record('الأولى', 'قطاع شرق الدلتا', 'القائمة الوطنية من أجل مصر', 'أساسي',
+                            i + 1, f'مرشح رقم {i + 1}', '')) for i in range(count)]
+
+
+def test_row_key_is_stable():
+    cells = {'الاسم الكامل': 'محمد أحمد محمود السيد', 'الترتيب في القائمة': 3}
+
+    assert row_key('list', 4, cells) == row_key('list', 4, dict(reversed(cells.items())))
+    assert row_key('list', 4, cells) != row_key('list', 5, cells)
+    assert row_key('list', 4, cells) != row_key('individual', 4, cells)
+    assert row_key('list', 4, {'صفة المرشح': float('nan')}) == row_key('list', 4, {'صفة المرشح': None})
+
+
+def test_resume_merges_the_records_of_a_row(journals):
+    journal = ImportJournal('run')
+    journal.record('a', 0, STATUS_AUTH, user_id='user-a')
+    journal.record('a', 0, STATUS_DONE)
+    journal.record('b', 1, STATUS_AUTH, user_id='user-b')
+    journal.close()
+
+    resumed = ImportJournal('run', resume=True)
+    fresh = ImportJournal('run')
+    resumed.close()
+    fresh.close()
+
+    assert resumed.is_done('a') and resumed.user_id('a') == 'user-a'
+    assert not resumed.is_done('b') and resumed.user_id('b') == 'user-b'
+    assert resumed.with_status(STATUS_AUTH) == ['b']
+    assert fresh.entries == {}
+
+
+def test_a_half_written_last_line_is_ignored(journals):
+    journal = ImportJournal('run')
+    journal.record('a', 0, STATUS_DONE)
+    journal.close()
+    with open(journal_path('run'), 'a', encoding='utf-8') as f:
+        f.write('{"key": "b", "sta')
+
+    resumed = ImportJournal('run', resume=True)
+    resumed.close()
+
+    assert list(resumed.entries) == ['a']
+
+
+def test_resume_skips_finished_rows(standin, fresh_process):
+    standin.seed_reference()
+    import_records(LIST, list_rows(3), journal='resume-test')
+
+    stats = import_records(LIST, list_rows(5), journal='resume-test', resume=True)
+
+    assert stats.skipped == 3 and stats.success == 2
+    assert standin.requests['auth:create_user'] == 5
+    assert standin.table_counts()['deputy_profiles'] == 5
+
+
+def test_resume_reuses_the_user_of_a_half_done_row(standin, fresh_process):
+    standin.seed_reference()
+    rows = list_rows(1)
+    user_id = standin.create_user('half-done@temp.naebak.com')['id']
+    journal = ImportJournal('resume-test')
+    journal.record(row_key(LIST.name, 0, LIST.cells(rows[0][1])), 0, STATUS_AUTH, user_id=user_id)
+    journal.close()
+
+    stats = import_records(LIST, rows, journal='resume-test', resume=True)
+
+    assert stats.success == 1
+    assert standin.requests['auth:create_user'] == 0
+    assert standin.query('SELECT user_id FROM deputy_profiles') == [{'user_id': user_id}]
@@ -0,0 +1,30 @@
+"""Lookups retry throttled inserts and never cache a failed one"""
+
+from naebak_import.config import VIRTUAL_GOVERNORATE_ID
+from naebak_import.lookups import create_or_get_electoral_district, get_party_id, warm_up
+
+
+def test_throttled_inserts_are_retried(standin, fresh_process):
+    standin.seed_reference()
+    warm_up()
+    standin.faults.rest_429 = 0.3
+
+    party_ids = [get_party_id(f'حزب رقم {i}') for i in range(5)]
+    district_id = create_or_get_electoral_district('قطاع شرق الدلتا', VIRTUAL_GOVERNORATE_ID, 'list')
+
+    assert None not in party_ids and district_id is not None
+    assert standin.table_counts()['parties'] == 5
+    assert standin.requests['insert:parties'] > 5
+
+
+def test_failed_inserts_are_not_cached(standin, fresh_process):
+    standin.seed_reference()
+    warm_up()
+    standin.faults.rest_429 = 1.0
+
+    assert get_party_id('حزب جديد') is None
+    assert create_or_get_electoral_district('قطاع شرق الدلتا', VIRTUAL_GOVERNORATE_ID, 'list') is None
+
+    standin.faults.rest_429 = 0.0
+    assert get_party_id('حزب جديد') is not None
+    assert create_or_get_electoral_district('قطاع شرق الدلتا', VIRTUAL_GOVERNORATE_ID, 'list') is not None
@@ -0,0 +1,64 @@
+"""Fuzzy name index: spelling variants match, relatives and other names do not"""
+
+import pytest
+
+from naebak_import.matching import NameIndex, canonical_name, edit_distance, name_score
+
+
+def test_canonical_name_joins_compound_prefixes():
+    assert canonical_name('  عبد الله أحمد  ابو  بكر') == 'عبدالله احمد ابوبكر'
+    assert canonical_name('عبد الله') == canonical_name('عبدالله')
+
+
+@pytest.mark.parametrize('a, b, distance', [('kitten', 'sitting', 3), ('', 'abc', 3), ('محمد', 'محمود', 1)])
+def test_edit_distance(a, b, distance):
+    assert edit_distance(a, b) == distance == edit_distance(b, a)
+
+
+def test_name_score_needs_the_same_words():
+    assert name_score('محمد احمد', 'محمد احمد') == 1.0
+    assert name_score('محمد احمد', 'محمد احمدد') == pytest.approx(0.9)
+    # Another word count, or a first name that is more than a typo away
+    assert name_score('محمد احمد', 'محمد احمد علي') == 0.0
+    assert name_score('حسين احمد محمود', 'علي احمد محمود') == 0.0
+
+
+@pytest.fixture
+def index():
+    index = NameIndex()
+    index.add('محمد أحمد محمود السيد', 'mohamed')
+    index.add('علي أحمد محمود السيد', 'ali')
+    index.add('عبد الله حسن', 'abdallah-1')
+    index.add('عبدالله حسن', 'abdallah-2')
+    index.add('   ', 'blank')
+    return index
+
+
+def test_exact_and_normalized_names_score_one(index):
+    assert index.match('محمد احمد محمود السيد') == ('محمد احمد محمود السيد', ['mohamed'], 1.0)
+    assert index.match('عبد الله حسن') == ('عبدالله حسن', ['abdallah-1', 'abdallah-2'], 1.0)
+    assert len(index) == 3
+
+
+def test_spacing_variants_score_one(index):
+    name, values, score = index.match('علي أحمد محمودالسيد')
+    assert values == ['ali'] and score == 1.0
+
+
+def test_a_typo_matches_above_min_score(index):
+    name, values, score = index.match('محمد أحمد محمود السيدد')
+    assert values == ['mohamed']
+    assert 0.88 <= score < 1.0
+
+
+def test_relatives_and_partial_names_do_not_match(index):
+    # A brother: same father and grandfather, different first name
+    assert index.match('حسين أحمد محمود السيد') is None
+    assert index.match('محمد أحمد محمود') is None
+    assert index.match('') is None
+
+
+def test_min_score_is_respected():
+    strict = NameIndex(min_score=0.99)
+    strict.add('محمد أحمد محمود السيد', 'mohamed')
+    assert strict.match('محمد أحمد محمود السيدد') is None
@@ -0,0 +1,181 @@
+"""
+Direct Postgres backend against a real database.
+
+NAEBAK_TEST_DATABASE_URL must point at a throwaway database: the tables the
+importer writes are dropped and recreated for every test. Auth users go to
+the stand-in, whose governorates are copied into Postgres.
+"""
+
+import os
+
+import pytest
+
+psycopg = pytest.importorskip('psycopg')
+pd = pytest.importorskip('pandas')
+
+from naebak_import import accounts, lookups  # noqa: E402
+from naebak_import.config import VIRTUAL_GOVERNORATE_ID  # noqa: E402
+from naebak_import import importer  # noqa: E402
+from naebak_import.importer import import_list_candidates  # noqa: E402
+from naebak_import.pgload import PostgresLoader, planned_id  # noqa: E402
+from naebak_import.sources import LIST  # noqa: E402
+
+DATABASE_URL = os.getenv('NAEBAK_TEST_DATABASE_URL')
+
+SCHEMA = """
+DROP TABLE IF EXISTS deputy_profiles, user_profiles, parties, electoral_districts, governorates CASCADE;
+CREATE TABLE governorates (
+    id uuid PRIMARY KEY,
+    name_ar text NOT NULL
+);
+CREATE TABLE electoral_districts (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    name text NOT NULL,
+    governorate_id uuid NOT NULL REFERENCES governorates(id),
+    district_type text NOT NULL CHECK (district_type IN ('individual', 'list')),
+    UNIQUE (name, governorate_id, district_type)
+);
+CREATE TABLE parties (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    name_ar text NOT NULL UNIQUE,
+    name_en text,
+    description text
+);
+CREATE TABLE user_profiles (
+    id uuid PRIMARY KEY,
+    full_name text,
+    avatar_url text,
+    role text,
+    governorate_id uuid REFERENCES governorates(id),
+    party_id uuid REFERENCES parties(id)
+);
+CREATE TABLE deputy_profiles (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id uuid NOT NULL UNIQUE REFERENCES user_profiles(id),
+    slug text UNIQUE,
+    candidate_type text,
+    deputy_status text NOT NULL DEFAULT 'candidate',
+    electoral_district_id uuid REFERENCES electoral_districts(id),
+    council_id uuid,
+    party_id uuid REFERENCES parties(id)
+);
+"""
+
+
+@pytest.fixture
+def database():
+    """A connection to the test database with empty import tables"""
+    if not DATABASE_URL:
+        pytest.skip('NAEBAK_TEST_DATABASE_URL is not set')
+    with psycopg.connect(DATABASE_URL, autocommit=True) as connection:
+        connection.execute(SCHEMA)
+        connection.execute('INSERT INTO governorates (id, name_ar) VALUES (%s, %s)',
+                           (VIRTUAL_GOVERNORATE_ID, 'دوائر القوائم'))
+        yield connection
+
+
+@pytest.fixture
+def importing(standin, database, fresh_process):
+    """The stand-in's governorates in Postgres"""
+    standin.seed_reference()
+    governorates = standin.db.execute('SELECT id, name_ar FROM governorates WHERE id != ?',
+                                      (VIRTUAL_GOVERNORATE_ID,)).fetchall()
+    with database.cursor() as cursor:
+        cursor.executemany('INSERT INTO governorates (id, name_ar) VALUES (%s, %s)',
+                           [tuple(governorate) for governorate in governorates])
+    return database
+
+
+def count(connection, table):
+    return connection.execute(f'SELECT count(*) FROM {table}').fetchone()[0]
+
+
+def test_merge_matches_normalized_names(database):
+    database.execute("INSERT INTO parties (name_ar) VALUES ('تحالف القائمة الوطنية')")
+    database.execute("INSERT INTO electoral_districts (name, governorate_id, district_type) VALUES (%s, %s, 'list')",
+                     ('قطاع القاهرة وجنوب ووسط الدلتا', VIRTUAL_GOVERNORATE_ID))
+
+    with PostgresLoader(DATABASE_URL) as db, db.transaction():
+        parties = db.merge_parties([{'id': planned_id('parties', 'x'), 'name_ar': 'تحالف القائمه الوطنيه',
+                                     'name_en': None, 'description': None}])
+        districts = db.merge_districts([{'id': planned_id('electoral_districts', 'y'),
+                                         'name': 'قطاع القاهره وجنوب ووسط الدلتا',
+                                         'governorate_id': VIRTUAL_GOVERNORATE_ID, 'district_type': 'list'}])
+
+    assert count(database, 'parties') == 1
+    assert count(database, 'electoral_districts') == 1
+    assert planned_id('parties', 'x') not in parties.values()
+    assert planned_id('electoral_districts', 'y') not in districts.values()
+
+
+def test_failed_transaction_rolls_back(database):
+    with pytest.raises(RuntimeError), PostgresLoader(DATABASE_URL) as db, db.transaction():
+        db.merge_parties([{'id': planned_id('parties', 'x'), 'name_ar': 'تحالف جديد',
+                           'name_en': None, 'description': None}])
+        raise RuntimeError('failed mid-load')
+
+    assert count(database, 'parties') == 0
+
+
+def list_sheet(rows):
+    return pd.DataFrame([{
+        'المرحلة': 'الأولى',
+        'دائرة القوائم': 'قطاع شرق الدلتا',
+        'اسم القائمة': 'القائمة الوطنية من أجل مصر',
+        'أساسي/ إحتياطي': 'أساسي',
+        'الترتيب في القائمة': i + 1,
+        'الاسم الكامل': f'مرشح رقم {i + 1}',
+        'صفة المرشح': '',
+    } for i in range(rows)], columns=LIST.headers())
+
+
+def test_import_creates_auth_users_outside_the_transaction(standin, importing, monkeypatch):
+    create_auth_users = importer.create_auth_users
+    open_transactions = []
+
+    def checked(*args, **kwargs):
+        open_transactions.append(importing.execute(
+            "SELECT count(*) FROM pg_stat_activity WHERE state LIKE 'idle in transaction%' "
+            "AND datname = current_database()").fetchone()[0])
+        return create_auth_users(*args, **kwargs)
+
+    monkeypatch.setattr(importer, 'create_auth_users', checked)
+
+    stats = import_list_candidates(list_sheet(5), database_url=DATABASE_URL)
+
+    assert stats.success == 5
+    assert open_transactions == [0]
+    assert count(importing, 'parties') == 1
+    assert count(importing, 'electoral_districts') == 1
+    assert count(importing, 'deputy_profiles') == 5
+    assert standin.requests['auth:create_user'] == 5
+    assert standin.requests['insert:parties'] == 0
+    assert standin.requests['upsert:electoral_districts'] == 0
+
+
+def test_reimport_reuses_planned_ids_and_auth_users(standin, importing, monkeypatch):
+    upsert = PostgresLoader.upsert
+    failing = [True]
+
+    def flaky(*args, **kwargs):
+        if failing:
+            raise RuntimeError('connection lost')
+        return upsert(*args, **kwargs)
+
+    # Auth users are created, then the transaction fails
+    monkeypatch.setattr(PostgresLoader, 'upsert', flaky)
+    with pytest.raises(RuntimeError):
+        import_list_candidates(list_sheet(3), database_url=DATABASE_URL)
+    failing.clear()
+    assert count(importing, 'parties') == 0
+    assert standin.requests['auth:create_user'] == 3
+
+    # A new process: the lookups and the auth users are read again
+    monkeypatch.setattr(lookups, '_loaded', False)
+    monkeypatch.setattr(accounts, 'auth_user_index', {})
+    monkeypatch.setattr(accounts, '_auth_loaded', False)
+    stats = import_list_candidates(list_sheet(3), database_url=DATABASE_URL)
+
+    assert stats.success == 3
+    assert standin.requests['auth:create_user'] == 3
+    assert count(importing, 'user_profiles') == 3
@@ -0,0 +1,40 @@
+"""Ratings are seeded a chunk per call, and only deputies without one get one"""
+
+import numpy as np
+
+from naebak_import.importer import import_records
+from naebak_import.ratings import (RATING_COUNT_RANGE, RATING_RANGE, generate_ratings, rating_stats, set_ratings,
+                                   unrated_deputies)
+from naebak_import.sources import LIST
+
+
+def test_generated_ratings_are_in_range():
+    averages, counts = generate_ratings(500, seed=7)
+
+    assert RATING_RANGE[0] <= averages.min() and averages.max() <= RATING_RANGE[1]
+    assert np.array_equal(averages, np.round(averages, 1))
+    assert RATING_COUNT_RANGE[0] <= counts.min() and counts.max() <= RATING_COUNT_RANGE[1]
+    assert np.array_equal(averages, generate_ratings(500, seed=7)[0])
+
+
+def test_only_unrated_deputies_are_seeded(standin, fresh_process):
+    standin.seed_reference()
+    rows = [(i, LIST.record('الأولى', 'قطاع شرق الدلتا', 'القائمة الوطنية من أجل مصر', 'أساسي',
+                            i + 1, f'مرشح رقم {i + 1}', '')) for i in range(7)]
+    import_records(LIST, rows)
+    ids = unrated_deputies()
+    standin.executemany('UPDATE deputy_profiles SET rating_average = 4.5, rating_count = 10 WHERE id = ?',
+                        [(ids[0],)])
+    progress = []
+
+    updated = set_ratings(ids, *generate_ratings(len(ids), seed=1), chunk_size=3,
+                          on_chunk=lambda done, total: progress.append((done, total)))
+
+    assert updated == 6
+    assert standin.requests['rpc:set_deputy_ratings'] == 3
+    # Chunks finish in any order; the count only grows
+    assert len(progress) == 3 and max(progress) == (7, 7)
+    assert standin.query('SELECT rating_average FROM deputy_profiles WHERE id = ?', (ids[0],)) == \
+        [{'rating_average': 4.5}]
+    assert unrated_deputies() == []
+    assert rating_stats()['unrated'] == 0
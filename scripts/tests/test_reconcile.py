@@ -0,0 +1,149 @@
+"""
+Reconcile plans against the stand-in: every kind of insert, update, delete
+and conflict, and applying a plan in the same process
+"""
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+from naebak_import.config import COUNCIL_ID  # noqa: E402
+from naebak_import.importer import import_records  # noqa: E402
+from naebak_import.reconcile import (INSERT, REASON_CHANGED, REASON_DUPLICATE, REASON_MISSING,  # noqa: E402
+                                     REASON_NOT_IN_SOURCE, REASON_SIMILAR_NAME, REASON_SOURCE_DUPLICATE,
+                                     REASON_UNRESOLVED, apply_plan, reconcile)
+from naebak_import.sources import INDIVIDUAL, LIST, SENATE, read_rows  # noqa: E402
+
+from test_senate import senate_rows  # noqa: E402
+
+
+NATIONAL_LIST = 'القائمة الوطنية من أجل مصر'
+
+
+def list_sheet(rows, list_name=NATIONAL_LIST):
+    return named_list_sheet([(f'مرشح رقم {i + 1}', list_name) for i in range(rows)])
+
+
+def named_list_sheet(candidates):
+    """List sheet of (name, list name) rows in one district"""
+    return pd.DataFrame([{
+        'المرحلة': 'الأولى',
+        'دائرة القوائم': 'قطاع شرق الدلتا',
+        'اسم القائمة': list_name,
+        'أساسي/ إحتياطي': 'أساسي',
+        'الترتيب في القائمة': i + 1,
+        'الاسم الكامل': name,
+        'صفة المرشح': '',
+    } for i, (name, list_name) in enumerate(candidates)], columns=LIST.headers())
+
+
+def reasons(items):
+    return sorted((item.reason, item.candidate.name if item.candidate else item.existing.full_name)
+                  for item in items)
+
+
+def add_copy(standin, name):
+    """A second user and deputy profile for a candidate already in the stand-in, created later"""
+    original = standin.query(
+        'SELECT u.governorate_id, u.party_id, d.electoral_district_id, d.candidate_type, d.council_id '
+        'FROM user_profiles u JOIN deputy_profiles d ON d.user_id = u.id WHERE u.full_name = ?', (name,))[0]
+    user_id = standin.create_user('copy@temp.naebak.com')['id']
+    standin.executemany('UPDATE user_profiles SET full_name = ?, role = ?, governorate_id = ?, party_id = ? '
+                        'WHERE id = ?', [(name, 'deputy', original['governorate_id'], original['party_id'],
+                                          user_id)])
+    standin.executemany('INSERT INTO deputy_profiles (id, user_id, candidate_type, electoral_district_id, '
+                        "council_id, created_at) VALUES (?, ?, ?, ?, ?, '2999-01-01')",
+                        [('copy-deputy', user_id, original['candidate_type'],
+                          original['electoral_district_id'], original['council_id'])])
+
+
+def test_apply_plan_creates_the_parties_reconcile_did_not_find(standin, fresh_process):
+    standin.seed_reference()
+
+    plan = reconcile(list_sheet(5), LIST)
+    import_stats, _ = apply_plan(plan)
+
+    assert [item.action for item in plan.inserts] == [INSERT] * 5
+    assert import_stats.success == 5 and import_stats.errors == 0
+    assert standin.table_counts()['parties'] == 1
+    assert standin.table_counts()['deputy_profiles'] == 5
+
+
+def test_a_slice_plans_no_deletions(standin, fresh_process):
+    standin.seed_reference()
+    import_records(LIST, list(read_rows(list_sheet(6), LIST)))
+
+    whole = reconcile(list_sheet(4), LIST)
+    batch = reconcile(list_sheet(6), LIST, start=0, stop=4)
+
+    assert len(whole.deletes) == 2
+    assert batch.source_rows == 4 and batch.unchanged == 4
+    assert batch.deletes == []
+
+
+def test_senate_members_are_reconciled(standin, fresh_process):
+    standin.seed_reference()
+    rows = senate_rows(standin, 4)
+    import_records(SENATE, rows)
+
+    plan = reconcile(pd.DataFrame([row for _, row in rows], columns=SENATE.headers()), SENATE)
+
+    assert plan.db_rows == 4 and plan.unchanged == 4
+    assert not plan.inserts and not plan.deletes
+
+
+def test_plan_sorts_every_row(standin, fresh_process):
+    standin.seed_reference()
+    imported = ['محمد أحمد محمود السيد', 'علي حسن إبراهيم', 'فاطمة محمد علي', 'سارة عبد الله حسن',
+                'خديجة سعيد عمر']
+    import_records(LIST, list(read_rows(named_list_sheet([(name, NATIONAL_LIST) for name in imported]), LIST)))
+    add_copy(standin, 'محمد أحمد محمود السيد')
+
+    plan = reconcile(named_list_sheet([
+        ('محمد أحمد محمود السيد', NATIONAL_LIST),
+        ('علي حسن إبراهيم', 'قائمة جديدة'),
+        ('علي حسن إبراهيم', NATIONAL_LIST),
+        ('فاطمة محمد عليي', NATIONAL_LIST),
+        ('خديجة سعيد عمر', NATIONAL_LIST),
+        ('خالد سعيد عمر', NATIONAL_LIST),
+    ]), LIST)
+
+    assert plan.source_rows == 6 and plan.db_rows == 6
+    assert plan.unchanged == 2
+    assert reasons(plan.inserts) == [(REASON_MISSING, 'خالد سعيد عمر')]
+    assert reasons(plan.updates) == [(REASON_CHANGED, 'علي حسن إبراهيم')]
+    assert set(plan.updates[0].changes) == {'party_id'}
+    assert reasons(plan.deletes) == sorted([(REASON_DUPLICATE, 'محمد أحمد محمود السيد'),
+                                            (REASON_NOT_IN_SOURCE, 'سارة عبد الله حسن')])
+    assert [item.existing.deputy_id for item in plan.by_reason(plan.deletes, REASON_DUPLICATE)] == ['copy-deputy']
+    assert reasons(plan.conflicts) == sorted([(REASON_SOURCE_DUPLICATE, 'علي حسن إبراهيم'),
+                                              (REASON_SIMILAR_NAME, 'فاطمة محمد عليي')])
+    similar = plan.by_reason(plan.conflicts, REASON_SIMILAR_NAME)[0]
+    assert similar.existing.full_name == 'فاطمة محمد علي' and similar.score < 1.0
+
+
+def test_unknown_governorate_is_a_conflict(standin, fresh_process):
+    standin.seed_reference()
+    sheet = pd.DataFrame([{
+        'المرحلة': 'الأولى', 'المحافظة': 'محافظة لا وجود لها', 'دائرة فردي': 'الأولى', 'مسلسل': 1,
+        'اسم المرشح': 'محمد أحمد محمود السيد', 'اسم الشهرة': None, 'الانتماء الحزبي': None, 'اسم الرمز': None,
+    }], columns=INDIVIDUAL.headers())
+
+    plan = reconcile(sheet, INDIVIDUAL)
+
+    assert [item.reason for item in plan.conflicts] == [REASON_UNRESOLVED]
+    assert not plan.inserts and plan.db_rows == 0
+
+
+def test_applied_plan_leaves_nothing_to_do(standin, fresh_process):
+    standin.seed_reference()
+    import_records(LIST, list(read_rows(list_sheet(3), LIST)))
+
+    plan = reconcile(list_sheet(5), LIST)
+    apply_plan(plan)
+    again = reconcile(list_sheet(5), LIST)
+
+    assert len(plan.inserts) == 2 and plan.unchanged == 3
+    assert again.unchanged == 5
+    assert not (again.inserts or again.updates or again.deletes or again.conflicts)
+    assert all(row['council_id'] == COUNCIL_ID for row in standin.query('SELECT council_id FROM deputy_profiles'))
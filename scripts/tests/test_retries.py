@@ -0,0 +1,69 @@
+"""
+Retries: HTTP 429 / 5xx are retried, PostgREST constraint violations are
+not, and only a run of 429s slows the rate limiter down
+"""
+
+import pytest
+from postgrest.exceptions import APIError
+
+from naebak_import.aio import AsyncEngine
+from naebak_import.concurrency import TokenBucket, error_status, is_retryable
+
+
+@pytest.mark.parametrize('sqlstate', ['23505', '23503'])
+def test_sqlstate_is_not_a_status(sqlstate):
+    error = APIError({'code': sqlstate, 'message': 'constraint violated', 'details': None, 'hint': None})
+    assert error_status(error) is None
+    assert not is_retryable(error)
+
+
+@pytest.fixture
+def engine(standin):
+    engine = AsyncEngine(max_in_flight=4)
+    try:
+        yield engine
+    finally:
+        engine.close()
+
+
+def test_unique_violation_is_not_retried(standin, engine):
+    engine.run(engine.upsert('parties', [{'id': 'p1', 'name_ar': 'حزب'}], 'id'))
+    before = standin.requests['upsert:parties']
+
+    result, error = engine.run(engine.attempt(
+        lambda: engine.upsert('parties', [{'id': 'p2', 'name_ar': 'حزب'}], 'id')))
+
+    assert result is None
+    assert isinstance(error, APIError) and error.code == '23505'
+    assert error_status(error) == 409
+    assert standin.requests['upsert:parties'] == before + 1
+
+
+def test_rate_limited_request_is_retried(standin, engine):
+    standin.faults.rest_429 = 1.0
+
+    _, error = engine.run(engine.attempt(lambda: engine.select('parties'), max_retries=2))
+
+    assert error_status(error) == 429
+    assert standin.throttled['select:parties'] == 3
+
+
+def test_stray_throttle_keeps_the_rate():
+    limiter = TokenBucket(10)
+    for _ in range(50):
+        limiter.on_success()
+    rate = limiter.rate
+
+    limiter.on_throttle()
+
+    assert limiter.rate == rate
+    assert limiter.paused_until > 0
+
+
+def test_throttle_run_halves_the_rate():
+    limiter = TokenBucket(10)
+
+    for _ in range(3):
+        limiter.on_throttle()
+
+    assert limiter.rate == 5
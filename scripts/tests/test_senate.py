@@ -0,0 +1,27 @@
+"""Senate members go through the shared import pipeline and its journal"""
+
+from naebak_import.config import SENATE_COUNCIL_ID
+from naebak_import.importer import import_records
+from naebak_import.sources import SENATE
+
+
+def senate_rows(standin, count):
+    governorate = standin.query('SELECT name_ar FROM governorates ORDER BY name_ar LIMIT 1')[0]['name_ar']
+    return [(i, SENATE.record(f'عضو رقم {i + 1}', governorate, 'فردي' if i % 2 else 'قائمة', 'حزب المستقبل'))
+            for i in range(count)]
+
+
+def test_resume_skips_journaled_members(standin, fresh_process):
+    standin.seed_reference()
+    rows = senate_rows(standin, 4)
+
+    first = import_records(SENATE, rows, journal='senate-test')
+    again = import_records(SENATE, rows, journal='senate-test', resume=True)
+
+    assert first.success == 4
+    assert again.skipped == 4
+    assert standin.requests['auth:create_user'] == 4
+    members = standin.query('SELECT council_id, deputy_status, is_current_member FROM deputy_profiles')
+    assert [dict(member) for member in members] == [
+        {'council_id': SENATE_COUNCIL_ID, 'deputy_status': 'current', 'is_current_member': 1}] * 4
+    assert standin.table_counts()['parties'] == 1
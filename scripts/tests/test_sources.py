@@ -0,0 +1,81 @@
+"""
+Sheet rows become typed records: cells are normalized, columns are found by
+header, and blank rows are skipped but keep their place so indexes, slices
+and counts agree
+"""
+
+import numpy as np
+import pytest
+
+openpyxl = pytest.importorskip('openpyxl')
+pd = pytest.importorskip('pandas')
+
+from naebak_import.sources import SENATE, _cell, count_rows, read_rows  # noqa: E402
+
+
+@pytest.fixture
+def sheet(tmp_path):
+    """Senate sheet: members in data rows 0, 2 and 3, blank rows 1, 4 and 5"""
+    workbook = openpyxl.Workbook()
+    rows = workbook.active
+    rows.append(SENATE.headers())
+    rows.append(['عضو أول', 'القاهرة', 'فردي', 'حزب'])
+    rows.append([None, None, None, None])
+    rows.append(['  عضو ثان ', 'الجيزة', 'قائمة', None])
+    rows.append(['عضو ثالث', 'أسوان', 'فردي', None])
+    rows.append([None, '   ', None, None])
+    rows.append([None, None, None, None])
+    path = str(tmp_path / 'senate.xlsx')
+    workbook.save(path)
+    return path
+
+
+def test_indexes_count_blank_rows(sheet):
+    rows = list(read_rows(sheet, SENATE))
+
+    assert [index for index, _ in rows] == [0, 2, 3]
+    assert rows[1][1].name == 'عضو ثان' and rows[1][1].party is None
+    assert count_rows(sheet, SENATE) == 3
+
+
+def test_same_indexes_as_read_excel(sheet):
+    from_frame = list(read_rows(pd.read_excel(sheet), SENATE))
+
+    assert from_frame == list(read_rows(sheet, SENATE))
+
+
+@pytest.mark.parametrize('start, stop, indexes', [(1, 3, [2]), (2, None, [2, 3]), (0, 1, [0]), (4, None, [])])
+def test_slices_select_sheet_rows(sheet, start, stop, indexes):
+    assert [index for index, _ in read_rows(sheet, SENATE, start, stop)] == indexes
+    assert count_rows(sheet, SENATE, start, stop) == len(indexes)
+    assert [index for index, _ in read_rows(pd.read_excel(sheet), SENATE, start, stop)] == indexes
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('  القاهرة ', 'القاهرة'), ('   ', None), (None, None), (float('nan'), None),
+    (3.0, 3), (2.5, 2.5), (7, 7),
+])
+def test_cells_are_normalized(value, expected):
+    assert _cell(value) == expected
+
+
+def test_numpy_scalars_become_python_values():
+    assert _cell(np.float64(4.0)) == 4 and type(_cell(np.int64(4))) is int
+
+
+def test_columns_are_found_by_header(tmp_path):
+    path = str(tmp_path / 'senate.xlsx')
+    pd.DataFrame([['ملاحظة', 'حزب', 'فردي', 'الجيزة', 'عضو']],
+                 columns=['ملاحظات', *reversed(SENATE.headers())]).to_excel(path, index=False)
+
+    [(_, record)] = read_rows(path, SENATE)
+
+    assert (record.name, record.governorate, record.party) == ('عضو', 'الجيزة', 'حزب')
+
+
+def test_a_missing_column_is_named(tmp_path):
+    path = str(tmp_path / 'senate.xlsx')
+    pd.DataFrame([['عضو', 'الجيزة']], columns=SENATE.headers()[:2]).to_excel(path, index=False)
+
+    with pytest.raises(ValueError, match=SENATE.headers()[2]):
+        list(read_rows(path, SENATE))
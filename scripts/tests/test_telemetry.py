@@ -0,0 +1,36 @@
+"""Telemetry keeps a bounded latency sample however long the run"""
+
+import pytest
+
+from naebak_import.telemetry import LATENCY_SAMPLES, Telemetry
+
+
+def test_latency_samples_are_bounded():
+    telemetry = Telemetry('test', total=10, metrics_path='unused.jsonl', status=False)
+    durations = [(i % 100) / 100 for i in range(LATENCY_SAMPLES * 10)]
+    for seconds in durations:
+        telemetry.on_request('select:parties', seconds)
+
+    stats = telemetry.endpoint_stats()['select:parties']
+
+    assert len(telemetry.latencies['select:parties'].samples) == LATENCY_SAMPLES
+    assert stats['count'] == LATENCY_SAMPLES * 10
+    assert stats['max'] == 0.99
+    assert stats['seconds'] == pytest.approx(sum(durations))
+    # A uniform sample of a uniform spread
+    assert 0.4 <= stats['p50'] <= 0.6
+    assert 0.85 <= stats['p95'] <= 0.99
+
+
+def test_status_line():
+    telemetry = Telemetry('test', total=10, metrics_path='unused.jsonl', status=False)
+    telemetry.progress(4, ok=3, errors=1)
+    telemetry.on_request('auth:create_user', 0.2)
+    telemetry.on_retry(429)
+
+    line = telemetry.status_line()
+
+    assert line.startswith('⏳ 4/10 (40%)')
+    assert 'ok 3 errors 1' in line
+    assert 'auth:create_user p50 0.20s' in line
+    assert line.endswith('🔁 1')
@@ -0,0 +1,42 @@
+"""Profile writer: chunks are written as they fill, and slow trickles on a timer"""
+
+from naebak_import.importer import import_records
+from naebak_import.sources import LIST
+from naebak_import.writer import ProfileWriter
+
+
+def test_full_at_one_chunk():
+    writer = ProfileWriter(chunk_size=2, auto_flush=False)
+    writer.add_user_profile(0, 'u0', 'مرشح', None)
+    assert not writer.full()
+    writer.add_user_profile(1, 'u1', 'مرشح', None)
+    assert writer.full()
+
+
+def test_due_after_flush_interval():
+    writer = ProfileWriter(auto_flush=False, flush_interval=0)
+    assert writer.wait_time() is None and not writer.due()
+    writer.add_user_profile(0, 'u0', 'مرشح', None)
+    assert writer.due()
+
+
+def test_profiles_are_written_while_auth_users_are_created(standin, fresh_process, monkeypatch):
+    standin.seed_reference()
+    rows = [(i, LIST.record('الأولى', 'قطاع شرق الدلتا', 'القائمة الوطنية من أجل مصر', 'أساسي',
+                            i + 1, f'مرشح رقم {i + 1}', '')) for i in range(20)]
+    created_at_flush = []
+    flush_async = ProfileWriter.flush_async
+
+    async def recorded(self):
+        created_at_flush.append(standin.requests['auth:create_user'])
+        await flush_async(self)
+
+    monkeypatch.setattr(ProfileWriter, 'flush_async', recorded)
+
+    # 20 users at 4 a second: far fewer rows than a chunk, over several flush intervals
+    stats = import_records(LIST, rows, auth_rate=4)
+
+    assert stats.success == 20
+    assert standin.requests['auth:create_user'] == 20
+    assert created_at_flush[0] < 20
+    assert standin.table_counts()['deputy_profiles'] == 20
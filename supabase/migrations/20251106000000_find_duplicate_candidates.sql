@@ -0,0 +1,97 @@
+-- =====================================================
+-- Server-side Duplicate Candidate Detection
+-- =====================================================
+-- المشكلة: remove_duplicates.py و analyze_import.py يجلبان كل
+--   deputy_profiles مع user_profiles(full_name) على دفعات من 1000
+--   ثم يجمعان الأسماء في Python، فتكلفة إزالة التكرار تكبر مع حجم الجدول
+-- الحل: دالة تجمع المرشحين بالاسم المُطبَّع داخل قاعدة البيانات
+--   (ROW_NUMBER / FIRST_VALUE) وتعيد فقط السجلات الزائدة المطلوب حذفها
+-- =====================================================
+
+-- 1. تطبيع الأسماء العربية
+-- =====================================================
+-- نفس قواعد scripts/naebak_import/arabic.py:
+--   أ إ آ ٱ → ا ، ة → ه ، ى → ي ، حذف التطويل والتشكيل ، توحيد المسافات
+CREATE OR REPLACE FUNCTION normalize_arabic_name(name_param TEXT)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+PARALLEL SAFE
+AS $$
+  SELECT btrim(regexp_replace(
+    translate(COALESCE(name_param, ''), 'أإآٱةىـًٌٍَُِّْٰ', 'ااااهي'),
+    '\s+', ' ', 'g'
+  ));
+$$;
+
+-- 2. دالة إيجاد السجلات المكررة
+-- =====================================================
+-- يُعتبر السجلان مكررين إذا تطابق الاسم المُطبَّع والدائرة والمجلس
+-- (نفس هوية المرشح في scripts/naebak_import/identity.py).
+-- name_only_param = TRUE يجمع بالاسم فقط كما كان السكريبت القديم يفعل.
+-- الأقدم في كل مجموعة يُحتفظ به، والباقي يُعاد للحذف.
+DROP FUNCTION IF EXISTS find_duplicate_candidates(TEXT, BOOLEAN);
+
+CREATE FUNCTION find_duplicate_candidates(
+  candidate_type_param TEXT DEFAULT 'individual',
+  name_only_param BOOLEAN DEFAULT FALSE
+)
+RETURNS TABLE (
+  deputy_id UUID,
+  user_id UUID,
+  full_name TEXT,
+  created_at TIMESTAMPTZ,
+  keep_deputy_id UUID,
+  keep_created_at TIMESTAMPTZ,
+  copies INTEGER
+)
+LANGUAGE sql
+STABLE
+AS $$
+  WITH ranked AS (
+    SELECT
+      dp.id AS deputy_id,
+      dp.user_id,
+      up.full_name,
+      dp.created_at,
+      ROW_NUMBER() OVER oldest_first AS copy_number,
+      FIRST_VALUE(dp.id) OVER oldest_first AS keep_deputy_id,
+      FIRST_VALUE(dp.created_at) OVER oldest_first AS keep_created_at,
+      COUNT(*) OVER same_candidate AS copies
+    FROM deputy_profiles dp
+    JOIN user_profiles up ON up.id = dp.user_id
+    WHERE dp.candidate_type = candidate_type_param
+    WINDOW
+      same_candidate AS (
+        PARTITION BY
+          normalize_arabic_name(up.full_name),
+          CASE WHEN name_only_param THEN NULL ELSE dp.electoral_district_id END,
+          CASE WHEN name_only_param THEN NULL ELSE dp.council_id END
+      ),
+      oldest_first AS (same_candidate ORDER BY dp.created_at, dp.id)
+  )
+  SELECT
+    ranked.deputy_id,
+    ranked.user_id,
+    ranked.full_name,
+    ranked.created_at,
+    ranked.keep_deputy_id,
+    ranked.keep_created_at,
+    ranked.copies::INTEGER
+  FROM ranked
+  WHERE ranked.copy_number > 1
+  ORDER BY ranked.keep_deputy_id, ranked.created_at, ranked.deputy_id;
+$$;
+
+-- الدالة تكشف أسماء المرشحين، لذلك للـ service_role فقط
+REVOKE ALL ON FUNCTION find_duplicate_candidates(TEXT, BOOLEAN) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION find_duplicate_candidates(TEXT, BOOLEAN) TO service_role;
+
+-- =====================================================
+-- الاستخدام
+-- =====================================================
+-- SELECT * FROM find_duplicate_candidates('individual');
+-- SELECT COUNT(*) FROM find_duplicate_candidates('individual', TRUE);
+-- من Python (scripts/naebak_import/duplicates.py):
+--   supabase.rpc('find_duplicate_candidates', {'candidate_type_param': 'individual'})
+-- =====================================================
@@ -0,0 +1,80 @@
+-- =====================================================
+-- Bulk Deputy Rating Seeding
+-- =====================================================
+-- المشكلة: populate_ratings.py يرسل طلب update().eq('id', ...) لكل نائب
+--   (آلاف الطلبات)، ثم يجلب كل الصفوف مرة أخرى ليحسب المتوسط في Python
+-- الحل: دالة تستقبل دفعة من التقييمات كـ JSONB وتحدّثها بجملة UPDATE واحدة،
+--   ودالة تحسب الإحصائيات داخل قاعدة البيانات
+-- =====================================================
+
+-- 1. تعيين التقييمات لدفعة من النواب
+-- =====================================================
+-- ratings_param: [{"id": "...", "rating_average": 3.2, "rating_count": 1500}, ...]
+-- only_unrated_param = TRUE لا يلمس النواب الذين لديهم تقييم بالفعل
+-- تعيد عدد الصفوف التي تم تحديثها
+DROP FUNCTION IF EXISTS set_deputy_ratings(JSONB, BOOLEAN);
+
+CREATE FUNCTION set_deputy_ratings(
+  ratings_param JSONB,
+  only_unrated_param BOOLEAN DEFAULT TRUE
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  updated_count INTEGER;
+BEGIN
+  UPDATE deputy_profiles dp
+  SET
+    rating_average = r.rating_average,
+    rating_count = r.rating_count
+  FROM jsonb_to_recordset(ratings_param)
+    AS r(id UUID, rating_average NUMERIC, rating_count INTEGER)
+  WHERE dp.id = r.id
+    AND (NOT only_unrated_param OR COALESCE(dp.rating_average, 0) = 0);
+
+  GET DIAGNOSTICS updated_count = ROW_COUNT;
+  RETURN updated_count;
+END;
+$$;
+
+-- 2. إحصائيات التقييم محسوبة في قاعدة البيانات
+-- =====================================================
+DROP FUNCTION IF EXISTS deputy_rating_stats();
+
+CREATE FUNCTION deputy_rating_stats()
+RETURNS TABLE (
+  deputies BIGINT,
+  unrated BIGINT,
+  average_rating NUMERIC,
+  average_count NUMERIC,
+  min_rating NUMERIC,
+  max_rating NUMERIC
+)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT
+    COUNT(*),
+    COUNT(*) FILTER (WHERE COALESCE(rating_average, 0) = 0),
+    ROUND(AVG(COALESCE(rating_average, 0)), 2),
+    ROUND(AVG(COALESCE(rating_count, 0)), 0),
+    MIN(rating_average),
+    MAX(rating_average)
+  FROM deputy_profiles;
+$$;
+
+-- التعديل الجماعي للـ service_role فقط
+REVOKE ALL ON FUNCTION set_deputy_ratings(JSONB, BOOLEAN) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION set_deputy_ratings(JSONB, BOOLEAN) TO service_role;
+REVOKE ALL ON FUNCTION deputy_rating_stats() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION deputy_rating_stats() TO service_role;
+
+-- =====================================================
+-- الاستخدام
+-- =====================================================
+-- SELECT set_deputy_ratings('[{"id": "...", "rating_average": 3.2, "rating_count": 1500}]');
+-- SELECT * FROM deputy_rating_stats();
+-- من Python (scripts/naebak_import/ratings.py):
+--   supabase.rpc('set_deputy_ratings', {'ratings_param': [...]})
+-- =====================================================
@@ -0,0 +1,268 @@
+-- =====================================================
+-- Incremental Deputy Rating Totals
+-- =====================================================
+-- المشكلة: كل تقييم جديد يستدعي calculate_deputy_rating() التي تعيد
+--   حساب SUM/COUNT لكل تقييمات النائب، فتكلفة الكتابة تكبر مع عدد التقييمات،
+--   وإعادة الحساب للجميع كانت حلقة تستدعي الدالة لكل نائب
+-- الحل:
+--   1. أعمدة تحفظ مجموع وعدد تقييمات المستخدمين لكل نائب
+--   2. Triggers على مستوى الجملة تطبّق الفرق (delta) فقط، مجمّعاً لكل نائب
+--   3. Trigger قبل التحديث يحسب rating_average / rating_count من الأعمدة
+--      المحفوظة دون قراءة deputy_ratings
+--   4. إعادة حساب الجميع بجملة UPDATE واحدة مع GROUP BY
+-- =====================================================
+
+-- 1. أعمدة المجاميع
+-- =====================================================
+ALTER TABLE deputy_profiles
+ADD COLUMN IF NOT EXISTS user_rating_sum BIGINT NOT NULL DEFAULT 0,
+ADD COLUMN IF NOT EXISTS user_rating_count INTEGER NOT NULL DEFAULT 0;
+
+COMMENT ON COLUMN deputy_profiles.user_rating_sum IS 'Running sum of deputy_ratings.rating for this deputy';
+COMMENT ON COLUMN deputy_profiles.user_rating_count IS 'Running count of deputy_ratings rows for this deputy';
+
+-- 2. معادلة التقييم النهائي
+-- =====================================================
+-- rating_average = (initial × initial_count + user_sum) / (initial_count + user_count)
+CREATE OR REPLACE FUNCTION deputy_rating_average(
+  initial_avg NUMERIC,
+  initial_count INTEGER,
+  user_sum BIGINT,
+  user_count INTEGER
+)
+RETURNS NUMERIC
+LANGUAGE sql
+IMMUTABLE
+PARALLEL SAFE
+AS $$
+  SELECT CASE
+    WHEN COALESCE(initial_count, 0) + COALESCE(user_count, 0) > 0 THEN
+      (COALESCE(initial_avg, 0) * COALESCE(initial_count, 0) + COALESCE(user_sum, 0))
+        / (COALESCE(initial_count, 0) + COALESCE(user_count, 0))
+    ELSE 0
+  END;
+$$;
+
+-- 3. تحديث التقييم النهائي من المجاميع (قبل التحديث، بدون UPDATE إضافي)
+-- =====================================================
+-- يحل محل trigger_recalculate_on_initial_rating_change الذي كان يعيد
+-- قراءة كل تقييمات النائب عند تعديل initial_rating من الأدمن
+CREATE OR REPLACE FUNCTION trigger_refresh_deputy_rating()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF (NEW.initial_rating_average IS DISTINCT FROM OLD.initial_rating_average) OR
+     (NEW.initial_rating_count IS DISTINCT FROM OLD.initial_rating_count) OR
+     (NEW.user_rating_sum IS DISTINCT FROM OLD.user_rating_sum) OR
+     (NEW.user_rating_count IS DISTINCT FROM OLD.user_rating_count) THEN
+    NEW.rating_average := deputy_rating_average(
+      NEW.initial_rating_average, NEW.initial_rating_count,
+      NEW.user_rating_sum, NEW.user_rating_count);
+    NEW.rating_count := COALESCE(NEW.initial_rating_count, 0) + NEW.user_rating_count;
+    NEW.updated_at := NOW();
+  END IF;
+
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS recalculate_rating_on_initial_change ON deputy_profiles;
+DROP TRIGGER IF EXISTS refresh_rating_on_totals_change ON deputy_profiles;
+
+CREATE TRIGGER refresh_rating_on_totals_change
+BEFORE UPDATE ON deputy_profiles
+FOR EACH ROW
+EXECUTE FUNCTION trigger_refresh_deputy_rating();
+
+-- 4. تطبيق الفرق عند إضافة/تعديل/حذف تقييمات المستخدمين
+-- =====================================================
+-- Trigger لكل جملة (FOR EACH STATEMENT) مع جداول الانتقال:
+-- إدخال 1000 تقييم في جملة واحدة = UPDATE واحد لكل نائب متأثر
+-- SECURITY DEFINER: المستخدم الذي يضيف تقييماً لا يملك صلاحية تعديل deputy_profiles
+CREATE OR REPLACE FUNCTION trigger_apply_deputy_rating_delta()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    UPDATE deputy_profiles dp
+    SET
+      user_rating_sum = dp.user_rating_sum + delta.rating_sum,
+      user_rating_count = dp.user_rating_count + delta.rating_count
+    FROM (
+      SELECT deputy_id, SUM(rating) AS rating_sum, COUNT(*) AS rating_count
+      FROM new_ratings
+      GROUP BY deputy_id
+    ) delta
+    WHERE dp.id = delta.deputy_id;
+
+  ELSIF TG_OP = 'DELETE' THEN
+    UPDATE deputy_profiles dp
+    SET
+      user_rating_sum = dp.user_rating_sum - delta.rating_sum,
+      user_rating_count = dp.user_rating_count - delta.rating_count
+    FROM (
+      SELECT deputy_id, SUM(rating) AS rating_sum, COUNT(*) AS rating_count
+      FROM old_ratings
+      GROUP BY deputy_id
+    ) delta
+    WHERE dp.id = delta.deputy_id;
+
+  ELSIF TG_OP = 'UPDATE' THEN
+    -- تعديل التقييم أو نقله لنائب آخر: الجديد موجب والقديم سالب
+    UPDATE deputy_profiles dp
+    SET
+      user_rating_sum = dp.user_rating_sum + delta.rating_sum,
+      user_rating_count = dp.user_rating_count + delta.rating_count
+    FROM (
+      SELECT deputy_id, SUM(rating) AS rating_sum, SUM(rating_count) AS rating_count
+      FROM (
+        SELECT deputy_id, rating, 1 AS rating_count FROM new_ratings
+        UNION ALL
+        SELECT deputy_id, -rating, -1 FROM old_ratings
+      ) changes
+      GROUP BY deputy_id
+      HAVING SUM(rating) <> 0 OR SUM(rating_count) <> 0
+    ) delta
+    WHERE dp.id = delta.deputy_id;
+  END IF;
+
+  RETURN NULL;
+END;
+$$;
+
+-- الـ Triggers القديمة التي تعيد الحساب لكل صف
+DROP TRIGGER IF EXISTS recalculate_rating_on_user_rating ON deputy_ratings;
+DROP TRIGGER IF EXISTS trigger_deputy_rating_insert ON deputy_ratings;
+DROP TRIGGER IF EXISTS trigger_deputy_rating_update ON deputy_ratings;
+DROP TRIGGER IF EXISTS trigger_deputy_rating_delete ON deputy_ratings;
+
+DROP TRIGGER IF EXISTS apply_rating_delta_on_insert ON deputy_ratings;
+CREATE TRIGGER apply_rating_delta_on_insert
+AFTER INSERT ON deputy_ratings
+REFERENCING NEW TABLE AS new_ratings
+FOR EACH STATEMENT
+EXECUTE FUNCTION trigger_apply_deputy_rating_delta();
+
+DROP TRIGGER IF EXISTS apply_rating_delta_on_update ON deputy_ratings;
+CREATE TRIGGER apply_rating_delta_on_update
+AFTER UPDATE ON deputy_ratings
+REFERENCING OLD TABLE AS old_ratings NEW TABLE AS new_ratings
+FOR EACH STATEMENT
+EXECUTE FUNCTION trigger_apply_deputy_rating_delta();
+
+DROP TRIGGER IF EXISTS apply_rating_delta_on_delete ON deputy_ratings;
+CREATE TRIGGER apply_rating_delta_on_delete
+AFTER DELETE ON deputy_ratings
+REFERENCING OLD TABLE AS old_ratings
+FOR EACH STATEMENT
+EXECUTE FUNCTION trigger_apply_deputy_rating_delta();
+
+-- 5. إعادة حساب نائب واحد (إصلاح يدوي)
+-- =====================================================
+-- نفس التوقيع القديم؛ تكتب المجاميع والتقييم النهائي معاً حتى لو كانت
+-- المجاميع صحيحة والتقييم النهائي وحده هو الخاطئ
+CREATE OR REPLACE FUNCTION calculate_deputy_rating(deputy_id_param UUID)
+RETURNS void
+LANGUAGE sql
+AS $$
+  UPDATE deputy_profiles dp
+  SET
+    user_rating_sum = totals.rating_sum,
+    user_rating_count = totals.rating_count,
+    rating_average = deputy_rating_average(
+      dp.initial_rating_average, dp.initial_rating_count,
+      totals.rating_sum, totals.rating_count),
+    rating_count = COALESCE(dp.initial_rating_count, 0) + totals.rating_count
+  FROM (
+    SELECT COALESCE(SUM(rating), 0)::BIGINT AS rating_sum, COUNT(*)::INTEGER AS rating_count
+    FROM deputy_ratings
+    WHERE deputy_id = deputy_id_param
+  ) totals
+  WHERE dp.id = deputy_id_param;
+$$;
+
+-- 6. إعادة حساب جميع النواب بتجميع واحد
+-- =====================================================
+-- GROUP BY واحد على deputy_ratings بدلاً من استدعاء الدالة لكل نائب.
+-- لا يكتب إلا الصفوف التي اختلفت مجاميعها (والـ trigger يحدّث التقييم
+-- النهائي لها)، وتعيد عددها
+DROP FUNCTION IF EXISTS recompute_all_deputy_ratings();
+
+CREATE FUNCTION recompute_all_deputy_ratings()
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  updated_count INTEGER;
+BEGIN
+  UPDATE deputy_profiles dp
+  SET
+    user_rating_sum = COALESCE(totals.rating_sum, 0),
+    user_rating_count = COALESCE(totals.rating_count, 0)
+  FROM deputy_profiles base
+  LEFT JOIN (
+    SELECT deputy_id, SUM(rating) AS rating_sum, COUNT(*)::INTEGER AS rating_count
+    FROM deputy_ratings
+    GROUP BY deputy_id
+  ) totals ON totals.deputy_id = base.id
+  WHERE dp.id = base.id
+    AND (dp.user_rating_sum IS DISTINCT FROM COALESCE(totals.rating_sum, 0)
+      OR dp.user_rating_count IS DISTINCT FROM COALESCE(totals.rating_count, 0));
+
+  GET DIAGNOSTICS updated_count = ROW_COUNT;
+  RETURN updated_count;
+END;
+$$;
+
+-- 7. النواب الذين تختلف مجاميعهم المحفوظة عن deputy_ratings
+-- =====================================================
+DROP FUNCTION IF EXISTS deputy_rating_drift();
+
+CREATE FUNCTION deputy_rating_drift()
+RETURNS TABLE (
+  deputy_id UUID,
+  stored_sum BIGINT,
+  stored_count INTEGER,
+  actual_sum BIGINT,
+  actual_count INTEGER
+)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT
+    dp.id,
+    dp.user_rating_sum,
+    dp.user_rating_count,
+    COALESCE(totals.rating_sum, 0)::BIGINT,
+    COALESCE(totals.rating_count, 0)::INTEGER
+  FROM deputy_profiles dp
+  LEFT JOIN (
+    SELECT deputy_id, SUM(rating) AS rating_sum, COUNT(*) AS rating_count
+    FROM deputy_ratings
+    GROUP BY deputy_id
+  ) totals ON totals.deputy_id = dp.id
+  WHERE dp.user_rating_sum IS DISTINCT FROM COALESCE(totals.rating_sum, 0)
+     OR dp.user_rating_count IS DISTINCT FROM COALESCE(totals.rating_count, 0)
+  ORDER BY dp.id;
+$$;
+
+REVOKE ALL ON FUNCTION recompute_all_deputy_ratings() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION recompute_all_deputy_ratings() TO service_role;
+REVOKE ALL ON FUNCTION deputy_rating_drift() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION deputy_rating_drift() TO service_role;
+
+-- 8. تعبئة المجاميع للنواب الحاليين
+-- =====================================================
+SELECT recompute_all_deputy_ratings();
+
+-- =====================================================
+-- الاستخدام
+-- =====================================================
+-- SELECT * FROM deputy_rating_drift();
+-- SELECT recompute_all_deputy_ratings();
+-- من Python: python3 scripts/recompute_ratings.py [--fix]
+-- =====================================================